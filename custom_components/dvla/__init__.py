@@ -3,28 +3,66 @@
 from __future__ import annotations
 
 import asyncio
+from collections.abc import Mapping
+from datetime import timedelta
+import heapq
 import logging
 from typing import Any
 
 import voluptuous as vol
 
 from homeassistant.config_entries import ConfigEntry, ConfigEntryState
-from homeassistant.const import CONF_API_KEY, CONTENT_TYPE_JSON, Platform
-from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.const import CONF_API_KEY, Platform
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
 from homeassistant.exceptions import HomeAssistantError
 import homeassistant.helpers.config_validation as cv
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.singleton import singleton
+from homeassistant.helpers.storage import Store
 from homeassistant.helpers.typing import ConfigType
+from homeassistant.util import dt as dt_util
 
 from .const import (
     ATTR_API_KEY,
+    ATTR_DAYS,
+    ATTR_FIELD,
+    ATTR_FORCE_REFRESH,
+    ATTR_INCLUDE_OVERDUE,
     ATTR_REG_NUMBER,
+    ATTR_REG_NUMBERS,
+    ATTR_STATUS,
+    CONF_API_KEYS,
+    CONF_MONTHLY_BUDGET,
+    CONF_RATE_LIMIT,
+    DEFAULT_MONTHLY_BUDGET,
+    DEFAULT_RATE_LIMIT,
     DOMAIN,
-    HOST,
+    EVENT_BULK_LOOKUP_PROGRESS,
+    SERVICE_BULK_LOOKUP,
     SERVICE_LOOKUP,
+    SERVICE_QUERY_EXPIRING,
+    STORAGE_VERSION,
+)
+from .cache import async_configure_lookup_cache, async_get_lookup_cache
+from .coordinator import (
+    DVLACoordinator,
+    DVLAError,
+    async_close_session,
+    async_fetch_many,
+    async_fetch_vehicle_from_pool,
+    async_get_session,
+    normalise_registration,
 )
+from .fleet import DATE_KEYS, STATUS_KEYS, async_get_fleet_index
+from .metrics import async_get_metrics
+from .pool import async_get_key_pool
 
-PLATFORMS = [Platform.BINARY_SENSOR, Platform.SENSOR]
+PLATFORMS = [Platform.BINARY_SENSOR, Platform.CALENDAR, Platform.SENSOR]
 
 CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
 
@@ -32,87 +70,189 @@ LOOKUP_SCHEMA = vol.Schema(
     {
         vol.Required(ATTR_REG_NUMBER): cv.string,
         vol.Optional(ATTR_API_KEY): cv.string,
+        vol.Optional(ATTR_FORCE_REFRESH, default=False): cv.boolean,
+    }
+)
+
+BULK_LOOKUP_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_REG_NUMBERS): vol.All(
+            cv.ensure_list, [cv.string], vol.Length(min=1)
+        ),
+        vol.Optional(ATTR_API_KEY): cv.string,
+        vol.Optional(ATTR_FORCE_REFRESH, default=False): cv.boolean,
+    }
+)
+
+QUERY_EXPIRING_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_DAYS, default=30): vol.All(
+            vol.Coerce(int), vol.Range(min=0)
+        ),
+        vol.Optional(ATTR_FIELD, default=DATE_KEYS): vol.All(
+            cv.ensure_list, [vol.In(DATE_KEYS)]
+        ),
+        vol.Optional(ATTR_STATUS): vol.All(cv.ensure_list, [cv.string]),
+        vol.Optional(ATTR_INCLUDE_OVERDUE, default=False): cv.boolean,
     }
 )
 
 _LOGGER = logging.getLogger(__name__)
 
+DATA_STORES = f"{DOMAIN}_stores"
+
+
+def _entry_api_keys(data: Mapping[str, Any]) -> list[str]:
+    """Return every API key configured for an entry, main key first."""
+    return [
+        api_key
+        for api_key in (
+            data.get(CONF_API_KEY),
+            *(extra[CONF_API_KEY] for extra in data.get(CONF_API_KEYS, [])),
+        )
+        if api_key
+    ]
+
+
+def _entry_key_limits(data: Mapping[str, Any]) -> dict[str, tuple[float, int]]:
+    """Return the (rate, monthly budget) of each of an entry's API keys.
+
+    Additional keys without their own rate or budget use the entry's.
+    """
+    rate = data.get(CONF_RATE_LIMIT, DEFAULT_RATE_LIMIT)
+    monthly_budget = data.get(CONF_MONTHLY_BUDGET, DEFAULT_MONTHLY_BUDGET)
+    limits = {data[CONF_API_KEY]: (rate, monthly_budget)}
+    for extra in data.get(CONF_API_KEYS, []):
+        limits.setdefault(
+            extra[CONF_API_KEY],
+            (
+                extra.get(CONF_RATE_LIMIT, rate),
+                extra.get(CONF_MONTHLY_BUDGET, monthly_budget),
+            ),
+        )
+    return limits
+
+
+@callback
+def _async_key_limits(hass: HomeAssistant) -> dict[str, tuple[float, int]]:
+    """Return the (rate, monthly budget) of every configured API key.
+
+    A key's limiter is shared by every entry, so a key used by several
+    entries takes its rate and budget from the first entry added that has
+    it, rather than from whichever entry loaded last.
+    """
+    limits: dict[str, tuple[float, int]] = {}
+    for entry in hass.config_entries.async_entries(DOMAIN):
+        for api_key, key_limits in _entry_key_limits(entry.data).items():
+            limits.setdefault(api_key, key_limits)
+    return limits
+
 
 async def _async_single_lookup(
-    hass: HomeAssistant, api_key: str, reg_number: str
+    hass: HomeAssistant, api_keys: list[str], reg_number: str
 ) -> Any:
-    """Perform a one-off DVLA lookup."""
-
-    session = async_get_clientsession(hass)
-
-    try:
-        resp = await session.post(
-            HOST,
-            headers={
-                "Content-Type": CONTENT_TYPE_JSON,
-                "x-api-key": api_key,
-            },
-            json={"registrationNumber": str(reg_number).upper()},
-        )
-        body = await resp.json()
-    except ValueError as err:
-        _LOGGER.exception("Failed to parse DVLA response")
-        raise HomeAssistantError("Invalid response from DVLA API") from err
+    """Perform a one-off DVLA lookup with whichever key has most headroom."""
 
-    if "errors" in body:
-        error = body["errors"][0]
-        raise HomeAssistantError(
-            f"{error.get('title')}({error.get('code')}): {error.get('detail')}"
-        )
+    session = async_get_session(hass)
+    pool = await async_get_key_pool(hass, api_keys)
+    metrics = async_get_metrics(hass)
+
+    return await async_fetch_vehicle_from_pool(session, pool, reg_number, metrics)
 
-    if "message" in body:
-        raise HomeAssistantError(body["message"])
 
-    if resp.status >= 400:
+def _resolve_api_keys(hass: HomeAssistant, call: ServiceCall) -> list[str]:
+    """Return the API keys for a service call, falling back to configured ones.
+
+    Without an api_key in the call, every key of every loaded entry is
+    pooled.
+    """
+
+    if (api_key := call.data.get(ATTR_API_KEY)) is not None:
+        api_keys = [api_key]
+    else:
+        entries = hass.config_entries.async_entries(DOMAIN)
+        api_keys = [
+            api_key
+            for entry in entries
+            if entry.state == ConfigEntryState.LOADED
+            for api_key in _entry_api_keys(entry.data)
+        ] or [api_key for entry in entries for api_key in _entry_api_keys(entry.data)]
+
+    if not api_keys:
         raise HomeAssistantError(
-            f"DVLA lookup failed with status {resp.status}: {body}"
+            "DVLA API key is required; provide api_key or configure the integration."
         )
 
-    return body
+    return list(dict.fromkeys(api_keys))
 
 
 async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
     """Set up the DVLA integration."""
 
+    async def async_cached_lookup(
+        api_keys: list[str], reg_number: str, force_refresh: bool
+    ) -> dict[str, Any]:
+        """Look up a vehicle through the shared cache."""
+        return await async_get_lookup_cache(hass).async_get(
+            normalise_registration(reg_number),
+            lambda: _async_single_lookup(hass, api_keys, reg_number),
+            force_refresh=force_refresh,
+        )
+
     async def handle_lookup(call: ServiceCall):
         """Handle dvla.lookup service."""
 
         reg_number = call.data[ATTR_REG_NUMBER]
-        api_key = call.data.get(ATTR_API_KEY)
-
-        if api_key is None:
-            entries = hass.config_entries.async_entries(DOMAIN)
-            api_key = next(
-                (
-                    entry.data.get(CONF_API_KEY)
-                    for entry in entries
-                    if entry.state == ConfigEntryState.LOADED
-                    and entry.data.get(CONF_API_KEY)
-                ),
-                None,
-            )
+        api_keys = _resolve_api_keys(hass, call)
+
+        return await async_cached_lookup(
+            api_keys, reg_number, call.data[ATTR_FORCE_REFRESH]
+        )
+
+    async def handle_bulk_lookup(call: ServiceCall) -> ServiceResponse:
+        """Handle dvla.bulk_lookup service."""
 
-            if api_key is None:
-                api_key = next(
-                    (
-                        entry.data.get(CONF_API_KEY)
-                        for entry in entries
-                        if entry.data.get(CONF_API_KEY)
-                    ),
-                    None,
-                )
-
-        if not api_key:
-            raise HomeAssistantError(
-                "DVLA API key is required; provide api_key or configure the integration."
+        reg_numbers = list(
+            dict.fromkeys(
+                normalise_registration(reg_number)
+                for reg_number in call.data[ATTR_REG_NUMBERS]
             )
+        )
+        api_keys = _resolve_api_keys(hass, call)
+        force_refresh = call.data[ATTR_FORCE_REFRESH]
+        completed = 0
+
+        @callback
+        def async_progress(reg_number: str, result: dict[str, Any] | DVLAError):
+            """Fire an event as each vehicle completes."""
+            nonlocal completed
+            completed += 1
+            hass.bus.async_fire(
+                EVENT_BULK_LOOKUP_PROGRESS,
+                {
+                    ATTR_REG_NUMBER: reg_number,
+                    "success": not isinstance(result, DVLAError),
+                    "completed": completed,
+                    "total": len(reg_numbers),
+                },
+                context=call.context,
+            )
+
+        results = await async_fetch_many(
+            lambda reg_number: async_cached_lookup(api_keys, reg_number, force_refresh),
+            reg_numbers,
+            on_result=async_progress,
+        )
 
-        return await _async_single_lookup(hass, api_key, reg_number)
+        response: dict[str, Any] = {}
+        for reg_number in reg_numbers:
+            result = results[reg_number]
+            if isinstance(result, DVLAError):
+                response[reg_number] = {"success": False, "error": str(result)}
+            else:
+                response[reg_number] = {"success": True, "data": result}
+
+        return {"results": response}
 
     hass.services.async_register(
         DOMAIN,
@@ -122,30 +262,153 @@ async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
         supports_response=True,
     )
 
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_BULK_LOOKUP,
+        handle_bulk_lookup,
+        schema=BULK_LOOKUP_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+
+    @callback
+    def handle_query_expiring(call: ServiceCall) -> ServiceResponse:
+        """Handle dvla.query_expiring service.
+
+        Answered from the fleet index of every entry without calling the
+        API; the sorted date lists are bisected for the window and merged.
+        """
+
+        today = dt_util.now().date()
+        start = None if call.data[ATTR_INCLUDE_OVERDUE] else today
+        end = today + timedelta(days=call.data[ATTR_DAYS])
+        statuses = {status.casefold() for status in call.data.get(ATTR_STATUS, [])}
+
+        index = async_get_fleet_index(hass)
+        matches = heapq.merge(
+            *(
+                [(due, reg_number, key) for due, reg_number in dates]
+                for key in call.data[ATTR_FIELD]
+                if (dates := index.between(key, start, end))
+            )
+        )
+
+        vehicles = []
+        for due, reg_number, key in matches:
+            vehicle = index.vehicle(reg_number)
+            status = vehicle.get(STATUS_KEYS[key]) if vehicle else None
+            if statuses and str(status).casefold() not in statuses:
+                continue
+            vehicles.append(
+                {
+                    "registration_number": reg_number,
+                    "field": key,
+                    "date": due.isoformat(),
+                    "days": (due - today).days,
+                    "status": status,
+                    "make": vehicle.make if vehicle else None,
+                }
+            )
+
+        return {"vehicles": vehicles}
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_QUERY_EXPIRING,
+        handle_query_expiring,
+        schema=QUERY_EXPIRING_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+
     return True
 
 
+@singleton(DATA_STORES)
+@callback
+def _async_get_stores(hass: HomeAssistant) -> dict[str, Store]:
+    """Return the snapshot stores of the entries set up since startup."""
+    return {}
+
+
+def _entry_store(hass: HomeAssistant, entry: ConfigEntry) -> Store:
+    """Return the store holding an entry's last fetched vehicles.
+
+    The same instance is returned each time, so removing an entry also
+    cancels any save its coordinator still has scheduled.
+    """
+    stores = _async_get_stores(hass)
+    if (store := stores.get(entry.entry_id)) is None:
+        store = stores[entry.entry_id] = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.{entry.entry_id}"
+        )
+    return store
+
+
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up platform from a ConfigEntry."""
     hass.data.setdefault(DOMAIN, {})
-    hass_data = dict(entry.data)
+
+    # A single coordinator per entry is shared by every platform so each
+    # refresh cycle costs one request per vehicle.
+    # Every key of the entry gets its own limiter and budget, configured
+    # with the key's own rate and monthly budget or else the entry's. A key
+    # shared with an earlier entry keeps that entry's rate and budget.
+    session = async_get_session(hass)
+    pool = await async_get_key_pool(
+        hass, _entry_api_keys(entry.data), _async_key_limits(hass)
+    )
+    api_key = entry.data[CONF_API_KEY]
+    coordinator = DVLACoordinator(
+        hass,
+        session,
+        entry.data,
+        pool.limiter(api_key),
+        _entry_store(hass, entry),
+        pool.breaker(api_key),
+        async_get_metrics(hass),
+        pool,
+        async_get_fleet_index(hass),
+    )
+
+    async_configure_lookup_cache(hass)
+
+    # Start from the saved snapshot; stale vehicles are fetched in the
+    # background once the platforms are set up.
+    await coordinator.async_load()
+
     # Registers update listener to update config entry when options are updated.
     unsub_options_update_listener = entry.add_update_listener(options_update_listener)
 
     # Use async_on_unload to register the listener without storing it in entry data
     entry.async_on_unload(unsub_options_update_listener)
 
-    hass.data[DOMAIN][entry.entry_id] = hass_data
+    hass.data[DOMAIN][entry.entry_id] = coordinator
 
     # Forward the setup to each platform.
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+
+    if coordinator.due_registrations():
+        entry.async_create_background_task(
+            hass, coordinator.async_refresh(), f"{DOMAIN} initial refresh"
+        )
     return True
 
 
+def _without_uids(data: Mapping[str, Any]) -> dict[str, Any]:
+    """Return entry data without the calendar event uids."""
+    return {key: value for key, value in data.items() if key != "uids"}
+
+
 async def options_update_listener(hass: HomeAssistant, config_entry: ConfigEntry):
     """Handle options update."""
     entry_state = hass.config_entries.async_get_entry(config_entry.entry_id).state
 
+    # Calendar syncs only record event uids, which need no reload.
+    coordinator: DVLACoordinator | None = hass.data[DOMAIN].get(config_entry.entry_id)
+    if coordinator is not None and _without_uids(config_entry.data) == _without_uids(
+        coordinator.config
+    ):
+        return
+
     # Proceed only if the entry is in a valid state (loaded, etc.)
     if entry_state not in (
         ConfigEntryState.SETUP_IN_PROGRESS,
@@ -167,6 +430,17 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
     # Remove config entry from domain.
     if unload_ok:
-        hass.data[DOMAIN].pop(entry.entry_id)
+        coordinator: DVLACoordinator = hass.data[DOMAIN].pop(entry.entry_id)
+        coordinator.async_remove_from_index()
+
+        # Close the shared HTTP session once no entries are using it.
+        if not hass.data[DOMAIN]:
+            await async_close_session(hass)
 
     return unload_ok
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the saved vehicles when a config entry is deleted."""
+    await _entry_store(hass, entry).async_remove()
+    _async_get_stores(hass).pop(entry.entry_id, None)
@@ -0,0 +1,124 @@
+"""Circuit breaker for the DVLA API."""
+
+from __future__ import annotations
+
+from datetime import datetime
+import time
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.singleton import singleton
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN
+from .limiter import api_key_id
+
+DATA_BREAKERS = f"{DOMAIN}_breakers"
+
+# The circuit opens after this many consecutive failed requests, and lets a
+# single probe request through once it has been open this many seconds.
+FAILURE_THRESHOLD = 5
+RESET_TIMEOUT = 300
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+STATES = [STATE_CLOSED, STATE_OPEN, STATE_HALF_OPEN]
+
+
+class CircuitBreaker:
+    """Circuit breaker for a single API key.
+
+    While the circuit is open no requests are sent, so an outage or a
+    suspended key does not burn quota on requests that are sure to fail.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = FAILURE_THRESHOLD,
+        reset_timeout: float = RESET_TIMEOUT,
+    ) -> None:
+        """Initialize the breaker."""
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = STATE_CLOSED
+        self.failures = 0
+        self.opened_at: datetime | None = None
+        self._opened = 0.0
+        self._probing = False
+
+    @property
+    def available(self) -> bool:
+        """Return True if a request would be let through, without claiming it."""
+        if self.state == STATE_CLOSED:
+            return True
+        if self.state == STATE_OPEN:
+            return time.monotonic() - self._opened >= self.reset_timeout
+        return not self._probing
+
+    def allow_request(self) -> bool:
+        """Return True if a request may be sent now.
+
+        Once the reset timeout has passed the circuit half-opens and the
+        next caller becomes the probe; everyone else is refused until the
+        probe's outcome is recorded.
+        """
+        if self.state == STATE_CLOSED:
+            return True
+
+        if (
+            self.state == STATE_OPEN
+            and time.monotonic() - self._opened >= self.reset_timeout
+        ):
+            self.state = STATE_HALF_OPEN
+
+        if self.state == STATE_HALF_OPEN and not self._probing:
+            self._probing = True
+            return True
+
+        return False
+
+    def record_success(self) -> None:
+        """Close the circuit after a request reached a working API."""
+        self.state = STATE_CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+
+    def record_failure(self) -> None:
+        """Count a failed request, opening the circuit if needed."""
+        self.failures += 1
+        if self.state == STATE_HALF_OPEN or self.failures >= self.failure_threshold:
+            self.state = STATE_OPEN
+            self.opened_at = dt_util.utcnow()
+            self._opened = time.monotonic()
+        self._probing = False
+
+    def release(self) -> None:
+        """Give up a request slot without an outcome, e.g. when cancelled."""
+        self._probing = False
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the breaker state for diagnostics."""
+        return {
+            "consecutive_failures": self.failures,
+            "failure_threshold": self.failure_threshold,
+            "reset_timeout": self.reset_timeout,
+            "opened_at": self.opened_at,
+        }
+
+
+@singleton(DATA_BREAKERS)
+@callback
+def async_get_breakers(hass: HomeAssistant) -> dict[str, CircuitBreaker]:
+    """Return the shared circuit breakers keyed by API key."""
+    return {}
+
+
+@callback
+def async_get_breaker(hass: HomeAssistant, api_key: str) -> CircuitBreaker:
+    """Return the shared circuit breaker for an API key."""
+    breakers = async_get_breakers(hass)
+    if (breaker := breakers.get(key_id := api_key_id(api_key))) is None:
+        breaker = breakers[key_id] = CircuitBreaker()
+    return breaker
@@ -0,0 +1,171 @@
+"""Response cache for ad-hoc DVLA lookups."""
+
+from __future__ import annotations
+
+import asyncio
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+import time
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.singleton import singleton
+
+from .const import (
+    CONF_CACHE_SIZE,
+    CONF_CACHE_TTL,
+    DEFAULT_CACHE_SIZE,
+    DEFAULT_CACHE_TTL,
+    DOMAIN,
+)
+
+DATA_LOOKUP_CACHE = f"{DOMAIN}_lookup_cache"
+DATA_HANDOFF = f"{DOMAIN}_handoff"
+
+# Responses fetched while validating a new entry are kept this long, and
+# for at most this many vehicles, for the entry's first setup to use.
+HANDOFF_TTL = 600
+HANDOFF_SIZE = 1000
+
+
+class LookupCache:
+    """TTL cache with LRU eviction that shares in-flight requests.
+
+    Concurrent lookups for the same key wait on a single request instead
+    of each going to the API.
+    """
+
+    def __init__(self, ttl: float, max_size: int) -> None:
+        """Initialize the cache."""
+        self.ttl = ttl
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, tuple[float, dict[str, Any]]] = OrderedDict()
+        self._inflight: dict[str, asyncio.Task[dict[str, Any]]] = {}
+
+    def __len__(self) -> int:
+        """Return the number of cached responses."""
+        return len(self._entries)
+
+    @property
+    def hit_rate(self) -> float | None:
+        """Return the percentage of lookups answered without a new request."""
+        if not (total := self.hits + self.misses):
+            return None
+        return round(100 * self.hits / total, 1)
+
+    def configure(self, ttl: float, max_size: int) -> None:
+        """Update the TTL and size, evicting anything over the new size."""
+        self.ttl = ttl
+        self.max_size = max_size
+        self._evict()
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        """Return a fresh cached response, or None."""
+        if (entry := self._entries.get(key)) is None:
+            return None
+
+        expires, body = entry
+        if expires <= time.monotonic():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return body
+
+    def pop(self, key: str) -> dict[str, Any] | None:
+        """Remove and return a fresh cached response, or None."""
+        body = self.get(key)
+        self._entries.pop(key, None)
+        return body
+
+    def set(self, key: str, body: dict[str, Any]) -> None:
+        """Store a response."""
+        self._entries[key] = (time.monotonic() + self.ttl, body)
+        self._entries.move_to_end(key)
+        self._evict()
+
+    def _evict(self) -> None:
+        """Drop the least recently used responses over the size limit."""
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    async def async_get(
+        self,
+        key: str,
+        fetch: Callable[[], Awaitable[dict[str, Any]]],
+        force_refresh: bool = False,
+    ) -> dict[str, Any]:
+        """Return a cached response, fetching it if needed.
+
+        A forced refresh skips the cached response but still joins a request
+        that is already in flight, since that result is just as fresh.
+        """
+        if not force_refresh and (body := self.get(key)) is not None:
+            self.hits += 1
+            return body
+
+        if (task := self._inflight.get(key)) is not None:
+            self.hits += 1
+        else:
+            self.misses += 1
+            task = asyncio.create_task(self._async_fetch(key, fetch))
+            self._inflight[key] = task
+
+        # Shield the shared request so one cancelled caller cannot cancel it
+        # for everyone else waiting on it.
+        return await asyncio.shield(task)
+
+    async def _async_fetch(
+        self, key: str, fetch: Callable[[], Awaitable[dict[str, Any]]]
+    ) -> dict[str, Any]:
+        """Fetch and cache a response."""
+        try:
+            body = await fetch()
+        finally:
+            self._inflight.pop(key, None)
+
+        self.set(key, body)
+        return body
+
+
+@singleton(DATA_LOOKUP_CACHE)
+@callback
+def async_get_lookup_cache(hass: HomeAssistant) -> LookupCache:
+    """Return the shared lookup cache."""
+    return LookupCache(DEFAULT_CACHE_TTL, DEFAULT_CACHE_SIZE)
+
+
+@callback
+def async_get_cache_settings_entry(hass: HomeAssistant) -> ConfigEntry | None:
+    """Return the entry whose options set the shared lookup cache.
+
+    The cache is shared by every entry, so its lifetime and size come from
+    the first entry added rather than from whichever entry loaded last.
+    """
+    entries = hass.config_entries.async_entries(DOMAIN)
+    return entries[0] if entries else None
+
+
+@callback
+def async_configure_lookup_cache(hass: HomeAssistant) -> None:
+    """Apply the cache settings from the entry that owns them."""
+    entry = async_get_cache_settings_entry(hass)
+    data = entry.data if entry is not None else {}
+    async_get_lookup_cache(hass).configure(
+        data.get(CONF_CACHE_TTL, DEFAULT_CACHE_TTL),
+        data.get(CONF_CACHE_SIZE, DEFAULT_CACHE_SIZE),
+    )
+
+
+@singleton(DATA_HANDOFF)
+@callback
+def async_get_handoff(hass: HomeAssistant) -> LookupCache:
+    """Return the responses handed from the config flow to entry setup.
+
+    Entries have the same shape as a coordinator's saved snapshot, keyed by
+    normalised registration.
+    """
+    return LookupCache(HANDOFF_TTL, HANDOFF_SIZE)
@@ -1,24 +1,33 @@
-"""DVLA sensor platform."""
+"""DVLA calendar platform."""
 
-from datetime import date, datetime
+import asyncio
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime, timedelta
 import hashlib
 import json
+import logging
 import uuid
 
 from homeassistant.components.calendar import CalendarEntity, CalendarEvent
 from homeassistant.components.sensor import SensorDeviceClass
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.exceptions import HomeAssistantError, ServiceValidationError
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
 from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.event import async_track_time_change
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from homeassistant.util import dt as dt_util
 
-from .const import CONF_CALENDARS, CONF_REG_NUMBER, DOMAIN
+from .const import CONF_CALENDARS, DOMAIN
 from .coordinator import DVLACoordinator
 from .sensor import SENSOR_TYPES
 
+_LOGGER = logging.getLogger(__name__)
+
+# Limit concurrent event creation so large fleets don't flood the calendar.
+CALENDAR_SYNC_CONCURRENCY = 8
+
 DATE_SENSOR_TYPES = [
     st for st in SENSOR_TYPES if st.device_class == SensorDeviceClass.DATE
 ]
@@ -30,31 +39,64 @@ async def async_setup_entry(
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up sensors from a config entry created in the integrations UI."""
-    config = hass.data[DOMAIN][entry.entry_id]
-    # Update our config to include new repos and remove those that have been removed.
-    if entry.options:
-        config.update(entry.options)
-
-    reg_number = entry.data[CONF_REG_NUMBER]
+    coordinator: DVLACoordinator = hass.data[DOMAIN][entry.entry_id]
 
     calendars = entry.data.get(CONF_CALENDARS,{})
 
-    session = async_get_clientsession(hass)
-    coordinator = DVLACoordinator(hass, session, entry.data)
+    if sync_calendars := [calendar for calendar in calendars if calendar != "None"]:
+        # Syncs run one at a time, so one cannot read a calendar before
+        # another has created the events both would add.
+        sync_lock = asyncio.Lock()
+
+        async def _async_sync_vehicles(reg_numbers: list[str]) -> None:
+            """Sync upcoming events for some vehicles once no sync is running."""
+            async with sync_lock:
+                today = dt_util.now().date()
+                events = [
+                    event
+                    for reg_number in reg_numbers
+                    for event in vehicle_events(coordinator, reg_number)
+                    if event.start >= today
+                ]
+                await async_sync_calendars(hass, entry, sync_calendars, events)
+
+        @callback
+        def _async_sync(reg_numbers: list[str]) -> None:
+            """Sync upcoming events for some vehicles in the background."""
+            entry.async_create_background_task(
+                hass, _async_sync_vehicles(reg_numbers), f"{DOMAIN} calendar sync"
+            )
+
+        @callback
+        def _async_handle_update() -> None:
+            """Sync the vehicles changed by a refresh."""
+            _async_sync(list(coordinator.changed))
+
+        _async_sync(coordinator.reg_numbers)
+        entry.async_on_unload(coordinator.async_add_listener(_async_handle_update))
 
-    await coordinator.async_refresh()
+    if "None" in calendars:
+        async_add_entities(
+            DVLACalendarSensor(coordinator, reg_number)
+            for reg_number in coordinator.reg_numbers
+        )
 
-    sensors = [DVLACalendarSensor(coordinator, reg_number)]
 
-    for calendar in calendars:
-        if calendar != "None":
-            for sensor in sensors:
-                events = sensor.get_events(datetime.today(), reg_number)
-                for event in events:
-                    await add_to_calendar(hass, calendar, event, entry)
+def vehicle_events(
+    coordinator: DVLACoordinator, reg_number: str
+) -> list[CalendarEvent]:
+    """Return a vehicle's events, sorted by date."""
+    events = []
+    if (vehicle := coordinator.vehicle(reg_number)) is not None:
+        for date_sensor_type in DATE_SENSOR_TYPES:
+            value: date | None = vehicle.get(date_sensor_type.key)
+            if value is None:
+                continue
+            event_name = date_sensor_type.name.replace(" Date", f" - {reg_number}")
+            events.append(CalendarEvent(value, value, event_name))
 
-    if "None" in calendars:
-        async_add_entities(sensors, update_before_add=True)
+    events.sort(key=lambda event: event.start)
+    return events
 
 
 async def create_event(hass: HomeAssistant, service_data):
@@ -96,68 +138,137 @@ def generate_uuid_from_json(json_obj):
     return str(uuid.UUID(bytes=sha1_hash[:16]))
 
 
-async def get_event_uid(hass: HomeAssistant, service_data) -> str | None:
-    """Fetch the created event by matching with details in service_data."""
-    entity_id = service_data.get("entity_id")
-    start_time = service_data.get("start_date")
-    end_time = service_data.get("end_date")
+def _event_key(start, summary, description, location) -> tuple[str, ...]:
+    """Return the fields used to match a DVLA event to an existing one."""
+    return (str(start)[:10], f"{summary}", f"{description}", f"{location}")
+
+
+async def get_existing_events(
+    hass: HomeAssistant, calendar: str, start: date, end: date
+) -> set[tuple[str, ...]] | None:
+    """Fetch the keys of every event in a calendar between two dates.
 
+    Returns None when the calendar could not be read.
+    """
     try:
-        events = await hass.services.async_call(
+        response = await hass.services.async_call(
             "calendar",
             "get_events",
             {
-                "entity_id": entity_id,
-                "start_date_time": f"{start_time}T00:00:00+0000",
-                "end_date_time": f"{end_time}T00:00:00+0000",
+                "entity_id": calendar,
+                "start_date_time": f"{start}T00:00:00+0000",
+                "end_date_time": f"{end + timedelta(days=1)}T00:00:00+0000",
             },
             return_response=True,
             blocking=True,
         )
     except (ServiceValidationError, HomeAssistantError):
-        events = None
-
-    if events is not None and entity_id in events:
-        for event in events[entity_id].get("events"):
-            if (
-                event["summary"] == service_data["summary"]
-                and f"{event["description"]}" == f"{service_data["description"]}"
-                and f"{event["location"]}" == f"{service_data["location"]}"
-            ):
-                return generate_uuid_from_json(service_data)
-
-    return None
-
-
-async def add_to_calendar(
-    hass: HomeAssistant, calendar: str, event: CalendarEvent, entry: ConfigEntry
-):
-    """Add an event to the calendar."""
-
-    service_data = {
-        "entity_id": calendar,
-        "start_date": event.start,
-        "end_date": event.end,
-        "summary": event.summary,
-        "description": f"{event.description}",
-        "location": f"{event.location}",
+        return None
+
+    if response is None or calendar not in response:
+        return None
+
+    return {
+        _event_key(
+            event.get("start"),
+            event.get("summary"),
+            event.get("description"),
+            event.get("location"),
+        )
+        for event in response[calendar].get("events", [])
     }
 
-    uid = await get_event_uid(hass, service_data)
 
-    uids = entry.data.get("uids", [])
+async def async_sync_calendar(
+    hass: HomeAssistant, calendar: str, events: list[CalendarEvent]
+) -> set[str]:
+    """Reconcile a calendar with the DVLA events that should be in it.
+
+    Existing events are fetched once for the whole date range and compared
+    in memory; only the missing events are created, concurrently. Returns
+    the uids of the events now in the calendar, leaving out any that could
+    not be created.
+    """
+    desired = [
+        {
+            "entity_id": calendar,
+            "start_date": event.start,
+            "end_date": event.end,
+            "summary": event.summary,
+            "description": f"{event.description}",
+            "location": f"{event.location}",
+        }
+        for event in events
+    ]
+
+    existing = await get_existing_events(
+        hass,
+        calendar,
+        min(service_data["start_date"] for service_data in desired),
+        max(service_data["end_date"] for service_data in desired),
+    )
+    if existing is None:
+        return set()
+
+    missing = [
+        service_data
+        for service_data in desired
+        if _event_key(
+            service_data["start_date"],
+            service_data["summary"],
+            service_data["description"],
+            service_data["location"],
+        )
+        not in existing
+    ]
+
+    semaphore = asyncio.Semaphore(CALENDAR_SYNC_CONCURRENCY)
+
+    async def async_create(service_data) -> bool:
+        async with semaphore:
+            try:
+                await create_event(hass, service_data)
+            except HomeAssistantError as err:
+                _LOGGER.warning(
+                    "Could not add %s to %s: %s", service_data["summary"], calendar, err
+                )
+                return False
+        return True
+
+    created = await asyncio.gather(
+        *(async_create(service_data) for service_data in missing)
+    )
+    failed = [
+        service_data for service_data, success in zip(missing, created) if not success
+    ]
+
+    return {
+        generate_uuid_from_json(service_data)
+        for service_data in desired
+        if service_data not in failed
+    }
 
-    if uid not in uids:
-        await create_event(hass, service_data)
 
-        created_event_uid = await get_event_uid(hass, service_data)
+async def async_sync_calendars(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    calendars: list[str],
+    events: list[CalendarEvent],
+) -> None:
+    """Add the DVLA events to each selected calendar and record their uids."""
+    if not events:
+        return
+
+    results = await asyncio.gather(
+        *(async_sync_calendar(hass, calendar, events) for calendar in calendars)
+    )
 
-        if created_event_uid is not None and created_event_uid not in uids:
-            uids.append(created_event_uid)
+    uids = entry.data.get("uids", [])
+    new_uids = [uid for uid in set().union(*results) if uid not in uids]
 
-    if uids != entry.data.get("uids", []):
+    if new_uids:
         updated_data = entry.data.copy()
-        updated_data["uids"] = uids
+        updated_data["uids"] = [*uids, *sorted(new_uids)]
         hass.config_entries.async_update_entry(entry, data=updated_data)
 
 
@@ -174,37 +285,65 @@ class DVLACalendarSensor(CoordinatorEntity[DVLACoordinator], CalendarEntity):
         self._attr_device_info = DeviceInfo(
             identifiers={(DOMAIN, f"{reg_number}")},
             manufacturer=DOMAIN.upper(),
-            model=coordinator.data.get("make"),
+            model=(
+                vehicle.make
+                if (vehicle := coordinator.vehicle(reg_number))
+                else None
+            ),
             name=reg_number.upper(),
             configuration_url="https://github.com/jampez77/DVLA-Vehicle-Checker/",
         )
         self._attr_unique_id = f"{DOMAIN}-{reg_number}-calendar".lower()
         self._attr_name = f"{DOMAIN} - {reg_number}".upper()
         self.reg_number = reg_number
+        # Every event for the vehicle sorted by date, with their start dates
+        # kept alongside for bisecting.
+        self._events: list[CalendarEvent] = []
+        self._starts: list[date] = []
+        self._next_event: CalendarEvent | None = None
+        self._build_index()
+
+    def _build_index(self) -> None:
+        """Build the sorted event index from the coordinator data."""
+        self._events = vehicle_events(self.coordinator, self.reg_number)
+        self._starts = [event.start for event in self._events]
+        self._update_next_event()
+
+    def _update_next_event(self) -> None:
+        """Find the next upcoming event."""
+        index = bisect_left(self._starts, dt_util.now().date())
+        self._next_event = self._events[index] if index < len(self._events) else None
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Handle updated data from the coordinator."""
+        self._build_index()
+        super()._handle_coordinator_update()
+
+    @callback
+    def _async_midnight(self, now: datetime) -> None:
+        """Drop events that have passed when the date changes."""
+        self._update_next_event()
+        self.async_write_ha_state()
+
+    async def async_added_to_hass(self) -> None:
+        """Handle adding to Home Assistant."""
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            async_track_time_change(
+                self.hass, self._async_midnight, hour=0, minute=0, second=0
+            )
+        )
 
     @property
     def available(self) -> bool:
         """Return True if entity is available."""
-        return bool(self.coordinator.data)
+        return self.coordinator.vehicle(self.reg_number) is not None
 
     @property
     def event(self) -> CalendarEvent | None:
         """Return the next upcoming event."""
-        events = self.get_events(datetime.today(), self.reg_number)
-        return sorted(events, key=lambda c: c.start)[0]
-
-    def get_events(self, start_date: datetime, reg_number: str) -> list[CalendarEvent]:
-        """Return calendar events."""
-        events = []
-        for date_sensor_type in DATE_SENSOR_TYPES:
-            raw_value = self.coordinator.data.get(date_sensor_type.key)
-            if not raw_value:
-                continue
-            value = date.fromisoformat(raw_value)
-            if value >= start_date.date():
-                event_name = date_sensor_type.name.replace(" Date", f" - {reg_number}")
-                events.append(CalendarEvent(value, value, event_name))
-        return events
+        return self._next_event
 
     async def async_get_events(
         self,
@@ -213,8 +352,8 @@ class DVLACalendarSensor(CoordinatorEntity[DVLACoordinator], CalendarEntity):
         end_date: datetime,
     ) -> list[CalendarEvent]:
         """Return calendar events within a datetime range."""
-        return [
-            event
-            for event in self.get_events(start_date, self.reg_number)
-            if event.start <= end_date.date()
+        return self._events[
+            bisect_left(self._starts, start_date.date()) : bisect_right(
+                self._starts, end_date.date()
+            )
         ]
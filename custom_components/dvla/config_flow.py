@@ -3,7 +3,10 @@
 from __future__ import annotations
 
 from collections import OrderedDict
+import csv
+import io
 import logging
+import re
 from typing import Any
 
 import voluptuous as vol
@@ -13,16 +16,78 @@ from homeassistant.components.calendar import CalendarEntityFeature
 from homeassistant.const import CONF_API_KEY, CONF_SCAN_INTERVAL
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.data_entry_flow import FlowResult
-from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers import entity_registry as er
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
 import homeassistant.helpers.config_validation as cv
-
-from .const import CONF_CALENDARS, CONF_REG_NUMBER, DOMAIN
-from .coordinator import DVLACoordinator
+from homeassistant.helpers.selector import TextSelector, TextSelectorConfig
+from homeassistant.util import dt as dt_util
+
+from .cache import async_get_cache_settings_entry, async_get_handoff
+from .const import (
+    CONF_ADAPTIVE_POLLING,
+    CONF_API_KEYS,
+    CONF_ATTRIBUTES,
+    CONF_CACHE_SIZE,
+    CONF_CACHE_TTL,
+    CONF_CALENDARS,
+    CONF_COMPACT_ATTRIBUTES,
+    CONF_MONTHLY_BUDGET,
+    CONF_RATE_LIMIT,
+    CONF_REG_NUMBER,
+    CONF_REG_NUMBERS,
+    CONF_STARTUP_WINDOW,
+    DEFAULT_ADAPTIVE_POLLING,
+    DEFAULT_CACHE_SIZE,
+    DEFAULT_CACHE_TTL,
+    DEFAULT_COMPACT_ATTRIBUTES,
+    DEFAULT_MONTHLY_BUDGET,
+    DEFAULT_RATE_LIMIT,
+    DEFAULT_SCAN_INTERVAL,
+    DEFAULT_STARTUP_WINDOW,
+    DOMAIN,
+    VEHICLE_ATTRIBUTES,
+)
+from .coordinator import (
+    CannotConnect,
+    DVLACoordinator,
+    DVLAError,
+    InvalidAuth,
+    async_fetch_many,
+    async_fetch_vehicle,
+    async_get_session,
+    normalise_registration,
+    registrations_from_config,
+)
+from .limiter import async_get_limiter
 
 _LOGGER = logging.getLogger(__name__)
 
+# Headers that mark the registration column of a CSV import, compared
+# without case, spaces or punctuation.
+REGISTRATION_HEADERS = {
+    "licenceplate",
+    "licenseplate",
+    "numberplate",
+    "plate",
+    "reg",
+    "regno",
+    "regnumber",
+    "registration",
+    "registrationmark",
+    "registrationnumber",
+    "vehiclereg",
+    "vehicleregistration",
+    "vehicleregistrationmark",
+    "vrm",
+    "vrn",
+}
+
+# Requests per second and monthly budget, for an entry or a single API key.
+RATE_LIMIT_VALIDATOR = vol.All(vol.Coerce(float), vol.Range(min=0.01))
+MONTHLY_BUDGET_VALIDATOR = cv.positive_int
+
+# A normalised registration is up to seven letters and digits.
+REGISTRATION_PATTERN = re.compile(r"[A-Z0-9]{1,7}")
+
 
 async def _get_calendar_entities(hass: HomeAssistant) -> list[str]:
     """Retrieve calendar entities."""
@@ -48,20 +113,139 @@ async def _get_calendar_entities(hass: HomeAssistant) -> list[str]:
     return calendar_entities
 
 
+def _parse_registrations(value: str) -> list[str]:
+    """Split a pasted list of registrations, normalising and de-duplicating."""
+    reg_numbers = (
+        normalise_registration(reg_number) for reg_number in re.split(r"[,;\n]", value)
+    )
+    return list(dict.fromkeys(reg_number for reg_number in reg_numbers if reg_number))
+
+
+def _parse_api_keys(value: str, main_key: str) -> list[dict[str, Any]]:
+    """Read a pasted list of extra API keys, dropping the main key and repeats.
+
+    Each key may be followed by its own rate and monthly budget, as
+    ``key:rate:budget`` or ``key:rate``; either may be left empty to use
+    the entry's. Raises vol.Invalid for a malformed rate or budget.
+    """
+    api_keys: dict[str, dict[str, Any]] = {}
+    for token in re.split(r"[,;\s]", value):
+        if not token:
+            continue
+        api_key, *limits = token.split(":")
+        if not api_key or len(limits) > 2:
+            raise vol.Invalid(f"Invalid API key: {token}")
+        extra: dict[str, Any] = {CONF_API_KEY: api_key}
+        for key, validator, limit in zip(
+            (CONF_RATE_LIMIT, CONF_MONTHLY_BUDGET),
+            (RATE_LIMIT_VALIDATOR, MONTHLY_BUDGET_VALIDATOR),
+            limits,
+        ):
+            if limit:
+                extra[key] = validator(limit)
+        if api_key != main_key:
+            api_keys.setdefault(api_key, extra)
+    return list(api_keys.values())
+
+
+def _format_api_keys(api_keys: list[dict[str, Any]]) -> str:
+    """Return extra API keys in the form _parse_api_keys reads."""
+    lines = []
+    for extra in api_keys:
+        fields = [
+            extra[CONF_API_KEY],
+            str(extra.get(CONF_RATE_LIMIT, "")),
+            str(extra.get(CONF_MONTHLY_BUDGET, "")),
+        ]
+        while not fields[-1]:
+            fields.pop()
+        lines.append(":".join(fields))
+    return "\n".join(lines)
+
+
+def _header_key(cell: str) -> str:
+    """Return a CSV header cell without case, spaces or punctuation."""
+    return re.sub(r"[\s._-]", "", cell).casefold()
+
+
+def _parse_import(value: str) -> tuple[list[str], list[str]]:
+    """Read registrations from a pasted list or CSV.
+
+    Input is read as CSV only when its first row has a recognised
+    registration header, taking that column. Otherwise every cell is a
+    plate, whether separated by lines, commas or semicolons. Returns the
+    registrations and the pieces of input that are not a registration.
+    """
+    rows = [
+        row
+        for row in csv.reader(io.StringIO(value))
+        if any(cell.strip() for cell in row)
+    ]
+    column = next(
+        (
+            index
+            for index, cell in enumerate(rows[0] if rows else [])
+            if _header_key(cell) in REGISTRATION_HEADERS
+        ),
+        None,
+    )
+    reg_numbers: list[str] = []
+    unparsed: list[str] = []
+    if column is None:
+        cells = [part for row in rows for cell in row for part in cell.split(";")]
+    else:
+        cells = []
+        for row in rows[1:]:
+            if len(row) > column and row[column].strip():
+                cells.append(row[column])
+            else:
+                # A row without a registration is reported whole.
+                unparsed.append(",".join(row))
+
+    for cell in cells:
+        if not (cell := cell.strip()):
+            continue
+        if REGISTRATION_PATTERN.fullmatch(reg_number := normalise_registration(cell)):
+            reg_numbers.append(reg_number)
+        else:
+            unparsed.append(cell)
+    return list(dict.fromkeys(reg_numbers)), list(dict.fromkeys(unparsed))
+
+
+def _fleet_title(reg_numbers: list[str]) -> str:
+    """Return the title of a fleet entry."""
+    return f"Fleet ({len(reg_numbers)} vehicles)"
+
+
+def _configured_registrations(hass: HomeAssistant) -> set[str]:
+    """Return every registration already configured, in any entry."""
+    return {
+        normalise_registration(reg_number)
+        for entry in hass.config_entries.async_entries(DOMAIN)
+        for reg_number in registrations_from_config(entry.data)
+    }
+
+
 async def validate_input(hass: HomeAssistant, data: dict[str, Any]) -> dict[str, Any]:
     """Validate the user input allows us to connect.
 
     Data has the keys from STEP_USER_DATA_SCHEMA with values provided by the user.
     """
-    session = async_get_clientsession(hass)
-    coordinator = DVLACoordinator(hass, session, data)
+    session = async_get_session(hass)
+    limiter = await async_get_limiter(hass, data[CONF_API_KEY])
+    coordinator = DVLACoordinator(hass, session, data, limiter)
 
     await coordinator.async_refresh()
 
     if coordinator.last_exception is not None:
         raise InvalidAuth
 
+    # Let the new entry start from these responses instead of fetching again.
+    coordinator.async_hand_off()
+
     # Return info that you want to store in the config entry.
+    if CONF_REG_NUMBERS in data:
+        return {"title": _fleet_title(data[CONF_REG_NUMBERS])}
     return {"title": str(data[CONF_REG_NUMBER]).upper()}
 
 
@@ -84,24 +268,100 @@ class DVLAFlowHandler(config_entries.OptionsFlow):
             {
                 vol.Required(
                     CONF_SCAN_INTERVAL,
-                    default=self.config_entry.data.get(CONF_SCAN_INTERVAL, 21600),
+                    default=self.config_entry.data.get(
+                        CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL
+                    ),
+                ): cv.positive_int,
+                vol.Required(
+                    CONF_ADAPTIVE_POLLING,
+                    default=self.config_entry.data.get(
+                        CONF_ADAPTIVE_POLLING, DEFAULT_ADAPTIVE_POLLING
+                    ),
+                ): cv.boolean,
+                vol.Required(
+                    CONF_STARTUP_WINDOW,
+                    default=self.config_entry.data.get(
+                        CONF_STARTUP_WINDOW, DEFAULT_STARTUP_WINDOW
+                    ),
                 ): cv.positive_int,
                 vol.Required(
                     CONF_CALENDARS,
                     default=self.config_entry.data.get(CONF_CALENDARS, []),
                 ): cv.multi_select(calendar_entities),
+                vol.Required(
+                    CONF_COMPACT_ATTRIBUTES,
+                    default=self.config_entry.data.get(
+                        CONF_COMPACT_ATTRIBUTES, DEFAULT_COMPACT_ATTRIBUTES
+                    ),
+                ): cv.boolean,
+                vol.Required(
+                    CONF_ATTRIBUTES,
+                    default=self.config_entry.data.get(CONF_ATTRIBUTES, []),
+                ): cv.multi_select(VEHICLE_ATTRIBUTES),
+                vol.Optional(
+                    CONF_API_KEYS,
+                    default=_format_api_keys(
+                        self.config_entry.data.get(CONF_API_KEYS, [])
+                    ),
+                ): TextSelector(TextSelectorConfig(multiline=True)),
+                vol.Required(
+                    CONF_RATE_LIMIT,
+                    default=self.config_entry.data.get(
+                        CONF_RATE_LIMIT, DEFAULT_RATE_LIMIT
+                    ),
+                ): RATE_LIMIT_VALIDATOR,
+                vol.Required(
+                    CONF_MONTHLY_BUDGET,
+                    default=self.config_entry.data.get(
+                        CONF_MONTHLY_BUDGET, DEFAULT_MONTHLY_BUDGET
+                    ),
+                ): MONTHLY_BUDGET_VALIDATOR,
             }
         )
 
-        if user_input is not None:
-            self.hass.config_entries.async_update_entry(
-                self.config_entry, data=user_input, options=self.config_entry.options
+        # The lookup cache is shared, so only the entry that owns its
+        # settings offers them.
+        settings_entry = async_get_cache_settings_entry(self.hass)
+        if settings_entry and settings_entry.entry_id == self.config_entry.entry_id:
+            options_schema = options_schema.extend(
+                {
+                    vol.Required(
+                        CONF_CACHE_TTL,
+                        default=self.config_entry.data.get(
+                            CONF_CACHE_TTL, DEFAULT_CACHE_TTL
+                        ),
+                    ): cv.positive_int,
+                    vol.Required(
+                        CONF_CACHE_SIZE,
+                        default=self.config_entry.data.get(
+                            CONF_CACHE_SIZE, DEFAULT_CACHE_SIZE
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=1)),
+                }
             )
-            return self.async_create_entry(title="", data={})
+
+        errors: dict[str, str] = {}
+
+        if user_input is not None:
+            try:
+                user_input[CONF_API_KEYS] = _parse_api_keys(
+                    user_input.get(CONF_API_KEYS, ""),
+                    self.config_entry.data[CONF_API_KEY],
+                )
+            except vol.Invalid:
+                errors[CONF_API_KEYS] = "invalid_api_keys"
+            else:
+                self.hass.config_entries.async_update_entry(
+                    self.config_entry,
+                    data={**self.config_entry.data, **user_input},
+                    options=self.config_entry.options,
+                )
+                return self.async_create_entry(title="", data={})
 
         return self.async_show_form(
             step_id="init",
             data_schema=options_schema,
+            errors=errors,
         )
 
 
@@ -110,10 +370,21 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
     VERSION = 1
 
+    # Validated plates and the per-plate report from the import step.
+    _import: dict[str, Any]
+
     async def async_step_user(
         self, user_input: dict[str, Any] | None = None
     ) -> FlowResult:
         """Handle the initial step."""
+        return self.async_show_menu(
+            step_id="user", menu_options=["vehicle", "fleet", "import_fleet"]
+        )
+
+    async def async_step_vehicle(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Handle adding a single vehicle."""
 
         errors: dict[str, str] = {}
 
@@ -131,7 +402,7 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 ): cv.string,
                 vol.Required(
                     CONF_SCAN_INTERVAL,
-                    default=user_input.get(CONF_SCAN_INTERVAL, 21600),
+                    default=user_input.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL),
                 ): cv.positive_int,
                 vol.Required(
                     CONF_CALENDARS, default=user_input.get(CONF_CALENDARS, [])
@@ -140,15 +411,13 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         )
         if user_input is None:
             return self.async_show_form(
-                step_id="user", data_schema=STEP_USER_DATA_SCHEMA
+                step_id="vehicle", data_schema=STEP_USER_DATA_SCHEMA
             )
 
         if user_input:
-            entries = self.hass.config_entries.async_entries(DOMAIN)
-
-            if any(
-                entry.data.get(CONF_REG_NUMBER) == user_input.get(CONF_REG_NUMBER)
-                for entry in entries
+            if (
+                normalise_registration(user_input.get(CONF_REG_NUMBER))
+                in _configured_registrations(self.hass)
             ):
                 errors["base"] = "vehicle_exists"
 
@@ -169,7 +438,233 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                     return self.async_create_entry(title=info["title"], data=user_input)
 
         return self.async_show_form(
-            step_id="user", data_schema=STEP_USER_DATA_SCHEMA, errors=errors
+            step_id="vehicle", data_schema=STEP_USER_DATA_SCHEMA, errors=errors
+        )
+
+    async def async_step_fleet(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Handle adding a fleet of vehicles that share one coordinator."""
+
+        errors: dict[str, str] = {}
+
+        calendar_entities = await _get_calendar_entities(self.hass)
+
+        user_input = user_input or {}
+
+        STEP_FLEET_DATA_SCHEMA = vol.Schema(
+            {
+                vol.Required(
+                    CONF_API_KEY, default=user_input.get(CONF_API_KEY, "")
+                ): cv.string,
+                vol.Required(
+                    CONF_REG_NUMBERS, default=user_input.get(CONF_REG_NUMBERS, "")
+                ): TextSelector(TextSelectorConfig(multiline=True)),
+                vol.Required(
+                    CONF_SCAN_INTERVAL,
+                    default=user_input.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL),
+                ): cv.positive_int,
+                vol.Required(
+                    CONF_CALENDARS, default=user_input.get(CONF_CALENDARS, [])
+                ): cv.multi_select(calendar_entities),
+            }
+        )
+
+        if user_input:
+            reg_numbers = _parse_registrations(user_input[CONF_REG_NUMBERS])
+
+            if not reg_numbers:
+                errors[CONF_REG_NUMBERS] = "no_vehicles"
+            elif _configured_registrations(self.hass).intersection(reg_numbers):
+                errors["base"] = "vehicle_exists"
+
+            if not user_input.get(CONF_CALENDARS):
+                errors["base"] = "no_calendar_selected"
+
+            if not errors:
+                data = {**user_input, CONF_REG_NUMBERS: reg_numbers}
+                try:
+                    info = await validate_input(self.hass, data)
+                except InvalidAuth:
+                    errors["base"] = "invalid_auth"
+                except Exception:  # pylint: disable=broad-except
+                    _LOGGER.exception("Unexpected exception")
+                    errors["base"] = "unknown"
+                else:
+                    return self.async_create_entry(title=info["title"], data=data)
+
+        return self.async_show_form(
+            step_id="fleet", data_schema=STEP_FLEET_DATA_SCHEMA, errors=errors
+        )
+
+    async def async_step_import_fleet(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Handle importing a pasted list or CSV of vehicles.
+
+        Plates already configured are skipped and the rest are validated
+        concurrently under the API key's rate limiter.
+        """
+
+        errors: dict[str, str] = {}
+        report = ""
+
+        calendar_entities = await _get_calendar_entities(self.hass)
+
+        user_input = user_input or {}
+
+        STEP_IMPORT_DATA_SCHEMA = vol.Schema(
+            {
+                vol.Required(
+                    CONF_API_KEY, default=user_input.get(CONF_API_KEY, "")
+                ): cv.string,
+                vol.Required(
+                    CONF_REG_NUMBERS, default=user_input.get(CONF_REG_NUMBERS, "")
+                ): TextSelector(TextSelectorConfig(multiline=True)),
+                vol.Required(
+                    CONF_SCAN_INTERVAL,
+                    default=user_input.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL),
+                ): cv.positive_int,
+                vol.Required(
+                    CONF_CALENDARS, default=user_input.get(CONF_CALENDARS, [])
+                ): cv.multi_select(calendar_entities),
+            }
+        )
+
+        if user_input:
+            configured = _configured_registrations(self.hass)
+            reg_numbers, unparsed = _parse_import(user_input[CONF_REG_NUMBERS])
+            new_reg_numbers = [
+                reg_number for reg_number in reg_numbers if reg_number not in configured
+            ]
+
+            if not reg_numbers:
+                errors[CONF_REG_NUMBERS] = "no_vehicles"
+                report = _import_report({}, unparsed=unparsed)
+            elif not new_reg_numbers:
+                errors["base"] = "vehicle_exists"
+
+            if not user_input.get(CONF_CALENDARS):
+                errors["base"] = "no_calendar_selected"
+
+            if not errors:
+                api_key = user_input[CONF_API_KEY]
+                session = async_get_session(self.hass)
+                limiter = await async_get_limiter(self.hass, api_key)
+                results = await async_fetch_many(
+                    lambda reg_number: async_fetch_vehicle(
+                        session, api_key, reg_number, limiter
+                    ),
+                    new_reg_numbers,
+                )
+
+                failed = {
+                    reg_number: str(result)
+                    for reg_number, result in results.items()
+                    if isinstance(result, DVLAError)
+                }
+                handoff = async_get_handoff(self.hass)
+                fetched = dt_util.utcnow().isoformat()
+                for reg_number, result in results.items():
+                    if not isinstance(result, DVLAError):
+                        handoff.set(reg_number, {"fetched": fetched, "data": result})
+                valid = [
+                    reg_number
+                    for reg_number in new_reg_numbers
+                    if reg_number not in failed
+                ]
+
+                if any(
+                    isinstance(result, InvalidAuth) for result in results.values()
+                ) and not valid:
+                    errors["base"] = "invalid_auth"
+                else:
+                    self._import = {
+                        "data": {**user_input, CONF_REG_NUMBERS: valid},
+                        "failed": failed,
+                        "skipped": [
+                            reg_number
+                            for reg_number in reg_numbers
+                            if reg_number in configured
+                        ],
+                        "unparsed": unparsed,
+                    }
+                    if valid and not (failed or self._import["skipped"] or unparsed):
+                        return await self.async_step_import_report({})
+                    if valid:
+                        return await self.async_step_import_report()
+                    errors["base"] = "no_valid_vehicles"
+                    report = _import_report(failed, unparsed=unparsed)
+
+        return self.async_show_form(
+            step_id="import_fleet",
+            data_schema=STEP_IMPORT_DATA_SCHEMA,
+            errors=errors,
+            description_placeholders={"report": report},
+        )
+
+    async def async_step_import_report(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Show the plates that failed validation, then add the rest.
+
+        Valid plates join an existing fleet using the same API key, or
+        become a new fleet entry. A fleet they join also gets the imported
+        calendars, but keeps its own scan interval.
+        """
+        data = self._import["data"]
+
+        if user_input is None:
+            return self.async_show_form(
+                step_id="import_report",
+                description_placeholders={
+                    "count": str(len(data[CONF_REG_NUMBERS])),
+                    "report": _import_report(
+                        self._import["failed"],
+                        self._import["skipped"],
+                        self._import["unparsed"],
+                    ),
+                },
+            )
+
+        for entry in self.hass.config_entries.async_entries(DOMAIN):
+            if (
+                entry.data.get(CONF_API_KEY) == data[CONF_API_KEY]
+                and CONF_REG_NUMBERS in entry.data
+            ):
+                reg_numbers = [*entry.data[CONF_REG_NUMBERS], *data[CONF_REG_NUMBERS]]
+                calendars = list(
+                    dict.fromkeys(
+                        [*entry.data.get(CONF_CALENDARS, []), *data[CONF_CALENDARS]]
+                    )
+                )
+                self.hass.config_entries.async_update_entry(
+                    entry,
+                    title=_fleet_title(reg_numbers),
+                    data={
+                        **entry.data,
+                        CONF_REG_NUMBERS: reg_numbers,
+                        CONF_CALENDARS: calendars,
+                    },
+                )
+                scan_interval = entry.data.get(
+                    CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL
+                )
+                return self.async_abort(
+                    reason=(
+                        "import_added"
+                        if data[CONF_SCAN_INTERVAL] == scan_interval
+                        else "import_added_interval_kept"
+                    ),
+                    description_placeholders={
+                        "count": str(len(data[CONF_REG_NUMBERS])),
+                        "title": entry.title,
+                        "scan_interval": str(scan_interval),
+                    },
+                )
+
+        return self.async_create_entry(
+            title=_fleet_title(data[CONF_REG_NUMBERS]), data=data
         )
 
     @staticmethod
@@ -181,9 +676,13 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         return DVLAFlowHandler(config_entry)
 
 
-class CannotConnect(HomeAssistantError):
-    """Error to indicate we cannot connect."""
-
-
-class InvalidAuth(HomeAssistantError):
-    """Error to indicate there is invalid auth."""
+def _import_report(
+    failed: dict[str, str],
+    skipped: list[str] | None = None,
+    unparsed: list[str] | None = None,
+) -> str:
+    """Return a per-plate summary of an import for display in the flow."""
+    lines = [f"- {reg_number}: {error}" for reg_number, error in failed.items()]
+    lines.extend(f"- {reg_number}: already configured" for reg_number in skipped or [])
+    lines.extend(f"- {text}: not a registration" for text in unparsed or [])
+    return "\n".join(lines) or "- none"
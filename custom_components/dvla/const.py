@@ -3,8 +3,80 @@
 DOMAIN = "dvla"
 HOST = "https://driver-vehicle-licensing.api.gov.uk/vehicle-enquiry/v1/vehicles"
 CONF_REG_NUMBER = "reg_number"
+CONF_REG_NUMBERS = "reg_numbers"
 CONF_CALENDARS = "calendars"
+CONF_API_KEYS = "api_keys"
+CONF_RATE_LIMIT = "rate_limit"
+CONF_MONTHLY_BUDGET = "monthly_budget"
+CONF_CACHE_TTL = "cache_ttl"
+CONF_CACHE_SIZE = "cache_size"
+CONF_ADAPTIVE_POLLING = "adaptive_polling"
+CONF_STARTUP_WINDOW = "startup_window"
+CONF_COMPACT_ATTRIBUTES = "compact_attributes"
+CONF_ATTRIBUTES = "attributes"
+
+DEFAULT_SCAN_INTERVAL = 21600
+DEFAULT_MAX_CONCURRENCY = 4
+DEFAULT_RATE_LIMIT = 1.0
+DEFAULT_MONTHLY_BUDGET = 0
+DEFAULT_CACHE_TTL = 3600
+DEFAULT_CACHE_SIZE = 256
+DEFAULT_ADAPTIVE_POLLING = False
+DEFAULT_STARTUP_WINDOW = 0
+DEFAULT_COMPACT_ATTRIBUTES = False
+
+# Every field the Vehicle Enquiry Service can return.
+VEHICLE_ATTRIBUTES = [
+    "registrationNumber",
+    "taxStatus",
+    "taxDueDate",
+    "artEndDate",
+    "motStatus",
+    "motExpiryDate",
+    "make",
+    "monthOfFirstRegistration",
+    "yearOfManufacture",
+    "engineCapacity",
+    "co2Emissions",
+    "fuelType",
+    "markedForExport",
+    "colour",
+    "typeApproval",
+    "wheelplan",
+    "revenueWeight",
+    "realDrivingEmissions",
+    "dateOfLastV5CIssued",
+    "euroStatus",
+]
+
+# Attributes every entity keeps in compact mode.
+COMPACT_ATTRIBUTES = ["registrationNumber"]
+
+# Fields returned for every vehicle, used to create entities before a
+# vehicle's first response arrives.
+CORE_ATTRIBUTES = [
+    "registrationNumber",
+    "taxStatus",
+    "motStatus",
+    "make",
+    "colour",
+    "fuelType",
+    "yearOfManufacture",
+    "markedForExport",
+]
+
+STORAGE_VERSION = 1
 
 SERVICE_LOOKUP = "lookup"
+SERVICE_BULK_LOOKUP = "bulk_lookup"
+SERVICE_QUERY_EXPIRING = "query_expiring"
+EVENT_BULK_LOOKUP_PROGRESS = "dvla_bulk_lookup_progress"
+SIGNAL_FLEET_UPDATED = f"{DOMAIN}_fleet_updated"
 ATTR_REG_NUMBER = "reg_number"
+ATTR_REG_NUMBERS = "reg_numbers"
 ATTR_API_KEY = "api_key"
+ATTR_FORCE_REFRESH = "force_refresh"
+ATTR_DAYS = "days"
+ATTR_FIELD = "field"
+ATTR_STATUS = "status"
+ATTR_INCLUDE_OVERDUE = "include_overdue"
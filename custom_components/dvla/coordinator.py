@@ -1,25 +1,501 @@
 """DVLA Coordinator."""
 
-from datetime import timedelta
+from __future__ import annotations
+
+import asyncio
+from collections import Counter
+from collections.abc import Awaitable, Callable, Iterable
+from datetime import date, datetime, timedelta
+from email.utils import parsedate_to_datetime
+import hashlib
+import json
 import logging
+import math
+import random
+import time
+from typing import Any
+
+import aiohttp
+from aiohttp.hdrs import RETRY_AFTER, USER_AGENT
 
-from homeassistant.const import CONF_API_KEY, CONF_SCAN_INTERVAL, CONTENT_TYPE_JSON
-from homeassistant.core import HomeAssistant
-from homeassistant.exceptions import ConfigEntryAuthFailed, HomeAssistantError
+from homeassistant.const import (
+    CONF_API_KEY,
+    CONF_SCAN_INTERVAL,
+    CONTENT_TYPE_JSON,
+    EVENT_HOMEASSISTANT_CLOSE,
+)
+from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.aiohttp_client import SERVER_SOFTWARE
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.helpers.storage import Store
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.util import dt as dt_util, ssl as ssl_util
 
-from .const import CONF_REG_NUMBER, HOST
+from .const import (
+    COMPACT_ATTRIBUTES,
+    CONF_ADAPTIVE_POLLING,
+    CONF_ATTRIBUTES,
+    CONF_COMPACT_ATTRIBUTES,
+    CONF_REG_NUMBER,
+    CONF_REG_NUMBERS,
+    CONF_STARTUP_WINDOW,
+    DEFAULT_ADAPTIVE_POLLING,
+    DEFAULT_COMPACT_ATTRIBUTES,
+    DEFAULT_MAX_CONCURRENCY,
+    DEFAULT_SCAN_INTERVAL,
+    DEFAULT_STARTUP_WINDOW,
+    DOMAIN,
+    HOST,
+    SIGNAL_FLEET_UPDATED,
+)
+from .breaker import CircuitBreaker
+from .cache import async_get_handoff
+from .fleet import FleetIndex
+from .limiter import RateLimiter, api_key_id
+from .metrics import MetricsRegistry
+from .models import Vehicle, normalise_registration
+from .pool import KeyPool
 
 _LOGGER = logging.getLogger(__name__)
 
+# Registrations due within this window are fetched together, and the
+# coordinator never wakes more often than this.
+MIN_UPDATE_INTERVAL = timedelta(minutes=1)
+SAVE_DELAY = 10
+
+DATA_SESSION = f"{DOMAIN}_session"
+
+# Connection settings for the integration's own HTTP session.
+CONNECTION_LIMIT_PER_HOST = 8
+DNS_CACHE_TTL = 300
+KEEPALIVE_TIMEOUT = 60
+REQUEST_TIMEOUT = aiohttp.ClientTimeout(total=60, connect=10, sock_read=30)
+
+# Adaptive polling never waits longer than this between requests, and aims
+# for this many requests between now and the nearest tax or MOT date.
+ADAPTIVE_MAX_INTERVAL = timedelta(days=7)
+ADAPTIVE_CHECKS_BEFORE_DUE = 4
+
+# Requests that fail with a retryable error are tried up to this many times,
+# backing off exponentially from the base delay. A Retry-After longer than
+# the maximum delay is left to the next update rather than waited out.
+RETRY_ATTEMPTS = 4
+RETRY_BASE_DELAY = 2
+RETRY_MAX_DELAY = 60
+
+# Registrations that still fail after retrying are requested again after
+# this long, doubling on each consecutive failure up to their interval.
+FAILED_RETRY_INTERVAL = timedelta(minutes=5)
+
+
+def registrations_from_config(data: dict[str, Any]) -> list[str]:
+    """Return the registrations configured for an entry."""
+    if reg_numbers := data.get(CONF_REG_NUMBERS):
+        return list(reg_numbers)
+    return [data[CONF_REG_NUMBER]]
+
+
+def changed_keys(old: dict[str, Any], new: dict[str, Any]) -> set[str]:
+    """Return the keys whose values differ between two responses."""
+    return {key for key in old.keys() | new.keys() if old.get(key) != new.get(key)}
+
+
+def body_digest(body: dict[str, Any]) -> str:
+    """Return a digest of a response that ignores key order."""
+    return hashlib.sha256(
+        json.dumps(body, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    ).hexdigest()
+
+
+def phase(reg_number: str) -> float:
+    """Return a stable fraction in [0, 1) for spreading a registration's requests."""
+    digest = hashlib.sha256(normalise_registration(reg_number).encode("utf-8"))
+    return int(digest.hexdigest()[:8], 16) / 0x100000000
+
+
+def next_slot(after: datetime, interval: timedelta, fraction: float) -> datetime:
+    """Return the first time at or after a moment that is on a registration's phase.
+
+    Slots repeat every interval, offset from the epoch by the fraction of
+    the interval, so each registration keeps the same place in the cycle.
+    """
+    period = interval.total_seconds()
+    offset = fraction * period
+    slots = math.ceil((after.timestamp() - offset) / period)
+    return dt_util.utc_from_timestamp(slots * period + offset)
+
+
+def adaptive_interval(
+    vehicle: Vehicle,
+    today: date,
+    floor: timedelta,
+    ceiling: timedelta = ADAPTIVE_MAX_INTERVAL,
+) -> timedelta:
+    """Return how long to wait before requesting a vehicle again.
+
+    The interval shrinks as the tax due or MOT expiry date approaches and
+    stays short just after it passes, which is when the statuses change.
+    """
+    ceiling = max(floor, ceiling)
+    days = [
+        abs((due - today).days)
+        for due in (vehicle.tax_due_date, vehicle.mot_expiry_date)
+        if due is not None
+    ]
+    if not days:
+        return ceiling
+    interval = timedelta(days=min(days)) / ADAPTIVE_CHECKS_BEFORE_DUE
+    return min(max(interval, floor), ceiling)
+
+
+@callback
+def async_get_session(hass: HomeAssistant) -> aiohttp.ClientSession:
+    """Return the integration's HTTP session for the DVLA API.
+
+    The session is shared by every config entry and the lookup services so
+    connections, TLS sessions and DNS results are reused across requests.
+    """
+    if (session := hass.data.get(DATA_SESSION)) is not None and not session.closed:
+        return session
+
+    session = aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(
+            limit_per_host=CONNECTION_LIMIT_PER_HOST,
+            ttl_dns_cache=DNS_CACHE_TTL,
+            keepalive_timeout=KEEPALIVE_TIMEOUT,
+            ssl=ssl_util.get_default_context(),
+        ),
+        timeout=REQUEST_TIMEOUT,
+        headers={USER_AGENT: SERVER_SOFTWARE},
+    )
+    hass.data[DATA_SESSION] = session
+
+    async def _async_close(_event: Event) -> None:
+        await session.close()
+
+    hass.bus.async_listen_once(EVENT_HOMEASSISTANT_CLOSE, _async_close)
+
+    return session
+
+
+async def async_close_session(hass: HomeAssistant) -> None:
+    """Close the integration's HTTP session."""
+    if (session := hass.data.pop(DATA_SESSION, None)) is not None:
+        await session.close()
+
+
+def retry_delay(attempt: int, retry_after: float | None = None) -> float:
+    """Return how long to wait before retrying a request.
+
+    A Retry-After value from the API is honoured as given; otherwise the
+    delay backs off exponentially with full jitter, so plates that failed
+    together do not all retry at the same moment.
+    """
+    if retry_after is not None:
+        return retry_after
+    return random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2**attempt))
+
+
+def _parse_retry_after(value: str | None) -> float | None:
+    """Parse a Retry-After header given in seconds or as an HTTP date."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=dt_util.UTC)
+    return max(0.0, (retry_at - dt_util.utcnow()).total_seconds())
+
+
+def _error_detail(body: Any) -> str | None:
+    """Return the error message from a response body, if it has one."""
+    if not isinstance(body, dict):
+        return None
+    if errors := body.get("errors"):
+        error = errors[0]
+        return f"{error.get('title')}({error.get('code')}) - {error.get('detail')}"
+    return body.get("message")
+
+
+def _check_response(reg_number: str, resp, body: Any) -> dict[str, Any]:
+    """Return a response body, or raise the error its status stands for."""
+    status = resp.status
+    detail = _error_detail(body) or f"status {status}"
+
+    if status < 400:
+        if not isinstance(body, dict) or _error_detail(body) is not None:
+            raise UnknownError(f"Error looking up {reg_number}: {detail}")
+        return body
+
+    if status in (401, 403):
+        raise InvalidAuth(f"Error looking up {reg_number}: {detail}")
+
+    if status == 429:
+        err: RetryableError = APIRatelimitExceeded(
+            f"Error looking up {reg_number}: {detail}"
+        )
+    elif status >= 500:
+        err = ServiceUnavailable(f"Error looking up {reg_number}: {detail}")
+    else:
+        raise UnknownError(f"Error looking up {reg_number}: {detail}")
+
+    err.retry_after = _parse_retry_after(resp.headers.get(RETRY_AFTER))
+    raise err
+
+
+async def _async_request_vehicle(
+    session,
+    api_key: str,
+    reg_number: str,
+    limiter: RateLimiter | None = None,
+    metrics: MetricsRegistry | None = None,
+) -> dict[str, Any]:
+    """Make a single request to the DVLA API, classifying any failure."""
+    if limiter is not None and not await limiter.async_acquire():
+        raise BudgetExhausted(
+            f"Monthly DVLA request budget exhausted, not looking up {reg_number}"
+        )
+
+    started = time.monotonic()
+    try:
+        resp = await session.request(
+            method="POST",
+            url=HOST,
+            headers={
+                "Content-Type": CONTENT_TYPE_JSON,
+                "x-api-key": api_key,
+            },
+            json={"registrationNumber": str(reg_number).upper()},
+        )
+        raw = await resp.read()
+    except (aiohttp.ClientError, TimeoutError) as err:
+        # Includes payload errors from a body cut off mid-response.
+        if metrics is not None:
+            metrics.record(
+                api_key,
+                reg_number,
+                (time.monotonic() - started) * 1000,
+                error=CannotConnect.__name__,
+            )
+        raise CannotConnect(f"Unable to reach the DVLA API: {err}") from err
+
+    latency = (time.monotonic() - started) * 1000
+    try:
+        body = json.loads(raw)
+    except ValueError:
+        body = None
+
+    error: str | None = None
+    try:
+        return _check_response(reg_number, resp, body)
+    except DVLAError as err:
+        error = type(err).__name__
+        raise
+    finally:
+        if metrics is not None:
+            metrics.record(api_key, reg_number, latency, resp.status, len(raw), error)
+
+
+async def _async_request_with_retry(
+    session,
+    api_key: str,
+    reg_number: str,
+    limiter: RateLimiter | None = None,
+    metrics: MetricsRegistry | None = None,
+    failover: bool = False,
+) -> dict[str, Any]:
+    """Request a vehicle, retrying failures that may be transient.
+
+    Rate limited, server and connection errors are tried up to
+    RETRY_ATTEMPTS times. A 429 always holds back every other request made
+    with the same limiter, even when it is raised rather than retried. With
+    failover a 429 is raised straight away, so the caller can move on to
+    another API key.
+    """
+    attempt = 0
+    while True:
+        try:
+            return await _async_request_vehicle(
+                session, api_key, reg_number, limiter, metrics
+            )
+        except RetryableError as err:
+            delay = retry_delay(attempt, err.retry_after)
+            deferred = limiter is not None and isinstance(err, APIRatelimitExceeded)
+            if deferred:
+                limiter.defer(delay)
+                err.retry_after = delay
+            attempt += 1
+            if (
+                attempt == RETRY_ATTEMPTS
+                or delay > RETRY_MAX_DELAY
+                or (failover and isinstance(err, APIRatelimitExceeded))
+            ):
+                raise
+            _LOGGER.debug(
+                "Retrying %s in %.1f seconds after: %s", reg_number, delay, err
+            )
+            if metrics is not None:
+                metrics.record_retry(api_key, reg_number)
+            if not deferred:
+                # A deferred limiter does the waiting for every request.
+                await asyncio.sleep(delay)
+
+
+async def async_fetch_vehicle(
+    session,
+    api_key: str,
+    reg_number: str,
+    limiter: RateLimiter | None = None,
+    breaker: CircuitBreaker | None = None,
+    metrics: MetricsRegistry | None = None,
+    failover: bool = False,
+) -> dict[str, Any]:
+    """Fetch a single vehicle from the DVLA API.
+
+    When a limiter is given each request waits for a slot first, and is
+    never sent once the monthly budget has been spent. When a breaker is
+    given no request is sent while its circuit is open. When metrics are
+    given every request and retry is recorded. While the limiter is held
+    back for longer than RETRY_MAX_DELAY after a 429, the request fails
+    straight away rather than queueing behind it.
+    """
+    if limiter is not None and (resume_in := limiter.resume_in) > RETRY_MAX_DELAY:
+        err = APIRatelimitExceeded(
+            f"DVLA API rate limited for {resume_in:.0f} seconds, "
+            f"not looking up {reg_number}"
+        )
+        err.retry_after = resume_in
+        raise err
+
+    if breaker is None:
+        return await _async_request_with_retry(
+            session, api_key, reg_number, limiter, metrics, failover
+        )
+
+    if not breaker.allow_request():
+        raise CircuitOpen(f"DVLA API circuit is open, not looking up {reg_number}")
+
+    try:
+        body = await _async_request_with_retry(
+            session, api_key, reg_number, limiter, metrics, failover
+        )
+    except (InvalidAuth, RetryableError):
+        breaker.record_failure()
+        raise
+    except BudgetExhausted:
+        # Nothing was sent, so there is nothing to learn about the API.
+        breaker.release()
+        raise
+    except UnknownError:
+        # The API answered, it just had nothing useful for this plate.
+        breaker.record_success()
+        raise
+    except BaseException:
+        breaker.release()
+        raise
+
+    breaker.record_success()
+    return body
+
+
+async def async_fetch_vehicle_from_pool(
+    session,
+    pool: KeyPool,
+    reg_number: str,
+    metrics: MetricsRegistry | None = None,
+) -> dict[str, Any]:
+    """Fetch a single vehicle using the pool key with the most headroom.
+
+    A key that is rejected, rate limited, out of budget or behind an open
+    circuit is set aside and the request fails over to the next best key.
+    """
+    tried: set[str] = set()
+    error: DVLAError | None = None
+
+    while (api_key := pool.select(tried)) is not None:
+        tried.add(api_key)
+        try:
+            return await async_fetch_vehicle(
+                session,
+                api_key,
+                reg_number,
+                pool.limiter(api_key),
+                pool.breaker(api_key),
+                metrics,
+                failover=len(tried) < len(pool),
+            )
+        except (InvalidAuth, APIRatelimitExceeded, BudgetExhausted, CircuitOpen) as err:
+            _LOGGER.debug(
+                "API key %s failed for %s: %s", api_key_id(api_key), reg_number, err
+            )
+            error = err
+
+    if error is not None:
+        raise error
+    if pool.exhausted:
+        raise BudgetExhausted(
+            f"Monthly DVLA request budget exhausted, not looking up {reg_number}"
+        )
+    raise CircuitOpen(f"No DVLA API key is available to look up {reg_number}")
+
+
+async def async_fetch_many(
+    fetch: Callable[[str], Awaitable[dict[str, Any]]],
+    reg_numbers: Iterable[str],
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    on_result: Callable[[str, dict[str, Any] | DVLAError], None] | None = None,
+) -> dict[str, dict[str, Any] | DVLAError]:
+    """Fetch many vehicles through a bounded pool of workers.
+
+    Each registration maps to either its response body or the DVLAError
+    raised while fetching it, so one bad plate never fails the batch.
+    on_result is called as each registration completes.
+    """
+    reg_numbers = list(reg_numbers)
+    results: dict[str, dict[str, Any] | DVLAError] = {}
+    # Workers share one iterator so each registration is fetched exactly once.
+    pending = iter(reg_numbers)
+
+    async def worker() -> None:
+        for reg_number in pending:
+            try:
+                results[reg_number] = await fetch(reg_number)
+            except DVLAError as err:
+                results[reg_number] = err
+            if on_result is not None:
+                on_result(reg_number, results[reg_number])
 
-class DVLACoordinator(DataUpdateCoordinator):
-    """Data coordinator."""
+    workers = min(max_concurrency, len(reg_numbers))
+    await asyncio.gather(*(worker() for _ in range(workers)))
 
-    def __init__(self, hass: HomeAssistant, session, data) -> None:
+    return results
+
+
+class DVLACoordinator(DataUpdateCoordinator[dict[str, Vehicle]]):
+    """Data coordinator for one or more vehicles sharing an API key."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        session,
+        data,
+        limiter: RateLimiter | None = None,
+        store: Store | None = None,
+        breaker: CircuitBreaker | None = None,
+        metrics: MetricsRegistry | None = None,
+        pool: KeyPool | None = None,
+        index: FleetIndex | None = None,
+    ) -> None:
         """Initialize coordinator."""
 
-        scan_interval = data.get(CONF_SCAN_INTERVAL, 21600)
+        scan_interval = data.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL)
         super().__init__(
             hass,
             _LOGGER,
@@ -27,66 +503,310 @@ class DVLACoordinator(DataUpdateCoordinator):
             name="DVLA",
             # Polling interval. Will only be polled if there are subscribers.
             update_interval=timedelta(seconds=scan_interval),
+            # Listeners are only woken when a vehicle actually changed.
+            always_update=False,
         )
         self.session = session
+        # The entry data the coordinator was set up with.
+        self.config = data
         self.api_key = data[CONF_API_KEY]
-        self.reg_number = str(data[CONF_REG_NUMBER]).upper()
+        self.reg_numbers = registrations_from_config(data)
+        self.limiter = limiter
+        self.store = store
+        self.breaker = breaker
+        self.metrics = metrics
+        # Every API key the entry may use; the limiter and breaker above
+        # belong to its main key.
+        self.pool = pool
+        self.scan_interval = timedelta(seconds=scan_interval)
+        self.adaptive = data.get(CONF_ADAPTIVE_POLLING, DEFAULT_ADAPTIVE_POLLING)
+        # Registrations due during this window after setup are spread over it.
+        self.startup_window = timedelta(
+            seconds=data.get(CONF_STARTUP_WINDOW, DEFAULT_STARTUP_WINDOW)
+        )
+        self._started = dt_util.utcnow()
+        # Attributes shown on each entity; None shows the full vehicle record.
+        self.attribute_keys: list[str] | None = None
+        if data.get(CONF_COMPACT_ATTRIBUTES, DEFAULT_COMPACT_ATTRIBUTES):
+            self.attribute_keys = list(
+                dict.fromkeys([*COMPACT_ATTRIBUTES, *data.get(CONF_ATTRIBUTES, [])])
+            )
+        # When each registration was last requested, last fetched successfully,
+        # and last returned a different record.
+        self._attempted: dict[str, datetime] = {}
+        self.fetched: dict[str, datetime] = {}
+        self.updated: dict[str, datetime] = {}
+        # How long to wait before requesting registrations that last failed.
+        self._retry_intervals: dict[str, timedelta] = {}
+        # Keys whose values changed in the last update, by registration.
+        self.changed: dict[str, set[str]] = {}
+        # Digest of the last response for each registration, and how many
+        # refreshes changed the vehicle or returned the same record.
+        self._digests: dict[str, str] = {}
+        self.changed_refreshes: Counter[str] = Counter()
+        self.unchanged_refreshes: Counter[str] = Counter()
+        # Aggregates over every configured vehicle, shared by all entries
+        # and updated for each vehicle that changes. A coordinator without
+        # the shared index, such as one validating a new entry, keeps its own.
+        self.index = FleetIndex() if index is None else index
 
-    async def _async_update_data(self):
-        """Fetch data from API endpoint.
+    def vehicle(self, reg_number: str) -> Vehicle | None:
+        """Return the last known data for a registration."""
+        return (self.data or {}).get(reg_number)
+
+    @property
+    def change_rate(self) -> float | None:
+        """Return the percentage of successful refreshes that changed a vehicle."""
+        changed = self.changed_refreshes.total()
+        if not (total := changed + self.unchanged_refreshes.total()):
+            return None
+        return round(100 * changed / total, 1)
+
+    async def async_load(self) -> None:
+        """Restore the saved responses and schedule the first refresh.
 
-        This is the place to pre-process the data to lookup tables
-        so entities can quickly look up their data.
+        Responses are those saved before the last restart. Vehicles missing
+        from the snapshot are seeded from responses the config flow fetched
+        while validating them. Restored vehicles are not fetched again until
+        their next slot.
         """
-        try:
-            resp = await self.session.request(
-                method="POST",
-                url=HOST,
-                headers={
-                    "Content-Type": CONTENT_TYPE_JSON,
-                    "x-api-key": self.api_key,
-                },
-                json={"registrationNumber": self.reg_number},
+        stored = await self.store.async_load() if self.store is not None else None
+        stored = stored or {}
+        handoff = async_get_handoff(self.hass)
+
+        data: dict[str, Vehicle] = {}
+        handed_off = False
+        for reg_number in self.reg_numbers:
+            if (vehicle := stored.get(reg_number)) is None:
+                if (vehicle := handoff.pop(normalise_registration(reg_number))) is None:
+                    continue
+                handed_off = True
+            if (fetched := dt_util.parse_datetime(vehicle["fetched"])) is None:
+                continue
+            data[reg_number] = Vehicle.from_dict(vehicle["data"])
+            self.index.update(reg_number, data[reg_number])
+            self._digests[reg_number] = body_digest(vehicle["data"])
+            self.fetched[reg_number] = self._attempted[reg_number] = fetched
+            # Snapshots saved before the change time was kept only have fetched.
+            self.updated[reg_number] = (
+                dt_util.parse_datetime(vehicle.get("updated", "")) or fetched
             )
-            body = await resp.json()
-        except InvalidAuth as err:
-            raise ConfigEntryAuthFailed from err
-        except DVLAError as err:
-            raise UpdateFailed(str(err)) from err
-        except ValueError as err:
-            err_str = str(err)
-
-            if "Invalid authentication credentials" in err_str:
-                raise InvalidAuth from err
-            if "API rate limit exceeded." in err_str:
-                raise APIRatelimitExceeded from err
-
-            _LOGGER.exception("Unexpected exception")
-            raise UnknownError from err
-
-        if "errors" in body:
-            error = body["errors"][0]
-            raise UnknownError(
-                f"Error setting up {self.reg_number}: {error['title']}({error['code']}) - {error['detail']}"
+
+        if data:
+            self.changed = {
+                reg_number: set(vehicle.raw) for reg_number, vehicle in data.items()
+            }
+            self.async_set_updated_data(data)
+            async_dispatcher_send(self.hass, SIGNAL_FLEET_UPDATED)
+
+        if handed_off and self.store is not None:
+            self.store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+        self._async_update_interval()
+
+    def due_registrations(self) -> list[str]:
+        """Return the registrations that should be fetched now."""
+        cutoff = dt_util.utcnow() + MIN_UPDATE_INTERVAL
+        return [
+            reg_number
+            for reg_number in self.reg_numbers
+            if (next_due := self._next_due(reg_number)) is None or next_due <= cutoff
+        ]
+
+    def _next_due(self, reg_number: str) -> datetime | None:
+        """Return when a registration is next due, or None if never requested.
+
+        Each registration is requested at its own phase of the interval, so
+        a fleet makes a steady trickle of requests rather than one burst.
+        A registration is requested no sooner than half an interval after
+        its last request, and one falling due during the startup window,
+        including one never requested, waits for its share of the window.
+        """
+        if (attempted := self._attempted.get(reg_number)) is None:
+            if not self.startup_window:
+                return None
+            return self._started + self.startup_window * phase(reg_number)
+
+        interval = self.interval_for(reg_number)
+        retry = self._retry_intervals.get(reg_number)
+        if retry is not None and retry < interval:
+            next_due = attempted + retry
+        else:
+            # A Retry-After longer than the interval moves the plate on to
+            # the first of its slots the API will accept.
+            earliest = max(interval / 2, retry or timedelta())
+            next_due = next_slot(attempted + earliest, interval, phase(reg_number))
+
+        if self.startup_window:
+            next_due = max(
+                next_due, self._started + self.startup_window * phase(reg_number)
             )
+        return next_due
 
-        if "message" in body:
-            raise UnknownError(f"Error setting up {self.reg_number}: {body['message']}")
+    def interval_for(self, reg_number: str) -> timedelta:
+        """Return the polling interval for a registration."""
+        if not self.adaptive or not (vehicle := self.vehicle(reg_number)):
+            return self.scan_interval
+        return adaptive_interval(vehicle, dt_util.now().date(), self.scan_interval)
 
-        return body
+    def _async_update_interval(self) -> None:
+        """Wake up when the next registration is due."""
+        next_due = min(
+            (self._next_due(reg_number) or dt_util.utcnow())
+            for reg_number in self.reg_numbers
+        )
+        self.update_interval = max(next_due - dt_util.utcnow(), MIN_UPDATE_INTERVAL)
+
+    @callback
+    def async_remove_from_index(self) -> None:
+        """Drop this coordinator's vehicles from the fleet index."""
+        for reg_number in self.reg_numbers:
+            self.index.update(reg_number, None)
+        async_dispatcher_send(self.hass, SIGNAL_FLEET_UPDATED)
+
+    def async_hand_off(self) -> None:
+        """Keep the last successful responses for a new entry's first setup."""
+        handoff = async_get_handoff(self.hass)
+        for reg_number, snapshot in self._data_to_save().items():
+            handoff.set(normalise_registration(reg_number), snapshot)
+
+    def _data_to_save(self) -> dict[str, dict[str, Any]]:
+        """Return the last successful response for each registration."""
+        return {
+            reg_number: {
+                "fetched": self.fetched[reg_number].isoformat(),
+                "updated": self.updated.get(
+                    reg_number, self.fetched[reg_number]
+                ).isoformat(),
+                "data": vehicle.raw,
+            }
+            for reg_number, vehicle in (self.data or {}).items()
+            if reg_number in self.fetched
+        }
+
+    async def _async_fetch(self, reg_number: str) -> dict[str, Any]:
+        """Fetch a single vehicle using this coordinator's API keys."""
+        if self.pool is not None and len(self.pool) > 1:
+            return await async_fetch_vehicle_from_pool(
+                self.session, self.pool, reg_number, self.metrics
+            )
+        return await async_fetch_vehicle(
+            self.session,
+            self.api_key,
+            reg_number,
+            self.limiter,
+            self.breaker,
+            self.metrics,
+        )
+
+    async def _async_update_data(self) -> dict[str, Vehicle]:
+        """Fetch data from API endpoint.
+
+        Returns a dict keyed by registration. Only registrations that are due
+        are fetched; the rest, and any that fail, keep their previous data.
+        The update only fails if every fetched registration fails.
+        """
+        results = await async_fetch_many(self._async_fetch, self.due_registrations())
+
+        now = dt_util.utcnow()
+        data = dict(self.data or {})
+        errors: dict[str, DVLAError] = {}
+        self.changed = {}
+
+        for reg_number, result in results.items():
+            if isinstance(result, CircuitOpen):
+                # Keep the last known data and stay due, so the plate is
+                # requested as soon as the circuit lets requests through.
+                _LOGGER.debug("%s", result)
+                continue
+            self._attempted[reg_number] = now
+            if isinstance(result, BudgetExhausted):
+                # Keep the last known data until the budget resets.
+                _LOGGER.debug("%s", result)
+                continue
+            if isinstance(result, DVLAError):
+                _LOGGER.warning("Unable to update %s: %s", reg_number, result)
+                errors[reg_number] = result
+                if isinstance(result, RetryableError):
+                    # Try again sooner than the full interval, backing off
+                    # while the API keeps failing, but never before the API
+                    # said it would accept requests again.
+                    retry = self._retry_intervals.get(reg_number)
+                    retry = (
+                        FAILED_RETRY_INTERVAL
+                        if retry is None
+                        else min(retry * 2, self.interval_for(reg_number))
+                    )
+                    if result.retry_after is not None:
+                        retry = max(retry, timedelta(seconds=result.retry_after))
+                    self._retry_intervals[reg_number] = retry
+            else:
+                self._retry_intervals.pop(reg_number, None)
+                self.fetched[reg_number] = now
+                digest = body_digest(result)
+                if (previous := data.get(reg_number)) is not None and (
+                    self._digests.get(reg_number) == digest
+                ):
+                    # Keep the parsed vehicle, so the data compares equal and
+                    # no listener is woken.
+                    self.unchanged_refreshes[reg_number] += 1
+                    continue
+                self.changed_refreshes[reg_number] += 1
+                self.updated[reg_number] = now
+                self._digests[reg_number] = digest
+                self.changed[reg_number] = changed_keys(
+                    previous.raw if previous else {}, result
+                )
+                data[reg_number] = Vehicle.from_dict(result)
+                self.index.update(reg_number, data[reg_number])
+
+        self._async_update_interval()
+        if self.changed:
+            async_dispatcher_send(self.hass, SIGNAL_FLEET_UPDATED)
+
+        if errors and len(errors) == len(results):
+            raise UpdateFailed(str(next(iter(errors.values()))))
+
+        if self.store is not None and len(errors) < len(results):
+            self.store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+        return data
 
 
 class DVLAError(HomeAssistantError):
     """Base error."""
 
 
+class RetryableError(DVLAError):
+    """Raised for failures that may succeed if the request is retried."""
+
+    # Seconds the API asked us to wait, from the Retry-After header.
+    retry_after: float | None = None
+
+
+class CannotConnect(RetryableError):
+    """Raised when the DVLA API cannot be reached."""
+
+
 class InvalidAuth(DVLAError):
     """Raised when invalid authentication credentials are provided."""
 
 
-class APIRatelimitExceeded(DVLAError):
+class APIRatelimitExceeded(RetryableError):
     """Raised when the API rate limit is exceeded."""
 
 
+class ServiceUnavailable(RetryableError):
+    """Raised when the DVLA API returns a server error."""
+
+
 class UnknownError(DVLAError):
     """Raised when an unknown error occurs."""
+
+
+class BudgetExhausted(DVLAError):
+    """Raised when the monthly request budget has been used up."""
+
+
+class CircuitOpen(DVLAError):
+    """Raised when requests are held back by an open circuit breaker."""
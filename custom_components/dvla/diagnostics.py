@@ -0,0 +1,89 @@
+"""Diagnostics support for DVLA."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_API_KEY
+from homeassistant.core import HomeAssistant
+
+from .cache import async_get_lookup_cache
+from .const import CONF_API_KEYS, DOMAIN
+from .coordinator import DVLACoordinator
+from .limiter import api_key_id
+
+TO_REDACT = {CONF_API_KEY, CONF_API_KEYS}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    coordinator: DVLACoordinator = hass.data[DOMAIN][entry.entry_id]
+    cache = async_get_lookup_cache(hass)
+
+    return {
+        "entry": async_redact_data(dict(entry.data), TO_REDACT),
+        "api_key_id": api_key_id(coordinator.api_key),
+        "update_interval": str(coordinator.update_interval),
+        "last_update_success": coordinator.last_update_success,
+        "limiter": (
+            {
+                **limiter.as_dict(),
+                "rate": limiter.rate,
+                "monthly_budget": limiter.monthly_budget,
+                "remaining": limiter.remaining,
+            }
+            if (limiter := coordinator.limiter) is not None
+            else None
+        ),
+        "circuit_breaker": (
+            {"state": breaker.state, **breaker.as_dict()}
+            if (breaker := coordinator.breaker) is not None
+            else None
+        ),
+        "key_pool": (
+            {
+                api_key_id(api_key): {
+                    **pool.limiter(api_key).as_dict(),
+                    "remaining": pool.limiter(api_key).remaining,
+                    "deferred": pool.limiter(api_key).deferred,
+                    "circuit_breaker": pool.breaker(api_key).state,
+                    "requests": (
+                        coordinator.metrics.for_key(api_key).as_dict()
+                        if coordinator.metrics is not None
+                        else None
+                    ),
+                }
+                for api_key in pool.api_keys
+            }
+            if (pool := coordinator.pool) is not None
+            else None
+        ),
+        "lookup_cache": {
+            "size": len(cache),
+            "hits": cache.hits,
+            "misses": cache.misses,
+        },
+        "requests": (
+            metrics.for_key(coordinator.api_key).as_dict()
+            if (metrics := coordinator.metrics) is not None
+            else None
+        ),
+        "registrations": {
+            reg_number: {
+                "fetched": coordinator.fetched.get(reg_number),
+                "interval": str(coordinator.interval_for(reg_number)),
+                "changed_refreshes": coordinator.changed_refreshes[reg_number],
+                "unchanged_refreshes": coordinator.unchanged_refreshes[reg_number],
+                "requests": (
+                    metrics.for_registration(reg_number).as_dict()
+                    if metrics is not None
+                    else None
+                ),
+            }
+            for reg_number in coordinator.reg_numbers
+        },
+    }
@@ -0,0 +1,131 @@
+"""Base entity for the DVLA integration."""
+
+from __future__ import annotations
+
+from abc import abstractmethod
+from collections.abc import Callable, Iterable
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import callback
+from homeassistant.helpers.entity import DeviceInfo, EntityDescription
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .const import CORE_ATTRIBUTES, DOMAIN
+from .coordinator import DVLACoordinator
+
+
+@callback
+def async_add_vehicle_entities(
+    coordinator: DVLACoordinator,
+    entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+    descriptions: Iterable[EntityDescription],
+    entity_factory: Callable[[DVLACoordinator, str, EntityDescription], DVLAEntity],
+) -> None:
+    """Add an entity for each key a vehicle has, without waiting for data.
+
+    Vehicles with saved data get entities for the keys in that data, and
+    vehicles not yet fetched get entities for CORE_ATTRIBUTES. Entities for
+    any further keys are added when a later response includes them.
+    """
+    descriptions = list(descriptions)
+    added: set[tuple[str, str]] = set()
+
+    @callback
+    def _async_add_new_entities() -> None:
+        entities = []
+        for reg_number in coordinator.reg_numbers:
+            vehicle = coordinator.vehicle(reg_number)
+            for description in descriptions:
+                if (reg_number, description.key) in added:
+                    continue
+                if vehicle is None:
+                    if description.key not in CORE_ATTRIBUTES:
+                        continue
+                elif description.key not in vehicle:
+                    continue
+                added.add((reg_number, description.key))
+                entities.append(entity_factory(coordinator, reg_number, description))
+
+        if entities:
+            async_add_entities(entities)
+
+    _async_add_new_entities()
+    entry.async_on_unload(coordinator.async_add_listener(_async_add_new_entities))
+
+
+class DVLAEntity(CoordinatorEntity[DVLACoordinator]):
+    """Define a DVLA entity for a single vehicle."""
+
+    def __init__(
+        self,
+        coordinator: DVLACoordinator,
+        name: str,
+        description: EntityDescription,
+    ) -> None:
+        """Initialize."""
+        super().__init__(coordinator)
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, f"{name}")},
+            manufacturer=DOMAIN.upper(),
+            model=vehicle.make if (vehicle := coordinator.vehicle(name)) else None,
+            name=name.upper(),
+            configuration_url="https://github.com/jampez77/DVLA-Vehicle-Checker/",
+        )
+        self.entity_description = description
+        self.reg_number = name
+        self._last_available: bool | None = None
+
+    @abstractmethod
+    def update_from_coordinator(self) -> None:
+        """Update state and attributes from coordinator data."""
+
+    def _is_affected(self, changed: set[str]) -> bool:
+        """Return True if any of the changed keys are shown by this entity."""
+        if (keys := self.coordinator.attribute_keys) is None:
+            # Every key of the vehicle is exposed as an attribute.
+            return bool(changed)
+        return self.entity_description.key in changed or not changed.isdisjoint(keys)
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Handle updated data from the coordinator.
+
+        The state is only written when the vehicle's availability changed or
+        a key this entity shows was changed by the refresh.
+        """
+        available = self.available
+        changed = self.coordinator.changed.get(self.reg_number, set())
+
+        if available == self._last_available and not self._is_affected(changed):
+            return
+
+        self._last_available = available
+        self.update_from_coordinator()
+        self.async_write_ha_state()
+
+    async def async_added_to_hass(self) -> None:
+        """Handle adding to Home Assistant."""
+        await super().async_added_to_hass()
+        self._last_available = self.available
+        self.update_from_coordinator()
+
+    @property
+    def available(self) -> bool:
+        """Return True if entity is available."""
+        return self.coordinator.vehicle(self.reg_number) is not None
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Define entity attributes.
+
+        Attributes are read from the coordinator when the state is written
+        rather than copied into every entity.
+        """
+        if (vehicle := self.coordinator.vehicle(self.reg_number)) is None:
+            return {}
+        if (keys := self.coordinator.attribute_keys) is None:
+            return vehicle.raw
+        return {key: vehicle.raw[key] for key in keys if key in vehicle}
@@ -0,0 +1,104 @@
+"""Fleet-wide aggregates for the DVLA integration."""
+
+from __future__ import annotations
+
+from bisect import bisect_left, insort
+from collections import Counter
+from datetime import date, timedelta
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.singleton import singleton
+
+from .const import DOMAIN
+from .models import Vehicle
+
+DATA_FLEET_INDEX = f"{DOMAIN}_fleet_index"
+
+# Date fields kept in date order, by Vehicle Enquiry Service key, and the
+# status field that goes with each.
+DATE_KEYS = ["taxDueDate", "motExpiryDate"]
+STATUS_KEYS = {"taxDueDate": "taxStatus", "motExpiryDate": "motStatus"}
+
+
+def _decrement(counter: Counter[str], key: str | None) -> None:
+    """Remove one from a counter, dropping the key when it reaches zero."""
+    if (count := counter[key] - 1) > 0:
+        counter[key] = count
+    else:
+        del counter[key]
+
+
+class FleetIndex:
+    """Aggregates over a fleet, updated one vehicle at a time.
+
+    Status counts and date-ordered lists are adjusted for the vehicle that
+    changed rather than rebuilt from every vehicle.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the index."""
+        self._vehicles: dict[str, Vehicle] = {}
+        self.tax_status: Counter[str | None] = Counter()
+        self.mot_status: Counter[str | None] = Counter()
+        self.marked_for_export = 0
+        # (date, registration) pairs in date order, by key.
+        self._dates: dict[str, list[tuple[date, str]]] = {key: [] for key in DATE_KEYS}
+
+    def __len__(self) -> int:
+        """Return the number of vehicles in the index."""
+        return len(self._vehicles)
+
+    def update(self, reg_number: str, vehicle: Vehicle | None) -> None:
+        """Replace a vehicle's contribution to the aggregates."""
+        if (previous := self._vehicles.pop(reg_number, None)) is not None:
+            _decrement(self.tax_status, previous.tax_status)
+            _decrement(self.mot_status, previous.mot_status)
+            self.marked_for_export -= bool(previous.marked_for_export)
+            for key in DATE_KEYS:
+                if (value := previous.get(key)) is not None:
+                    dates = self._dates[key]
+                    del dates[bisect_left(dates, (value, reg_number))]
+
+        if vehicle is None:
+            return
+
+        self._vehicles[reg_number] = vehicle
+        self.tax_status[vehicle.tax_status] += 1
+        self.mot_status[vehicle.mot_status] += 1
+        self.marked_for_export += bool(vehicle.marked_for_export)
+        for key in DATE_KEYS:
+            if (value := vehicle.get(key)) is not None:
+                insort(self._dates[key], (value, reg_number))
+
+    def count_not(self, counter: Counter[str | None], status: str) -> int:
+        """Return how many vehicles do not have a status."""
+        return len(self._vehicles) - counter[status]
+
+    def next_due(self, key: str, today: date) -> tuple[date, str] | None:
+        """Return the first date on or after today for a key, with its plate."""
+        dates = self._dates[key]
+        index = bisect_left(dates, (today, ""))
+        return dates[index] if index < len(dates) else None
+
+    def vehicle(self, reg_number: str) -> Vehicle | None:
+        """Return a vehicle in the index."""
+        return self._vehicles.get(reg_number)
+
+    def between(
+        self, key: str, start: date | None, end: date
+    ) -> list[tuple[date, str]]:
+        """Return the (date, plate) pairs for a key from start to end inclusive.
+
+        The range is found by bisecting, so only the matches are visited.
+        A start of None includes every date up to end.
+        """
+        dates = self._dates[key]
+        low = 0 if start is None else bisect_left(dates, (start, ""))
+        return dates[low : bisect_left(dates, (end + timedelta(days=1), ""), low)]
+
+
+@singleton(DATA_FLEET_INDEX)
+@callback
+def async_get_fleet_index(hass: HomeAssistant) -> FleetIndex:
+    """Return the index of every vehicle in every config entry."""
+    return FleetIndex()
@@ -0,0 +1,219 @@
+"""Client-side rate limiting for the DVLA API."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable
+import hashlib
+import time
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.singleton import singleton
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    DEFAULT_MONTHLY_BUDGET,
+    DEFAULT_RATE_LIMIT,
+    DOMAIN,
+    STORAGE_VERSION,
+)
+
+DATA_LIMITERS = f"{DOMAIN}_limiters"
+STORAGE_KEY_USAGE = f"{DOMAIN}.usage"
+SAVE_DELAY = 60
+
+
+def api_key_id(api_key: str) -> str:
+    """Return a stable identifier for an API key that is safe to store and show."""
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:12]
+
+
+def _current_month() -> str:
+    """Return the current billing month."""
+    return dt_util.utcnow().strftime("%Y-%m")
+
+
+class RateLimiter:
+    """Token bucket with a monthly request budget for a single API key.
+
+    Callers queue in order behind an asyncio lock, so bursts are spread out
+    at the configured rate rather than rejected.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        monthly_budget: int,
+        month: str | None = None,
+        used: int = 0,
+        on_change: Callable[[], None] | None = None,
+    ) -> None:
+        """Initialize the limiter."""
+        self.rate = rate
+        self.monthly_budget = monthly_budget
+        self.month = month or _current_month()
+        self._used = used
+        self._on_change = on_change
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        # Requests are held back until this time after the API rate limits us.
+        self._resume_at = 0.0
+        self._lock = asyncio.Lock()
+
+    @property
+    def capacity(self) -> float:
+        """Return the largest burst the bucket allows."""
+        return max(1.0, self.rate)
+
+    @property
+    def used(self) -> int:
+        """Return requests made this month."""
+        self._rollover()
+        return self._used
+
+    @property
+    def remaining(self) -> int | None:
+        """Return requests left this month, or None when there is no budget."""
+        if not self.monthly_budget:
+            return None
+        return max(0, self.monthly_budget - self.used)
+
+    def configure(self, rate: float, monthly_budget: int) -> None:
+        """Update the rate and budget, keeping usage so far."""
+        self.rate = rate
+        self.monthly_budget = monthly_budget
+        self._tokens = min(self._tokens, self.capacity)
+
+    @property
+    def resume_in(self) -> float:
+        """Return seconds until requests resume after a rate limit."""
+        return max(0.0, self._resume_at - time.monotonic())
+
+    @property
+    def deferred(self) -> bool:
+        """Return True while requests are held back after a rate limit."""
+        return self.resume_in > 0
+
+    def defer(self, seconds: float) -> None:
+        """Hold back every request for a while, e.g. after a 429 response."""
+        self._resume_at = max(self._resume_at, time.monotonic() + seconds)
+
+    def _rollover(self) -> None:
+        """Reset usage when a new month starts."""
+        if (month := _current_month()) != self.month:
+            self.month = month
+            self._used = 0
+
+    def _refill(self) -> None:
+        """Add the tokens accrued since the last refill."""
+        now = time.monotonic()
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+
+    async def async_acquire(self) -> bool:
+        """Wait for a request slot.
+
+        Returns False without waiting when the monthly budget is used up.
+        """
+        async with self._lock:
+            if self.remaining == 0:
+                return False
+
+            if (wait := self.resume_in) > 0:
+                await asyncio.sleep(wait)
+
+            self._refill()
+            while self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+                self._refill()
+
+            self._tokens -= 1
+            self._used += 1
+
+        if self._on_change is not None:
+            self._on_change()
+
+        return True
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the limiter state for storage and diagnostics."""
+        return {"month": self.month, "used": self._used}
+
+
+class RateLimiterRegistry:
+    """Process-wide rate limiters keyed by API key."""
+
+    def __init__(
+        self, hass: HomeAssistant, store: Store, usage: dict[str, dict[str, Any]]
+    ) -> None:
+        """Initialize the registry."""
+        self.hass = hass
+        self._store = store
+        self._usage = usage
+        self._limiters: dict[str, RateLimiter] = {}
+
+    def get(
+        self,
+        api_key: str,
+        rate: float | None = None,
+        monthly_budget: int | None = None,
+    ) -> RateLimiter:
+        """Return the limiter for an API key.
+
+        An existing limiter is reconfigured only when a rate and budget are
+        given, so ad-hoc callers share whatever the config entries set up.
+        """
+        key_id = api_key_id(api_key)
+
+        if (limiter := self._limiters.get(key_id)) is not None:
+            if rate is not None and monthly_budget is not None:
+                limiter.configure(rate, monthly_budget)
+            return limiter
+
+        usage = self._usage.get(key_id, {})
+        limiter = RateLimiter(
+            DEFAULT_RATE_LIMIT if rate is None else rate,
+            DEFAULT_MONTHLY_BUDGET if monthly_budget is None else monthly_budget,
+            month=usage.get("month"),
+            used=usage.get("used", 0),
+            on_change=self._async_schedule_save,
+        )
+        self._limiters[key_id] = limiter
+        return limiter
+
+    def _async_schedule_save(self) -> None:
+        """Persist usage counts after a short delay."""
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    def _data_to_save(self) -> dict[str, dict[str, Any]]:
+        """Return usage counts for all known API keys."""
+        return {
+            **self._usage,
+            **{
+                key_id: limiter.as_dict()
+                for key_id, limiter in self._limiters.items()
+            },
+        }
+
+
+@singleton(DATA_LIMITERS)
+async def async_get_limiters(hass: HomeAssistant) -> RateLimiterRegistry:
+    """Return the shared rate limiter registry."""
+    store: Store = Store(hass, STORAGE_VERSION, STORAGE_KEY_USAGE)
+    usage = await store.async_load() or {}
+    return RateLimiterRegistry(hass, store, usage)
+
+
+async def async_get_limiter(
+    hass: HomeAssistant,
+    api_key: str,
+    rate: float | None = None,
+    monthly_budget: int | None = None,
+) -> RateLimiter:
+    """Return the shared rate limiter for an API key."""
+    registry = await async_get_limiters(hass)
+    return registry.get(api_key, rate, monthly_budget)
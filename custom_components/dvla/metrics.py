@@ -0,0 +1,132 @@
+"""Request metrics for the DVLA API."""
+
+from __future__ import annotations
+
+from bisect import bisect_left
+from collections import Counter, OrderedDict
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.singleton import singleton
+
+from .const import DOMAIN
+from .limiter import api_key_id
+from .models import normalise_registration
+
+DATA_METRICS = f"{DOMAIN}_metrics"
+
+# Upper bounds of the latency histogram buckets, in milliseconds. Slower
+# requests fall into a final overflow bucket.
+LATENCY_BUCKETS = [100, 250, 500, 1000, 2500, 5000, 10000]
+
+# Metrics are kept for at most this many registrations, dropping the least
+# recently used, so ad-hoc lookups cannot grow the registry without limit.
+MAX_REGISTRATIONS = 1000
+
+
+class RequestMetrics:
+    """Counts and timings for requests made for one API key or registration."""
+
+    def __init__(self) -> None:
+        """Initialize the metrics."""
+        self.requests = 0
+        self.retries = 0
+        self.bytes_received = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+        self.latency_histogram = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.statuses: Counter[int] = Counter()
+        self.errors: Counter[str] = Counter()
+
+    @property
+    def average_latency(self) -> float | None:
+        """Return the mean request latency in milliseconds."""
+        if not self.requests:
+            return None
+        return round(self.total_latency / self.requests, 1)
+
+    def record(
+        self,
+        latency: float,
+        status: int | None,
+        size: int,
+        error: str | None,
+    ) -> None:
+        """Record a completed request, latency in milliseconds."""
+        self.requests += 1
+        self.bytes_received += size
+        self.total_latency += latency
+        self.max_latency = max(self.max_latency, latency)
+        self.latency_histogram[bisect_left(LATENCY_BUCKETS, latency)] += 1
+        if status is not None:
+            self.statuses[status] += 1
+        if error is not None:
+            self.errors[error] += 1
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the metrics for diagnostics and sensor attributes."""
+        return {
+            "requests": self.requests,
+            "retries": self.retries,
+            "bytes_received": self.bytes_received,
+            "average_latency_ms": self.average_latency,
+            "max_latency_ms": round(self.max_latency, 1),
+            "latency_histogram_ms": {
+                f"<={bound}" if bound is not None else f">{LATENCY_BUCKETS[-1]}": count
+                for bound, count in zip(
+                    [*LATENCY_BUCKETS, None], self.latency_histogram
+                )
+            },
+            "status_codes": dict(self.statuses),
+            "errors": dict(self.errors),
+        }
+
+
+class MetricsRegistry:
+    """Request metrics kept per API key and per registration."""
+
+    def __init__(self) -> None:
+        """Initialize the registry."""
+        self._keys: dict[str, RequestMetrics] = {}
+        self._registrations: OrderedDict[str, RequestMetrics] = OrderedDict()
+
+    def for_key(self, api_key: str) -> RequestMetrics:
+        """Return the metrics for an API key."""
+        return self._keys.setdefault(api_key_id(api_key), RequestMetrics())
+
+    def for_registration(self, reg_number: str) -> RequestMetrics:
+        """Return the metrics for a registration, however it is spaced or cased."""
+        key = normalise_registration(reg_number)
+        if (metrics := self._registrations.get(key)) is not None:
+            self._registrations.move_to_end(key)
+            return metrics
+
+        metrics = self._registrations[key] = RequestMetrics()
+        while len(self._registrations) > MAX_REGISTRATIONS:
+            self._registrations.popitem(last=False)
+        return metrics
+
+    def record(
+        self,
+        api_key: str,
+        reg_number: str,
+        latency: float,
+        status: int | None = None,
+        size: int = 0,
+        error: str | None = None,
+    ) -> None:
+        """Record a completed request against its API key and registration."""
+        self.for_key(api_key).record(latency, status, size, error)
+        self.for_registration(reg_number).record(latency, status, size, error)
+
+    def record_retry(self, api_key: str, reg_number: str) -> None:
+        """Record that a request is being retried."""
+        self.for_key(api_key).retries += 1
+        self.for_registration(reg_number).retries += 1
+
+
+@singleton(DATA_METRICS)
+@callback
+def async_get_metrics(hass: HomeAssistant) -> MetricsRegistry:
+    """Return the shared request metrics."""
+    return MetricsRegistry()
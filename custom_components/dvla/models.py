@@ -0,0 +1,117 @@
+"""Models for the DVLA integration."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date
+from typing import Any
+
+from homeassistant.util import dt as dt_util
+
+
+# Vehicle Enquiry Service keys and the Vehicle fields they are parsed into.
+FIELDS = {
+    "registrationNumber": "registration_number",
+    "taxStatus": "tax_status",
+    "taxDueDate": "tax_due_date",
+    "artEndDate": "art_end_date",
+    "motStatus": "mot_status",
+    "motExpiryDate": "mot_expiry_date",
+    "make": "make",
+    "monthOfFirstRegistration": "month_of_first_registration",
+    "yearOfManufacture": "year_of_manufacture",
+    "engineCapacity": "engine_capacity",
+    "co2Emissions": "co2_emissions",
+    "fuelType": "fuel_type",
+    "markedForExport": "marked_for_export",
+    "colour": "colour",
+    "typeApproval": "type_approval",
+    "wheelplan": "wheelplan",
+    "revenueWeight": "revenue_weight",
+    "realDrivingEmissions": "real_driving_emissions",
+    "dateOfLastV5CIssued": "date_of_last_v5c_issued",
+    "euroStatus": "euro_status",
+}
+
+
+def normalise_registration(reg_number: str) -> str:
+    """Return a registration in the canonical form used for comparisons."""
+    return str(reg_number).replace(" ", "").upper()
+
+
+def _date(value: Any) -> date | None:
+    """Parse an ISO date, returning None if it is missing or invalid."""
+    return dt_util.parse_date(value) if isinstance(value, str) else None
+
+
+def _int(value: Any) -> int | None:
+    """Parse an integer, returning None if it is missing or invalid."""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+@dataclass(slots=True, frozen=True)
+class Vehicle:
+    """A vehicle record parsed once from a Vehicle Enquiry Service response."""
+
+    registration_number: str | None
+    tax_status: str | None
+    tax_due_date: date | None
+    art_end_date: date | None
+    mot_status: str | None
+    mot_expiry_date: date | None
+    make: str | None
+    month_of_first_registration: str | None
+    year_of_manufacture: int | None
+    engine_capacity: int | None
+    co2_emissions: int | None
+    fuel_type: str | None
+    marked_for_export: bool | None
+    colour: str | None
+    type_approval: str | None
+    wheelplan: str | None
+    revenue_weight: int | None
+    real_driving_emissions: str | None
+    date_of_last_v5c_issued: date | None
+    euro_status: str | None
+    # The response as returned by the API, for attributes and storage.
+    raw: dict[str, Any]
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> Vehicle:
+        """Parse a Vehicle Enquiry Service response."""
+        return cls(
+            registration_number=data.get("registrationNumber"),
+            tax_status=data.get("taxStatus"),
+            tax_due_date=_date(data.get("taxDueDate")),
+            art_end_date=_date(data.get("artEndDate")),
+            mot_status=data.get("motStatus"),
+            mot_expiry_date=_date(data.get("motExpiryDate")),
+            make=data.get("make"),
+            month_of_first_registration=data.get("monthOfFirstRegistration"),
+            year_of_manufacture=_int(data.get("yearOfManufacture")),
+            engine_capacity=_int(data.get("engineCapacity")),
+            co2_emissions=_int(data.get("co2Emissions")),
+            fuel_type=data.get("fuelType"),
+            marked_for_export=data.get("markedForExport"),
+            colour=data.get("colour"),
+            type_approval=data.get("typeApproval"),
+            wheelplan=data.get("wheelplan"),
+            revenue_weight=_int(data.get("revenueWeight")),
+            real_driving_emissions=data.get("realDrivingEmissions"),
+            date_of_last_v5c_issued=_date(data.get("dateOfLastV5CIssued")),
+            euro_status=data.get("euroStatus"),
+            raw=data,
+        )
+
+    def __contains__(self, key: str) -> bool:
+        """Return True if the response included a key."""
+        return key in self.raw
+
+    def get(self, key: str) -> Any:
+        """Return the parsed value for a Vehicle Enquiry Service key."""
+        if (field := FIELDS.get(key)) is not None:
+            return getattr(self, field)
+        return self.raw.get(key)
@@ -0,0 +1,88 @@
+"""API key pool for the DVLA integration."""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Mapping
+import math
+
+from homeassistant.core import HomeAssistant
+
+from .breaker import CircuitBreaker, async_get_breaker
+from .limiter import RateLimiter, async_get_limiter
+
+
+class KeyPool:
+    """API keys sharing the requests for a set of vehicles.
+
+    Each key keeps its own shared rate limiter, monthly budget and circuit
+    breaker; the pool picks whichever key has the most headroom.
+    """
+
+    def __init__(
+        self, keys: Iterable[tuple[str, RateLimiter, CircuitBreaker]]
+    ) -> None:
+        """Initialize the pool."""
+        self._keys = {api_key: (limiter, breaker) for api_key, limiter, breaker in keys}
+
+    def __len__(self) -> int:
+        """Return the number of keys in the pool."""
+        return len(self._keys)
+
+    @property
+    def api_keys(self) -> list[str]:
+        """Return the keys in the pool."""
+        return list(self._keys)
+
+    @property
+    def exhausted(self) -> bool:
+        """Return True if every key has used up its monthly budget."""
+        return all(limiter.remaining == 0 for limiter, _ in self._keys.values())
+
+    def limiter(self, api_key: str) -> RateLimiter:
+        """Return the rate limiter for a key."""
+        return self._keys[api_key][0]
+
+    def breaker(self, api_key: str) -> CircuitBreaker:
+        """Return the circuit breaker for a key."""
+        return self._keys[api_key][1]
+
+    def select(self, exclude: Iterable[str] = ()) -> str | None:
+        """Return the usable key with the most headroom, or None.
+
+        Keys with an open circuit or no budget left are skipped. Of the
+        rest, keys not held back by a recent rate limit come first, then
+        those with the most budget remaining, then the least used.
+        """
+        exclude = set(exclude)
+        candidates = [
+            (limiter.deferred, -(limiter.remaining or math.inf), limiter.used, api_key)
+            for api_key, (limiter, breaker) in self._keys.items()
+            if api_key not in exclude and breaker.available and limiter.remaining != 0
+        ]
+        return min(candidates)[-1] if candidates else None
+
+
+async def async_get_key_pool(
+    hass: HomeAssistant,
+    api_keys: Iterable[str],
+    limits: Mapping[str, tuple[float, int]] | None = None,
+) -> KeyPool:
+    """Return a pool of the shared limiters and breakers for some API keys.
+
+    Keys found in limits are configured with their own (rate, monthly
+    budget), as async_get_limiter does for a single key; the rest keep
+    whatever they were last configured with.
+    """
+    limits = limits or {}
+    return KeyPool(
+        [
+            (
+                api_key,
+                await async_get_limiter(
+                    hass, api_key, *limits.get(api_key, (None, None))
+                ),
+                async_get_breaker(hass, api_key),
+            )
+            for api_key in dict.fromkeys(api_keys)
+        ]
+    )
@@ -1,6 +1,8 @@
 """DVLA sensor platform."""
 
-from datetime import date
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
 from typing import Any
 
 from homeassistant.components.sensor import (
@@ -9,15 +11,31 @@ from homeassistant.components.sensor import (
     SensorEntityDescription,
 )
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import UnitOfMass
+from homeassistant.const import PERCENTAGE, EntityCategory, UnitOfMass, UnitOfTime
 from homeassistant.core import HomeAssistant, callback
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.device_registry import DeviceEntryType
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from homeassistant.helpers.event import async_track_time_change
+from homeassistant.helpers.singleton import singleton
+from homeassistant.helpers.typing import StateType
+from homeassistant.util import dt as dt_util
 
-from .const import CONF_REG_NUMBER, DOMAIN
+from .breaker import STATES as BREAKER_STATES, CircuitBreaker
+from .cache import async_get_lookup_cache
+from .const import DOMAIN, SIGNAL_FLEET_UPDATED
 from .coordinator import DVLACoordinator
+from .entity import DVLAEntity, async_add_vehicle_entities
+from .fleet import FleetIndex, async_get_fleet_index
+from .limiter import RateLimiter, api_key_id
+from .metrics import RequestMetrics, async_get_metrics
+from .pool import KeyPool
+
+DATA_SHARED_SENSOR_OWNERS = f"{DOMAIN}_shared_sensor_owners"
+
+# Owner group of the sensors covering the whole integration.
+FLEET_GROUP = "fleet"
 
 SENSOR_TYPES = [
     SensorEntityDescription(
@@ -71,34 +89,352 @@ SENSOR_TYPES = [
 ]
 
 
+# Carries the full vehicle record once per vehicle in compact attribute mode.
+RECORD_SENSOR_TYPE = SensorEntityDescription(
+    key="vehicleRecord",
+    name="Vehicle Record",
+    icon="mdi:card-account-details",
+    device_class=SensorDeviceClass.TIMESTAMP,
+    entity_category=EntityCategory.DIAGNOSTIC,
+)
+
+# Diagnostic sensors read in-memory state only, so polling them is cheap.
+SCAN_INTERVAL = timedelta(minutes=1)
+
+
+@dataclass(kw_only=True)
+class DVLADiagnosticSensorEntityDescription(SensorEntityDescription):
+    """DVLA diagnostic sensor description."""
+
+    value_fn: Callable[[DVLACoordinator], StateType]
+    attrs_fn: Callable[[DVLACoordinator], dict[str, Any]] = lambda _: {}
+
+
+DIAGNOSTIC_SENSOR_TYPES = [
+    DVLADiagnosticSensorEntityDescription(
+        key="refresh_change_rate",
+        name="Refresh Change Rate",
+        icon="mdi:compare-horizontal",
+        native_unit_of_measurement=PERCENTAGE,
+        value_fn=lambda coordinator: coordinator.change_rate,
+        attrs_fn=lambda coordinator: {
+            "changed": coordinator.changed_refreshes.total(),
+            "unchanged": coordinator.unchanged_refreshes.total(),
+            "by_registration": {
+                reg_number: {
+                    "changed": coordinator.changed_refreshes[reg_number],
+                    "unchanged": coordinator.unchanged_refreshes[reg_number],
+                }
+                for reg_number in coordinator.reg_numbers
+            },
+        },
+    ),
+]
+
+
+@dataclass(frozen=True, slots=True)
+class APIKeyState:
+    """The shared limiter, breaker and metrics of one API key."""
+
+    limiter: RateLimiter
+    breaker: CircuitBreaker
+    metrics: RequestMetrics
+
+
+@dataclass(kw_only=True)
+class DVLAKeySensorEntityDescription(SensorEntityDescription):
+    """DVLA API key sensor description."""
+
+    value_fn: Callable[[APIKeyState], StateType]
+    attrs_fn: Callable[[APIKeyState], dict[str, Any]] = lambda _: {}
+    exists_fn: Callable[[APIKeyState], bool] = lambda _: True
+
+
+KEY_SENSOR_TYPES = [
+    DVLAKeySensorEntityDescription(
+        key="requests_this_month",
+        name="API Requests This Month",
+        icon="mdi:counter",
+        value_fn=lambda key: key.limiter.used,
+        attrs_fn=lambda key: {
+            "month": key.limiter.month,
+            "rate_limit": key.limiter.rate,
+        },
+    ),
+    DVLAKeySensorEntityDescription(
+        key="budget_remaining",
+        name="API Budget Remaining",
+        icon="mdi:gauge",
+        value_fn=lambda key: key.limiter.remaining,
+        attrs_fn=lambda key: {"monthly_budget": key.limiter.monthly_budget},
+        exists_fn=lambda key: bool(key.limiter.monthly_budget),
+    ),
+    DVLAKeySensorEntityDescription(
+        key="circuit_breaker",
+        name="API Circuit Breaker",
+        icon="mdi:electric-switch",
+        device_class=SensorDeviceClass.ENUM,
+        options=BREAKER_STATES,
+        value_fn=lambda key: key.breaker.state,
+        attrs_fn=lambda key: key.breaker.as_dict(),
+    ),
+    DVLAKeySensorEntityDescription(
+        key="api_average_latency",
+        name="API Average Latency",
+        icon="mdi:timer-outline",
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        entity_registry_enabled_default=False,
+        value_fn=lambda key: key.metrics.average_latency,
+        attrs_fn=lambda key: key.metrics.as_dict(),
+    ),
+    DVLAKeySensorEntityDescription(
+        key="api_errors",
+        name="API Errors",
+        icon="mdi:alert-circle-outline",
+        entity_registry_enabled_default=False,
+        value_fn=lambda key: key.metrics.errors.total(),
+        attrs_fn=lambda key: {
+            "errors": dict(key.metrics.errors),
+            "status_codes": dict(key.metrics.statuses),
+            "retries": key.metrics.retries,
+        },
+    ),
+]
+
+# Reports on the lookup cache shared by every entry.
+LOOKUP_CACHE_SENSOR_TYPE = SensorEntityDescription(
+    key="lookup_cache_hit_rate",
+    name="Lookup Cache Hit Rate",
+    icon="mdi:cached",
+    native_unit_of_measurement=PERCENTAGE,
+    entity_category=EntityCategory.DIAGNOSTIC,
+)
+
+
+def _next_due(index: FleetIndex, key: str) -> tuple[date, str] | None:
+    """Return the fleet's next date for a key on or after today, with its plate."""
+    return index.next_due(key, dt_util.now().date())
+
+
+@dataclass(kw_only=True)
+class DVLAFleetSensorEntityDescription(SensorEntityDescription):
+    """DVLA fleet sensor description."""
+
+    value_fn: Callable[[FleetIndex], StateType | date]
+    attrs_fn: Callable[[FleetIndex], dict[str, Any]] = lambda _: {}
+
+
+FLEET_SENSOR_TYPES = [
+    DVLAFleetSensorEntityDescription(
+        key="untaxed_vehicles",
+        name="Untaxed Vehicles",
+        icon="mdi:car-off",
+        value_fn=lambda index: index.count_not(index.tax_status, "Taxed"),
+        attrs_fn=lambda index: {
+            "tax_status": {
+                str(status): count for status, count in index.tax_status.items()
+            },
+        },
+    ),
+    DVLAFleetSensorEntityDescription(
+        key="mot_invalid_vehicles",
+        name="Vehicles Without Valid MOT",
+        icon="mdi:car-wrench",
+        value_fn=lambda index: index.count_not(index.mot_status, "Valid"),
+        attrs_fn=lambda index: {
+            "mot_status": {
+                str(status): count for status, count in index.mot_status.items()
+            },
+        },
+    ),
+    DVLAFleetSensorEntityDescription(
+        key="next_tax_due",
+        name="Next Tax Due Date",
+        icon="mdi:calendar-clock",
+        device_class=SensorDeviceClass.DATE,
+        value_fn=lambda index: (
+            due[0] if (due := _next_due(index, "taxDueDate")) else None
+        ),
+        attrs_fn=lambda index: {
+            "registration_number": (
+                due[1] if (due := _next_due(index, "taxDueDate")) else None
+            ),
+        },
+    ),
+    DVLAFleetSensorEntityDescription(
+        key="next_mot_expiry",
+        name="Next MOT Expiry Date",
+        icon="mdi:calendar-check",
+        device_class=SensorDeviceClass.DATE,
+        value_fn=lambda index: (
+            due[0] if (due := _next_due(index, "motExpiryDate")) else None
+        ),
+        attrs_fn=lambda index: {
+            "registration_number": (
+                due[1] if (due := _next_due(index, "motExpiryDate")) else None
+            ),
+        },
+    ),
+    DVLAFleetSensorEntityDescription(
+        key="marked_for_export_vehicles",
+        name="Vehicles Marked for Export",
+        icon="mdi:export",
+        value_fn=lambda index: index.marked_for_export,
+    ),
+]
+
+# The device holding the fleet sensors, shared by every config entry.
+FLEET_DEVICE_INFO = DeviceInfo(
+    identifiers={(DOMAIN, f"{DOMAIN}_fleet")},
+    manufacturer=DOMAIN.upper(),
+    name=f"{DOMAIN.upper()} Fleet",
+    entry_type=DeviceEntryType.SERVICE,
+    configuration_url="https://github.com/jampez77/DVLA-Vehicle-Checker/",
+)
+
+
+@singleton(DATA_SHARED_SENSOR_OWNERS)
+@callback
+def _async_get_shared_sensor_owners(
+    hass: HomeAssistant,
+) -> dict[str, dict[str, Callable[[], None]]]:
+    """Return, per group of shared sensors, the entries that can hold them.
+
+    Each group maps entry IDs, current owner first, to a callback adding
+    the group's sensors to that entry.
+    """
+    return {}
+
+
+@callback
+def _async_share_sensors(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    group: str,
+    async_add_sensors: Callable[[], None],
+) -> None:
+    """Add a group of shared sensors once, to the first entry that has them.
+
+    When the owning entry is unloaded the sensors are added again to the
+    next entry in the group, so they outlive any single entry.
+    """
+    owners = _async_get_shared_sensor_owners(hass).setdefault(group, {})
+    if not owners:
+        async_add_sensors()
+    owners[entry.entry_id] = async_add_sensors
+
+    @callback
+    def _async_hand_off() -> None:
+        """Add the sensors to another entry if this one owned them."""
+        owner = next(iter(owners)) == entry.entry_id
+        del owners[entry.entry_id]
+        if owner and owners:
+            next(iter(owners.values()))()
+
+    entry.async_on_unload(_async_hand_off)
+
+
+@callback
+def _async_fleet_sensors(hass: HomeAssistant) -> list[SensorEntity]:
+    """Return the sensors for the whole integration."""
+    index = async_get_fleet_index(hass)
+    return [
+        *(DVLAFleetSensor(index, description) for description in FLEET_SENSOR_TYPES),
+        DVLALookupCacheSensor(),
+    ]
+
+
+def _key_device_info(api_key: str) -> DeviceInfo:
+    """Return the device holding an API key's sensors."""
+    key_id = api_key_id(api_key)
+    return DeviceInfo(
+        identifiers={(DOMAIN, f"api_key_{key_id}")},
+        manufacturer=DOMAIN.upper(),
+        name=f"{DOMAIN.upper()} API Key {key_id}",
+        entry_type=DeviceEntryType.SERVICE,
+        configuration_url="https://github.com/jampez77/DVLA-Vehicle-Checker/",
+    )
+
+
+@callback
+def _async_key_sensors(
+    hass: HomeAssistant, pool: KeyPool, api_key: str
+) -> list[SensorEntity]:
+    """Return the sensors for one of an entry's API keys."""
+    key = APIKeyState(
+        pool.limiter(api_key),
+        pool.breaker(api_key),
+        async_get_metrics(hass).for_key(api_key),
+    )
+    return [
+        DVLAKeySensor(api_key, key, description)
+        for description in KEY_SENSOR_TYPES
+        if description.exists_fn(key)
+    ]
+
+
+def _service_device_info(entry: ConfigEntry) -> DeviceInfo:
+    """Return the device holding a config entry's own entities."""
+    return DeviceInfo(
+        identifiers={(DOMAIN, entry.entry_id)},
+        manufacturer=DOMAIN.upper(),
+        name=f"{DOMAIN.upper()} {entry.title}",
+        entry_type=DeviceEntryType.SERVICE,
+        configuration_url="https://github.com/jampez77/DVLA-Vehicle-Checker/",
+    )
+
+
 async def async_setup_entry(
     hass: HomeAssistant,
     entry: ConfigEntry,
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up sensors from a config entry created in the integrations UI."""
-    config = hass.data[DOMAIN][entry.entry_id]
-    # Update our config to include new repos and remove those that have been removed.
-    if entry.options:
-        config.update(entry.options)
+    coordinator: DVLACoordinator = hass.data[DOMAIN][entry.entry_id]
 
-    session = async_get_clientsession(hass)
-    coordinator = DVLACoordinator(hass, session, entry.data)
+    async_add_vehicle_entities(
+        coordinator, entry, async_add_entities, SENSOR_TYPES, DVLASensor
+    )
 
-    await coordinator.async_refresh()
+    sensors: list[SensorEntity] = []
 
-    name = entry.data[CONF_REG_NUMBER]
+    if coordinator.attribute_keys is not None:
+        sensors.extend(
+            DVLARecordSensor(coordinator, reg_number)
+            for reg_number in coordinator.reg_numbers
+        )
 
-    sensors = [
-        DVLASensor(coordinator, name, description)
-        for description in SENSOR_TYPES
-        if description.key in coordinator.data
-    ]
+    sensors.extend(
+        DVLADiagnosticSensor(coordinator, entry, description)
+        for description in DIAGNOSTIC_SENSOR_TYPES
+    )
 
-    async_add_entities(sensors, update_before_add=True)
+    async_add_entities(sensors)
 
+    # The fleet sensors cover every entry and each API key's sensors cover
+    # every entry using it, so each group is added once and moves to
+    # another entry when its owner is unloaded.
+    _async_share_sensors(
+        hass,
+        entry,
+        FLEET_GROUP,
+        lambda: async_add_entities(_async_fleet_sensors(hass)),
+    )
+    pool: KeyPool = coordinator.pool
+    for api_key in pool.api_keys:
+        _async_share_sensors(
+            hass,
+            entry,
+            api_key_id(api_key),
+            # Bind the key now, as the callback may run after the loop.
+            lambda api_key=api_key: async_add_entities(
+                _async_key_sensors(hass, pool, api_key)
+            ),
+        )
 
-class DVLASensor(CoordinatorEntity[DVLACoordinator], SensorEntity):
+
+class DVLASensor(DVLAEntity, SensorEntity):
     """Define an DVLA sensor."""
 
     def __init__(
@@ -108,57 +444,184 @@ class DVLASensor(CoordinatorEntity[DVLACoordinator], SensorEntity):
         description: SensorEntityDescription,
     ) -> None:
         """Initialize."""
-        super().__init__(coordinator)
-        self._attr_device_info = DeviceInfo(
-            identifiers={(DOMAIN, f"{name}")},
-            manufacturer=DOMAIN.upper(),
-            model=coordinator.data.get("make"),
-            name=name.upper(),
-            configuration_url="https://github.com/jampez77/DVLA-Vehicle-Checker/",
-        )
+        super().__init__(coordinator, name, description)
         self._attr_unique_id = f"{DOMAIN}-{name}-{description.key}".lower()
         self.entity_id = f"sensor.{DOMAIN}_{name}_{description.key}".lower()
-        self.attrs: dict[str, Any] = {}
-        self.entity_description = description
         self._state = None
 
     def update_from_coordinator(self):
         """Update sensor state and attributes from coordinator data."""
 
-        self._state = self.coordinator.data.get(self.entity_description.key)
+        vehicle = self.coordinator.vehicle(self.reg_number)
+        self._state = vehicle.get(self.entity_description.key) if vehicle else None
 
-        if self._state is not None:
-            if (
-                self._state
-                and self.entity_description.device_class == SensorDeviceClass.DATE
-            ):
-                self._state = date.fromisoformat(self._state)
+    @property
+    def native_value(self) -> str | int | date | None:
+        """Native value."""
+        return self._state
+
+
+class DVLARecordSensor(DVLAEntity, SensorEntity):
+    """Define a DVLA sensor holding a vehicle's full record.
+
+    The state is when the record last changed.
+    """
+
+    def __init__(self, coordinator: DVLACoordinator, name: str) -> None:
+        """Initialize."""
+        super().__init__(coordinator, name, RECORD_SENSOR_TYPE)
+        self._attr_unique_id = f"{DOMAIN}-{name}-{RECORD_SENSOR_TYPE.key}".lower()
+        self.entity_id = f"sensor.{DOMAIN}_{name}_{RECORD_SENSOR_TYPE.key}".lower()
+
+    def update_from_coordinator(self):
+        """Update sensor state from coordinator data."""
+        self._attr_native_value = self.coordinator.updated.get(self.reg_number)
+
+    def _is_affected(self, changed: set[str]) -> bool:
+        """Return True if any key of the record changed."""
+        return bool(changed)
 
-            for key in self.coordinator.data:
-                self.attrs[key] = self.coordinator.data[key]
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Define entity attributes."""
+        if (vehicle := self.coordinator.vehicle(self.reg_number)) is None:
+            return {}
+        return vehicle.raw
+
+
+class DVLADiagnosticSensor(SensorEntity):
+    """Define a DVLA diagnostic sensor for a config entry."""
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_has_entity_name = True
+
+    entity_description: DVLADiagnosticSensorEntityDescription
+
+    def __init__(
+        self,
+        coordinator: DVLACoordinator,
+        entry: ConfigEntry,
+        description: DVLADiagnosticSensorEntityDescription,
+    ) -> None:
+        """Initialize."""
+        self._attr_device_info = _service_device_info(entry)
+        self._attr_unique_id = f"{DOMAIN}-{entry.entry_id}-{description.key}".lower()
+        self.entity_description = description
+        self.coordinator = coordinator
+
+    @property
+    def native_value(self) -> StateType:
+        """Native value."""
+        return self.entity_description.value_fn(self.coordinator)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Define entity attributes."""
+        return self.entity_description.attrs_fn(self.coordinator)
+
+
+class DVLAKeySensor(SensorEntity):
+    """Define a DVLA diagnostic sensor for an API key shared by entries."""
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_has_entity_name = True
+
+    entity_description: DVLAKeySensorEntityDescription
+
+    def __init__(
+        self,
+        api_key: str,
+        key: APIKeyState,
+        description: DVLAKeySensorEntityDescription,
+    ) -> None:
+        """Initialize."""
+        self._attr_device_info = _key_device_info(api_key)
+        self._attr_unique_id = f"{DOMAIN}-{api_key_id(api_key)}-{description.key}"
+        self.entity_description = description
+        self.key = key
+
+    @property
+    def native_value(self) -> StateType:
+        """Native value."""
+        return self.entity_description.value_fn(self.key)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Define entity attributes."""
+        return self.entity_description.attrs_fn(self.key)
+
+
+class DVLALookupCacheSensor(SensorEntity):
+    """Define a DVLA diagnostic sensor for the shared lookup cache."""
+
+    _attr_has_entity_name = True
+
+    entity_description = LOOKUP_CACHE_SENSOR_TYPE
+
+    def __init__(self) -> None:
+        """Initialize."""
+        self._attr_device_info = FLEET_DEVICE_INFO
+        self._attr_unique_id = f"{DOMAIN}-fleet-{LOOKUP_CACHE_SENSOR_TYPE.key}"
+
+    @property
+    def native_value(self) -> StateType:
+        """Native value."""
+        return async_get_lookup_cache(self.hass).hit_rate
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Define entity attributes."""
+        cache = async_get_lookup_cache(self.hass)
+        return {"hits": cache.hits, "misses": cache.misses, "size": len(cache)}
+
+
+class DVLAFleetSensor(SensorEntity):
+    """Define a DVLA sensor aggregating every vehicle of the integration.
+
+    Values are read from the shared fleet index, which is updated for each
+    vehicle that changes in any entry, so no vehicle is rescanned.
+    """
+
+    _attr_has_entity_name = True
+    _attr_should_poll = False
+
+    entity_description: DVLAFleetSensorEntityDescription
+
+    def __init__(
+        self,
+        index: FleetIndex,
+        description: DVLAFleetSensorEntityDescription,
+    ) -> None:
+        """Initialize."""
+        self._attr_device_info = FLEET_DEVICE_INFO
+        self._attr_unique_id = f"{DOMAIN}-fleet-{description.key}"
+        self.entity_description = description
+        self.index = index
 
     @callback
-    def _handle_coordinator_update(self) -> None:
-        """Handle updated data from the coordinator."""
-        self.update_from_coordinator()
+    def _async_midnight(self, now: datetime) -> None:
+        """Move on to the next date once one has passed."""
         self.async_write_ha_state()
 
     async def async_added_to_hass(self) -> None:
         """Handle adding to Home Assistant."""
-        await super().async_added_to_hass()
-        await self.async_update()
-
-    @property
-    def available(self) -> bool:
-        """Return True if entity is available."""
-        return bool(self.coordinator.data)
+        self.async_on_remove(
+            async_dispatcher_connect(
+                self.hass, SIGNAL_FLEET_UPDATED, self.async_write_ha_state
+            )
+        )
+        self.async_on_remove(
+            async_track_time_change(
+                self.hass, self._async_midnight, hour=0, minute=0, second=0
+            )
+        )
 
     @property
-    def native_value(self) -> str | date | None:
+    def native_value(self) -> StateType | date:
         """Native value."""
-        return self._state
+        return self.entity_description.value_fn(self.index)
 
     @property
     def extra_state_attributes(self) -> dict[str, Any]:
         """Define entity attributes."""
-        return self.attrs
+        return self.entity_description.attrs_fn(self.index)
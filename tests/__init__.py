@@ -0,0 +1,72 @@
+"""Tests for the DVLA integration."""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any
+
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from homeassistant.const import CONF_API_KEY, CONF_SCAN_INTERVAL
+from homeassistant.core import HomeAssistant
+
+from custom_components.dvla.const import (
+    CONF_CALENDARS,
+    CONF_RATE_LIMIT,
+    CONF_REG_NUMBERS,
+    DEFAULT_SCAN_INTERVAL,
+    DOMAIN,
+)
+
+API_KEY = "test-api-key"
+
+# High enough that the client-side limiter never holds a test back.
+RATE_LIMIT = 10000.0
+
+
+def fleet_data(reg_numbers: list[str], **data: Any) -> dict[str, Any]:
+    """Return config entry data for a fleet entry."""
+    return {
+        CONF_API_KEY: API_KEY,
+        CONF_REG_NUMBERS: reg_numbers,
+        CONF_SCAN_INTERVAL: DEFAULT_SCAN_INTERVAL,
+        CONF_CALENDARS: [],
+        CONF_RATE_LIMIT: RATE_LIMIT,
+        **data,
+    }
+
+
+class MockClock:
+    """Monotonic clock that only moves when told to, or when slept on."""
+
+    def __init__(self) -> None:
+        """Initialize the clock."""
+        self.now = 0.0
+        self.slept: list[float] = []
+
+    def monotonic(self) -> float:
+        """Return the current time."""
+        return self.now
+
+    async def sleep(self, seconds: float) -> None:
+        """Record the sleep and move the clock past it."""
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+async def async_wait_for_refresh(hass: HomeAssistant, entry: MockConfigEntry) -> None:
+    """Wait for an entry's background refresh to finish."""
+    await hass.async_block_till_done()
+    await asyncio.gather(*entry._background_tasks)  # noqa: SLF001
+    await hass.async_block_till_done()
+
+
+async def init_integration(
+    hass: HomeAssistant, data: dict[str, Any], title: str = "Fleet"
+) -> MockConfigEntry:
+    """Set up a DVLA entry and wait for its first refresh."""
+    entry = MockConfigEntry(domain=DOMAIN, title=title, data=data)
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await async_wait_for_refresh(hass, entry)
+    return entry
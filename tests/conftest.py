@@ -0,0 +1,170 @@
+"""Fixtures for DVLA tests."""
+
+from __future__ import annotations
+
+from collections.abc import AsyncGenerator, Callable
+import json
+import platform
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+
+from homeassistant.core import HomeAssistant, ServiceCall, SupportsResponse
+from homeassistant.exceptions import HomeAssistantError
+import homeassistant.helpers.config_validation as cv
+from homeassistant.setup import async_setup_component
+from homeassistant.util import dt as dt_util
+
+from .mock_ves import MockVES
+
+BENCHMARK_RESULTS = pytest.StashKey[list[dict[str, Any]]]()
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    """Add the benchmark options."""
+    group = parser.getgroup("dvla")
+    group.addoption(
+        "--benchmark",
+        action="store_true",
+        help="run the benchmarks against the mock VES server",
+    )
+    group.addoption(
+        "--benchmark-json",
+        metavar="PATH",
+        help="write benchmark results to PATH as JSON",
+    )
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    """Register the benchmark marker."""
+    config.addinivalue_line(
+        "markers", "benchmark: benchmark against the mock VES server"
+    )
+    config.stash[BENCHMARK_RESULTS] = []
+
+
+def pytest_collection_modifyitems(
+    config: pytest.Config, items: list[pytest.Item]
+) -> None:
+    """Skip the benchmarks unless they were asked for."""
+    if config.getoption("--benchmark"):
+        return
+    skip = pytest.mark.skip(reason="benchmarks only run with --benchmark")
+    for item in items:
+        if "benchmark" in item.keywords:
+            item.add_marker(skip)
+
+
+def pytest_terminal_summary(
+    terminalreporter: Any, exitstatus: int, config: pytest.Config
+) -> None:
+    """Emit the benchmark results as JSON."""
+    if not (results := config.stash[BENCHMARK_RESULTS]):
+        return
+
+    report = json.dumps(
+        {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "created": dt_util.utcnow().isoformat(),
+            "results": results,
+        },
+        indent=2,
+    )
+    if path := config.getoption("--benchmark-json"):
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(report)
+        terminalreporter.write_line(f"Benchmark results written to {path}")
+    else:
+        terminalreporter.write_sep("-", "benchmark results")
+        terminalreporter.write_line(report)
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(enable_custom_integrations: None) -> None:
+    """Enable loading the integration from custom_components."""
+
+
+@pytest.fixture
+def benchmark(request: pytest.FixtureRequest) -> Callable[..., None]:
+    """Return a function recording one benchmark result."""
+    results = request.config.stash[BENCHMARK_RESULTS]
+
+    def record(name: str, **values: Any) -> None:
+        results.append({"name": name, "test": request.node.nodeid, **values})
+
+    return record
+
+
+@pytest.fixture
+async def ves(
+    hass: HomeAssistant, socket_enabled: None
+) -> AsyncGenerator[MockVES, None]:
+    """Serve a fake VES endpoint on localhost and point the integration at it."""
+    server = MockVES()
+    await server.start()
+    with patch("custom_components.dvla.coordinator.HOST", server.url):
+        yield server
+    await server.close()
+
+
+class MockCalendar:
+    """In-memory stand-in for the calendar services."""
+
+    def __init__(self) -> None:
+        """Initialize the calendar."""
+        self.events: dict[str, list[dict[str, Any]]] = {}
+        self.get_calls = 0
+        self.create_calls = 0
+        # Summaries of events the calendar refuses to create.
+        self.rejected: set[str] = set()
+
+    async def async_get_events(self, call: ServiceCall) -> dict[str, Any]:
+        """Return every event in the requested calendars."""
+        self.get_calls += 1
+        return {
+            entity_id: {"events": self.events.get(entity_id, [])}
+            for entity_id in cv.ensure_list(call.data["entity_id"])
+        }
+
+    async def async_create_event(self, call: ServiceCall) -> dict[str, Any]:
+        """Store an event."""
+        self.create_calls += 1
+        if call.data["summary"] in self.rejected:
+            raise HomeAssistantError(f"Cannot create {call.data['summary']}")
+        for entity_id in cv.ensure_list(call.data["entity_id"]):
+            self.events.setdefault(entity_id, []).append(
+                {
+                    "start": str(call.data["start_date"]),
+                    "end": str(call.data["end_date"]),
+                    "summary": call.data["summary"],
+                    "description": call.data.get("description"),
+                    "location": call.data.get("location"),
+                }
+            )
+        return {}
+
+
+@pytest.fixture
+async def calendar(hass: HomeAssistant) -> MockCalendar:
+    """Register in-memory calendar services.
+
+    The calendar component is set up first, so an entry forwarding to its
+    calendar platform does not replace them with the real services.
+    """
+    assert await async_setup_component(hass, "calendar", {})
+    mock_calendar = MockCalendar()
+    hass.services.async_register(
+        "calendar",
+        "get_events",
+        mock_calendar.async_get_events,
+        supports_response=SupportsResponse.ONLY,
+    )
+    hass.services.async_register(
+        "calendar",
+        "create_event",
+        mock_calendar.async_create_event,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    return mock_calendar
@@ -0,0 +1,199 @@
+"""A fake DVLA Vehicle Enquiry Service for tests and benchmarks."""
+
+from __future__ import annotations
+
+import asyncio
+from collections import Counter
+from datetime import timedelta
+import json
+import random
+from typing import Any
+
+from aiohttp import web
+from aiohttp.hdrs import RETRY_AFTER
+from aiohttp.test_utils import TestServer
+
+from homeassistant.util import dt as dt_util
+
+PATH = "/vehicle-enquiry/v1/vehicles"
+
+MAKES = ["FORD", "VAUXHALL", "VOLKSWAGEN", "TOYOTA", "BMW", "NISSAN", "KIA"]
+COLOURS = ["BLACK", "WHITE", "SILVER", "BLUE", "RED", "GREY"]
+
+
+def synthetic_vehicle(reg_number: str, index: int = 0) -> dict[str, Any]:
+    """Return a plausible VES response for a registration.
+
+    Tax and MOT dates are spread over the year around today, so a fleet
+    has a mix of statuses and some dates that have already passed.
+    """
+    today = dt_util.now().date()
+    tax_due = today + timedelta(days=(index * 37) % 400 - 30)
+    mot_expiry = today + timedelta(days=(index * 53) % 400 - 30)
+    year = 2005 + index % 18
+    return {
+        "registrationNumber": reg_number,
+        "taxStatus": "Taxed" if tax_due >= today else "Untaxed",
+        "taxDueDate": tax_due.isoformat(),
+        "motStatus": "Valid" if mot_expiry >= today else "Not valid",
+        "motExpiryDate": mot_expiry.isoformat(),
+        "make": MAKES[index % len(MAKES)],
+        "monthOfFirstRegistration": f"{year}-{index % 12 + 1:02d}",
+        "yearOfManufacture": year,
+        "engineCapacity": 1000 + index % 20 * 100,
+        "co2Emissions": 100 + index % 80,
+        "fuelType": "DIESEL" if index % 3 == 0 else "PETROL",
+        "markedForExport": index % 50 == 49,
+        "colour": COLOURS[index % len(COLOURS)],
+        "typeApproval": "M1",
+        "wheelplan": "2 AXLE RIGID BODY",
+        "dateOfLastV5CIssued": (today - timedelta(days=100 + index % 900)).isoformat(),
+    }
+
+
+def synthetic_fleet(count: int, prefix: str = "DV") -> dict[str, dict[str, Any]]:
+    """Return a fleet of synthetic vehicles keyed by registration."""
+    return {
+        reg_number: synthetic_vehicle(reg_number, index)
+        for index in range(count)
+        for reg_number in [f"{prefix}{index:05d}"]
+    }
+
+
+def _errors(status: int, title: str, detail: str) -> dict[str, Any]:
+    """Return a VES error body."""
+    return {
+        "errors": [
+            {
+                "status": str(status),
+                "code": str(status),
+                "title": title,
+                "detail": detail,
+            }
+        ]
+    }
+
+
+class MockVES:
+    """Fake Vehicle Enquiry Service endpoint.
+
+    Serves a fleet of vehicles from a real local HTTP server, with controls
+    for latency, server errors, rate limiting and truncated responses.
+    Rates are the fraction of requests, from 0 to 1, that fail that way.
+    Every request is recorded.
+    """
+
+    def __init__(
+        self,
+        vehicles: dict[str, dict[str, Any]] | None = None,
+        *,
+        latency: float = 0.0,
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        retry_after: int | str | None = None,
+        truncate_rate: float = 0.0,
+        api_keys: set[str] | None = None,
+        seed: int = 0,
+    ) -> None:
+        """Initialize the endpoint."""
+        self.vehicles = dict(vehicles or {})
+        self.latency = latency
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.truncate_rate = truncate_rate
+        # Keys that are accepted; None accepts any key.
+        self.api_keys = api_keys
+        # (API key, registration) for every request, in order.
+        self.requests: list[tuple[str, str]] = []
+        self.statuses: Counter[int] = Counter()
+        self._random = random.Random(seed)
+        self._server: TestServer | None = None
+
+    @property
+    def url(self) -> str:
+        """Return the URL of the vehicles endpoint."""
+        assert self._server is not None
+        return str(self._server.make_url(PATH))
+
+    def count(self, reg_number: str | None = None, api_key: str | None = None) -> int:
+        """Return how many requests were made, optionally for a plate or key."""
+        return sum(
+            1
+            for key, reg in self.requests
+            if (reg_number is None or reg == reg_number)
+            and (api_key is None or key == api_key)
+        )
+
+    def reset(self) -> None:
+        """Forget the requests made so far."""
+        self.requests.clear()
+        self.statuses.clear()
+
+    async def start(self) -> None:
+        """Start serving."""
+        app = web.Application()
+        app.router.add_post(PATH, self._handle)
+        self._server = TestServer(app)
+        await self._server.start_server()
+
+    async def close(self) -> None:
+        """Stop serving."""
+        if self._server is not None:
+            await self._server.close()
+
+    async def _handle(self, request: web.Request) -> web.StreamResponse:
+        """Answer a vehicle enquiry."""
+        api_key = request.headers.get("x-api-key", "")
+        reg_number = str((await request.json()).get("registrationNumber", ""))
+        self.requests.append((api_key, reg_number))
+
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        if self.api_keys is not None and api_key not in self.api_keys:
+            return self._respond(403, {"message": "Forbidden"})
+
+        if self._random.random() < self.rate_limit_rate:
+            headers = {}
+            if self.retry_after is not None:
+                headers[RETRY_AFTER] = str(self.retry_after)
+            return self._respond(429, {"message": "Too Many Requests"}, headers)
+
+        if self._random.random() < self.error_rate:
+            return self._respond(
+                500,
+                _errors(500, "Internal Server Error", "System error occurred"),
+            )
+
+        if (vehicle := self.vehicles.get(reg_number)) is None:
+            return self._respond(
+                404, _errors(404, "Vehicle Not Found", "Record for vehicle not found")
+            )
+
+        if self._random.random() < self.truncate_rate:
+            return await self._truncated(request, vehicle)
+
+        return self._respond(200, vehicle)
+
+    def _respond(
+        self, status: int, body: dict[str, Any], headers: dict[str, str] | None = None
+    ) -> web.Response:
+        """Return a JSON response, counting its status."""
+        self.statuses[status] += 1
+        return web.json_response(body, status=status, headers=headers)
+
+    async def _truncated(
+        self, request: web.Request, body: dict[str, Any]
+    ) -> web.StreamResponse:
+        """Send half of a response body, then drop the connection."""
+        self.statuses[200] += 1
+        payload = json.dumps(body).encode("utf-8")
+        response = web.StreamResponse(status=200)
+        response.content_type = "application/json"
+        response.content_length = len(payload)
+        await response.prepare(request)
+        await response.write(payload[: len(payload) // 2])
+        assert request.transport is not None
+        request.transport.close()
+        return response
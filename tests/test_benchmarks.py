@@ -0,0 +1,276 @@
+"""Benchmarks against the mock VES server.
+
+Run with ``pytest --benchmark``; add ``--benchmark-json PATH`` to save the
+results as JSON for comparing runs.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable
+import gc
+import time
+import tracemalloc
+
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from homeassistant.core import HomeAssistant
+from homeassistant.setup import async_setup_component
+
+from custom_components.dvla import _async_single_lookup
+from custom_components.dvla.cache import async_get_lookup_cache
+from custom_components.dvla.calendar import async_sync_calendars, vehicle_events
+from custom_components.dvla.const import (
+    ATTR_API_KEY,
+    ATTR_REG_NUMBER,
+    DOMAIN,
+    SERVICE_LOOKUP,
+)
+from custom_components.dvla.coordinator import (
+    DVLACoordinator,
+    async_close_session,
+    async_get_session,
+)
+from custom_components.dvla.limiter import async_get_limiter
+from custom_components.dvla.metrics import MetricsRegistry
+from custom_components.dvla.models import Vehicle
+
+from . import API_KEY, RATE_LIMIT, async_wait_for_refresh, fleet_data
+from .conftest import MockCalendar
+from .mock_ves import MockVES, synthetic_fleet
+
+pytestmark = pytest.mark.benchmark
+
+# Simulated round trip to the VES API, in seconds.
+LATENCY = 0.02
+
+
+async def _async_coordinator(
+    hass: HomeAssistant, reg_numbers: list[str]
+) -> DVLACoordinator:
+    """Return a coordinator for a fleet, with metrics and an unthrottled key."""
+    limiter = await async_get_limiter(hass, API_KEY, RATE_LIMIT, 0)
+    return DVLACoordinator(
+        hass,
+        async_get_session(hass),
+        fleet_data(reg_numbers),
+        limiter,
+        metrics=MetricsRegistry(),
+    )
+
+
+@pytest.mark.parametrize("count", [1, 50, 500])
+async def test_refresh(
+    hass: HomeAssistant,
+    ves: MockVES,
+    benchmark: Callable[..., None],
+    count: int,
+) -> None:
+    """Benchmark a full refresh of a fleet."""
+    ves.vehicles = synthetic_fleet(count)
+    ves.latency = LATENCY
+    coordinator = await _async_coordinator(hass, list(ves.vehicles))
+
+    started = time.perf_counter()
+    await coordinator.async_refresh()
+    elapsed = time.perf_counter() - started
+    await async_close_session(hass)
+
+    assert coordinator.last_update_success
+    assert len(coordinator.data) == count
+    assert ves.count() == count
+
+    benchmark(
+        "refresh",
+        vehicles=count,
+        latency_ms=LATENCY * 1000,
+        seconds=round(elapsed, 4),
+        requests=ves.count(),
+        vehicles_per_second=round(count / elapsed, 1),
+        average_latency_ms=coordinator.metrics.for_key(API_KEY).average_latency,
+    )
+
+
+async def test_lookup_burst(
+    hass: HomeAssistant, ves: MockVES, benchmark: Callable[..., None]
+) -> None:
+    """Benchmark a burst of lookups, direct and through the cached service."""
+    ves.vehicles = synthetic_fleet(50)
+    ves.latency = LATENCY
+    reg_numbers = list(ves.vehicles)
+    calls = 500
+    await async_get_limiter(hass, API_KEY, RATE_LIMIT, 0)
+
+    started = time.perf_counter()
+    await asyncio.gather(
+        *(
+            _async_single_lookup(hass, [API_KEY], reg_number)
+            for reg_number in reg_numbers
+        )
+    )
+    direct = time.perf_counter() - started
+    assert ves.count() == len(reg_numbers)
+
+    assert await async_setup_component(hass, DOMAIN, {})
+    ves.reset()
+    started = time.perf_counter()
+    await asyncio.gather(
+        *(
+            hass.services.async_call(
+                DOMAIN,
+                SERVICE_LOOKUP,
+                {
+                    ATTR_REG_NUMBER: reg_numbers[call % len(reg_numbers)],
+                    ATTR_API_KEY: API_KEY,
+                },
+                blocking=True,
+                return_response=True,
+            )
+            for call in range(calls)
+        )
+    )
+    service = time.perf_counter() - started
+    await async_close_session(hass)
+
+    cache = async_get_lookup_cache(hass)
+    assert ves.count() == len(reg_numbers)
+
+    benchmark(
+        "lookup_burst",
+        vehicles=len(reg_numbers),
+        latency_ms=LATENCY * 1000,
+        direct_seconds=round(direct, 4),
+        direct_lookups_per_second=round(len(reg_numbers) / direct, 1),
+        service_calls=calls,
+        service_seconds=round(service, 4),
+        service_calls_per_second=round(calls / service, 1),
+        service_requests=ves.count(),
+        cache_hit_rate=cache.hit_rate,
+    )
+
+
+@pytest.mark.parametrize("count", [50, 200])
+async def test_startup(
+    hass: HomeAssistant,
+    ves: MockVES,
+    benchmark: Callable[..., None],
+    count: int,
+) -> None:
+    """Benchmark setting up a fleet entry, then its first background refresh."""
+    ves.vehicles = synthetic_fleet(count)
+    ves.latency = LATENCY
+    entry = MockConfigEntry(domain=DOMAIN, data=fleet_data(list(ves.vehicles)))
+    entry.add_to_hass(hass)
+
+    started = time.perf_counter()
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    setup = time.perf_counter() - started
+    entities = len(hass.states.async_entity_ids())
+
+    await async_wait_for_refresh(hass, entry)
+    refreshed = time.perf_counter() - started
+
+    assert entities > 0
+    assert ves.count() == count
+
+    benchmark(
+        "startup",
+        vehicles=count,
+        latency_ms=LATENCY * 1000,
+        setup_seconds=round(setup, 4),
+        entities_at_setup=entities,
+        first_refresh_seconds=round(refreshed, 4),
+        requests=ves.count(),
+    )
+
+
+@pytest.mark.parametrize("count", [50, 500])
+async def test_calendar_sync(
+    hass: HomeAssistant,
+    calendar: MockCalendar,
+    benchmark: Callable[..., None],
+    count: int,
+) -> None:
+    """Benchmark adding a fleet's events to a calendar, then syncing again."""
+    fleet = synthetic_fleet(count)
+    entry = MockConfigEntry(domain=DOMAIN, data=fleet_data(list(fleet)))
+    entry.add_to_hass(hass)
+    coordinator = DVLACoordinator(hass, None, entry.data)
+    coordinator.async_set_updated_data(
+        {reg_number: Vehicle.from_dict(body) for reg_number, body in fleet.items()}
+    )
+    events = [
+        event
+        for reg_number in coordinator.reg_numbers
+        for event in vehicle_events(coordinator, reg_number)
+    ]
+
+    started = time.perf_counter()
+    await async_sync_calendars(hass, entry, ["calendar.dvla"], events)
+    first = time.perf_counter() - started
+    created = calendar.create_calls
+
+    started = time.perf_counter()
+    await async_sync_calendars(hass, entry, ["calendar.dvla"], events)
+    again = time.perf_counter() - started
+
+    assert created == len(events)
+    assert calendar.create_calls == created
+
+    benchmark(
+        "calendar_sync",
+        vehicles=count,
+        events=len(events),
+        first_sync_seconds=round(first, 4),
+        repeat_sync_seconds=round(again, 4),
+        events_created=created,
+        calendar_reads=calendar.get_calls,
+    )
+
+
+async def _async_retained_memory(
+    hass: HomeAssistant, ves: MockVES, count: int
+) -> int:
+    """Return the bytes still allocated after refreshing a new fleet.
+
+    The mock server's own record of the requests is not counted.
+    """
+    ves.vehicles = synthetic_fleet(count)
+    coordinator = await _async_coordinator(hass, list(ves.vehicles))
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        await coordinator.async_refresh()
+        ves.reset()
+        gc.collect()
+        retained = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+
+    assert len(coordinator.data) == count
+    return retained
+
+
+async def test_memory_per_vehicle(
+    hass: HomeAssistant, ves: MockVES, benchmark: Callable[..., None]
+) -> None:
+    """Benchmark the memory kept for each vehicle.
+
+    Two fleet sizes are refreshed and the difference is divided by the
+    difference in vehicles, so fixed costs such as the connection pool
+    are left out.
+    """
+    small, large = 100, 500
+    small_bytes = await _async_retained_memory(hass, ves, small)
+    large_bytes = await _async_retained_memory(hass, ves, large)
+    await async_close_session(hass)
+
+    benchmark(
+        "memory",
+        vehicles=[small, large],
+        retained_bytes=[small_bytes, large_bytes],
+        bytes_per_vehicle=round((large_bytes - small_bytes) / (large - small)),
+    )
@@ -0,0 +1,95 @@
+"""Tests for the circuit breaker."""
+
+from __future__ import annotations
+
+from collections.abc import Generator
+from unittest.mock import patch
+
+import pytest
+
+from custom_components.dvla.breaker import (
+    FAILURE_THRESHOLD,
+    RESET_TIMEOUT,
+    STATE_CLOSED,
+    STATE_HALF_OPEN,
+    STATE_OPEN,
+    CircuitBreaker,
+)
+
+from . import MockClock
+
+
+@pytest.fixture
+def clock() -> Generator[MockClock, None, None]:
+    """Run the breaker on a clock that only moves when told to."""
+    mock_clock = MockClock()
+    with patch("custom_components.dvla.breaker.time", mock_clock):
+        yield mock_clock
+
+
+@pytest.fixture
+def breaker(clock: MockClock) -> CircuitBreaker:
+    """Return a breaker opened by consecutive failures."""
+    breaker = CircuitBreaker()
+    for _ in range(FAILURE_THRESHOLD):
+        assert breaker.allow_request()
+        breaker.record_failure()
+    return breaker
+
+
+def test_opens_after_failures(clock: MockClock) -> None:
+    """Test the circuit only opens after enough consecutive failures."""
+    breaker = CircuitBreaker()
+    for _ in range(FAILURE_THRESHOLD - 1):
+        breaker.record_failure()
+    breaker.record_success()
+    for _ in range(FAILURE_THRESHOLD - 1):
+        breaker.record_failure()
+
+    assert breaker.state == STATE_CLOSED
+    breaker.record_failure()
+
+    assert breaker.state == STATE_OPEN
+    assert breaker.as_dict()["opened_at"] is not None
+    assert not breaker.available
+    assert not breaker.allow_request()
+
+
+def test_probe_closes_circuit(breaker: CircuitBreaker, clock: MockClock) -> None:
+    """Test a single probe is let through after the reset timeout."""
+    clock.now += RESET_TIMEOUT - 1
+    assert not breaker.allow_request()
+
+    clock.now += 1
+    assert breaker.available
+    assert breaker.allow_request()
+    assert breaker.state == STATE_HALF_OPEN
+    assert not breaker.available
+    assert not breaker.allow_request()
+
+    breaker.record_success()
+    assert breaker.state == STATE_CLOSED
+    assert breaker.failures == 0
+    assert breaker.allow_request()
+
+
+def test_failed_probe_reopens(breaker: CircuitBreaker, clock: MockClock) -> None:
+    """Test a failed probe opens the circuit for another full timeout."""
+    clock.now += RESET_TIMEOUT
+    assert breaker.allow_request()
+    breaker.record_failure()
+
+    assert breaker.state == STATE_OPEN
+    clock.now += RESET_TIMEOUT - 1
+    assert not breaker.allow_request()
+
+
+def test_release_frees_probe(breaker: CircuitBreaker, clock: MockClock) -> None:
+    """Test a cancelled probe lets the next caller probe instead."""
+    clock.now += RESET_TIMEOUT
+    assert breaker.allow_request()
+    assert not breaker.allow_request()
+
+    breaker.release()
+    assert breaker.state == STATE_HALF_OPEN
+    assert breaker.allow_request()
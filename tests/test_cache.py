@@ -0,0 +1,90 @@
+"""Tests for the lookup cache."""
+
+from __future__ import annotations
+
+import asyncio
+from unittest.mock import patch
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.dvla.cache import LookupCache, async_get_lookup_cache
+from custom_components.dvla.const import CONF_CACHE_SIZE, CONF_CACHE_TTL
+
+from . import fleet_data, init_integration
+from .mock_ves import MockVES, synthetic_fleet
+
+
+def test_expiry_and_eviction() -> None:
+    """Test responses expire after the TTL and the oldest are evicted."""
+    cache = LookupCache(60, 2)
+
+    with patch("custom_components.dvla.cache.time.monotonic", return_value=0):
+        cache.set("AB12CDE", {"make": "FORD"})
+        cache.set("XY34FGH", {"make": "BMW"})
+        # Reading a response makes it the most recently used.
+        assert cache.get("AB12CDE") == {"make": "FORD"}
+        cache.set("CD56EFG", {"make": "AUDI"})
+
+    assert len(cache) == 2
+    assert cache.get("XY34FGH") is None
+
+    with patch("custom_components.dvla.cache.time.monotonic", return_value=60):
+        assert cache.get("AB12CDE") is None
+    assert len(cache) == 1
+
+    cache.configure(60, 0)
+    assert len(cache) == 0
+
+
+async def test_shares_inflight_request() -> None:
+    """Test concurrent lookups of one key share a single fetch."""
+    cache = LookupCache(60, 10)
+    release = asyncio.Event()
+    calls = 0
+
+    async def fetch() -> dict[str, str]:
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return {"make": "FORD"}
+
+    tasks = [
+        asyncio.create_task(cache.async_get("AB12CDE", fetch)),
+        asyncio.create_task(cache.async_get("AB12CDE", fetch, force_refresh=True)),
+    ]
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await asyncio.gather(*tasks) == [{"make": "FORD"}] * 2
+    assert await cache.async_get("AB12CDE", fetch) == {"make": "FORD"}
+    assert calls == 1
+    assert (cache.hits, cache.misses, cache.hit_rate) == (2, 1, 66.7)
+
+
+async def test_settings_from_first_entry(hass: HomeAssistant, ves: MockVES) -> None:
+    """Test the shared cache takes its settings from the first entry only."""
+    ves.vehicles = synthetic_fleet(2)
+    first, second = list(ves.vehicles)
+    entries = [
+        await init_integration(
+            hass, fleet_data([first], **{CONF_CACHE_TTL: 120, CONF_CACHE_SIZE: 10})
+        ),
+        await init_integration(
+            hass, fleet_data([second], **{CONF_CACHE_TTL: 900, CONF_CACHE_SIZE: 50})
+        ),
+    ]
+    cache = async_get_lookup_cache(hass)
+
+    assert (cache.ttl, cache.max_size) == (120, 10)
+
+    for entry, offered in zip(entries, (True, False)):
+        result = await hass.config_entries.options.async_init(entry.entry_id)
+        keys = {key.schema for key in result["data_schema"].schema}
+        assert (CONF_CACHE_TTL in keys) is offered
+        assert (CONF_CACHE_SIZE in keys) is offered
+        hass.config_entries.options.async_abort(result["flow_id"])
+
+    for entry in entries:
+        assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
+
@@ -0,0 +1,154 @@
+"""Tests for the DVLA calendar platform."""
+
+from __future__ import annotations
+
+from datetime import timedelta
+
+from freezegun.api import FrozenDateTimeFactory
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_time_changed,
+)
+
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+from custom_components.dvla.calendar import (
+    DVLACalendarSensor,
+    async_sync_calendars,
+    vehicle_events,
+)
+from custom_components.dvla.const import CONF_CALENDARS, DOMAIN
+from custom_components.dvla.coordinator import DVLACoordinator
+from custom_components.dvla.models import Vehicle
+
+from . import async_wait_for_refresh, fleet_data, init_integration
+from .conftest import MockCalendar
+from .mock_ves import MockVES, synthetic_fleet
+
+CALENDAR = "calendar.dvla"
+
+
+async def test_concurrent_syncs_add_each_event_once(
+    hass: HomeAssistant, ves: MockVES, calendar: MockCalendar
+) -> None:
+    """Test a sync started while another runs does not add events twice."""
+    ves.vehicles = synthetic_fleet(3)
+    entry = await init_integration(
+        hass, fleet_data(list(ves.vehicles), **{CONF_CALENDARS: [CALENDAR]})
+    )
+    coordinator: DVLACoordinator = hass.data[DOMAIN][entry.entry_id]
+    calendar.events.clear()
+    calendar.create_calls = 0
+
+    # Two refreshes that changed every vehicle each start a sync at once.
+    coordinator.changed = {reg_number: set() for reg_number in ves.vehicles}
+    coordinator.async_update_listeners()
+    coordinator.async_update_listeners()
+    await async_wait_for_refresh(hass, entry)
+
+    added = [(event["start"], event["summary"]) for event in calendar.events[CALENDAR]]
+    assert added
+    assert len(added) == len(set(added)) == calendar.create_calls
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+
+
+async def test_failed_event_uid_not_recorded(
+    hass: HomeAssistant, calendar: MockCalendar
+) -> None:
+    """Test only events in the calendar have their uids recorded."""
+    fleet = synthetic_fleet(1)
+    (reg_number,) = fleet
+    entry = MockConfigEntry(domain=DOMAIN, data=fleet_data(list(fleet)))
+    entry.add_to_hass(hass)
+    coordinator = DVLACoordinator(hass, None, entry.data)
+    coordinator.async_set_updated_data(
+        {reg_number: Vehicle.from_dict(fleet[reg_number])}
+    )
+    events = vehicle_events(coordinator, reg_number)
+    calendar.rejected = {events[0].summary}
+
+    await async_sync_calendars(hass, entry, [CALENDAR], events)
+    recorded = len(entry.data["uids"])
+
+    assert recorded == len(events) - 1
+    assert [event["summary"] for event in calendar.events[CALENDAR]] == [
+        event.summary for event in events[1:]
+    ]
+
+    # The rejected event is tried again, and recorded once it is added.
+    calendar.rejected = set()
+    await async_sync_calendars(hass, entry, [CALENDAR], events)
+
+    assert len(entry.data["uids"]) == len(events)
+    assert len(calendar.events[CALENDAR]) == len(events)
+
+
+async def test_events_sorted_and_sliced_by_date(hass: HomeAssistant) -> None:
+    """Test events come back in date order, limited to the requested range."""
+    fleet = synthetic_fleet(1)
+    (reg_number,) = fleet
+    today = dt_util.now().date()
+    fleet[reg_number].update(
+        taxDueDate=(today + timedelta(days=30)).isoformat(),
+        motExpiryDate=(today + timedelta(days=10)).isoformat(),
+        dateOfLastV5CIssued=(today - timedelta(days=100)).isoformat(),
+    )
+    coordinator = DVLACoordinator(hass, None, fleet_data(list(fleet)))
+    coordinator.async_set_updated_data(
+        {reg_number: Vehicle.from_dict(fleet[reg_number])}
+    )
+    entity = DVLACalendarSensor(coordinator, reg_number)
+    v5c, mot, tax = entity._events
+
+    assert [v5c.start, mot.start, tax.start] == [
+        today - timedelta(days=100),
+        today + timedelta(days=10),
+        today + timedelta(days=30),
+    ]
+    assert entity.event == mot
+
+    async def events_between(first: int, last: int) -> list:
+        """Return the events between two days from today."""
+        now = dt_util.now()
+        return await entity.async_get_events(
+            hass, now + timedelta(days=first), now + timedelta(days=last)
+        )
+
+    assert await events_between(-365, 365) == [v5c, mot, tax]
+    assert await events_between(0, 30) == [mot, tax]
+    assert await events_between(10, 10) == [mot]
+    assert await events_between(11, 29) == []
+    assert await events_between(31, 365) == []
+
+
+async def test_midnight_moves_to_next_event(
+    hass: HomeAssistant, ves: MockVES, freezer: FrozenDateTimeFactory
+) -> None:
+    """Test an event that has passed is dropped at midnight without a refresh."""
+    midnight = dt_util.start_of_local_day() + timedelta(days=1)
+    freezer.move_to(midnight - timedelta(hours=1))
+    ves.vehicles = synthetic_fleet(1)
+    (reg_number,) = ves.vehicles
+    today = dt_util.now().date()
+    ves.vehicles[reg_number].update(
+        taxDueDate=today.isoformat(),
+        motExpiryDate=(today + timedelta(days=3)).isoformat(),
+    )
+    entry = await init_integration(
+        hass, fleet_data(list(ves.vehicles), **{CONF_CALENDARS: ["None"]})
+    )
+    entity_id = f"calendar.dvla_{reg_number.lower()}"
+    requests = ves.count()
+
+    assert hass.states.get(entity_id).attributes["message"].startswith("Tax Due")
+
+    freezer.move_to(midnight)
+    async_fire_time_changed(hass, midnight)
+    await hass.async_block_till_done()
+
+    assert hass.states.get(entity_id).attributes["message"].startswith("MOT Expiry")
+    assert ves.count() == requests
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
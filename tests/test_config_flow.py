@@ -0,0 +1,212 @@
+"""Tests for the DVLA config flow."""
+
+from __future__ import annotations
+
+import pytest
+import voluptuous as vol
+
+from homeassistant import config_entries
+from homeassistant.components.calendar import CalendarEntityFeature
+from homeassistant.const import CONF_API_KEY, CONF_SCAN_INTERVAL
+from homeassistant.core import HomeAssistant
+from homeassistant.data_entry_flow import FlowResultType
+from homeassistant.helpers import entity_registry as er
+
+from custom_components.dvla.cache import async_get_handoff
+from custom_components.dvla.config_flow import (
+    _format_api_keys,
+    _parse_api_keys,
+    _parse_import,
+)
+from custom_components.dvla.const import (
+    CONF_API_KEYS,
+    CONF_CALENDARS,
+    CONF_MONTHLY_BUDGET,
+    CONF_RATE_LIMIT,
+    CONF_REG_NUMBERS,
+    DEFAULT_SCAN_INTERVAL,
+    DOMAIN,
+)
+
+from . import API_KEY, async_wait_for_refresh, fleet_data, init_integration
+from .mock_ves import MockVES, synthetic_fleet
+
+
+def test_parse_api_keys() -> None:
+    """Test extra API keys are read with their own rate and budget."""
+    api_keys = _parse_api_keys(
+        f"second:2.5:500\n{API_KEY}\nthird:0.5, fourth\nfifth::100\nsecond",
+        API_KEY,
+    )
+
+    assert api_keys == [
+        {CONF_API_KEY: "second", CONF_RATE_LIMIT: 2.5, CONF_MONTHLY_BUDGET: 500},
+        {CONF_API_KEY: "third", CONF_RATE_LIMIT: 0.5},
+        {CONF_API_KEY: "fourth"},
+        {CONF_API_KEY: "fifth", CONF_MONTHLY_BUDGET: 100},
+    ]
+    assert _parse_api_keys(_format_api_keys(api_keys), API_KEY) == api_keys
+
+
+@pytest.mark.parametrize(
+    "value", ["second:fast", "second:0", "second:1:-5", "second:1:2:3", ":1"]
+)
+def test_parse_api_keys_invalid(value: str) -> None:
+    """Test a malformed rate or budget is rejected."""
+    with pytest.raises(vol.Invalid):
+        _parse_api_keys(value, API_KEY)
+
+
+async def test_options_invalid_api_keys(hass: HomeAssistant, ves: MockVES) -> None:
+    """Test the options form reports malformed API keys without saving them."""
+    ves.vehicles = synthetic_fleet(1)
+    entry = await init_integration(hass, fleet_data(list(ves.vehicles)))
+    result = await hass.config_entries.options.async_init(entry.entry_id)
+    user_input = {
+        key.schema: key.default()
+        for key in result["data_schema"].schema
+        if key.default is not vol.UNDEFINED
+    }
+
+    result = await hass.config_entries.options.async_configure(
+        result["flow_id"], {**user_input, CONF_API_KEYS: "second:fast"}
+    )
+
+    assert result["type"] is FlowResultType.FORM
+    assert result["errors"] == {CONF_API_KEYS: "invalid_api_keys"}
+    assert CONF_API_KEYS not in entry.data
+
+
+@pytest.mark.parametrize(
+    ("value", "reg_numbers", "unparsed"),
+    [
+        ("AB12 CDE\nxy34fgh\nAB12CDE", ["AB12CDE", "XY34FGH"], []),
+        (
+            "AB12CDE, XY34FGH\nCD56EFG; GH78IJK",
+            ["AB12CDE", "XY34FGH", "CD56EFG", "GH78IJK"],
+            [],
+        ),
+        ("AB12CDE\nnot a plate!", ["AB12CDE"], ["not a plate!"]),
+        ("Registration\nAB12CDE\nXY34FGH", ["AB12CDE", "XY34FGH"], []),
+        ("REG 1\nAB12CDE", ["REG1", "AB12CDE"], []),
+        (
+            "Make,Vehicle Reg,Colour\nFord,AB12 CDE,Blue\nVauxhall,,Red\nBMW",
+            ["AB12CDE"],
+            ["Vauxhall,,Red", "BMW"],
+        ),
+        ('"VRM","Make"\n"AB12CDE","Ford"', ["AB12CDE"], []),
+        ("", [], []),
+    ],
+    ids=[
+        "lines",
+        "commas-over-lines",
+        "unparsed",
+        "header-only-column",
+        "plate-like-header",
+        "csv",
+        "quoted-csv",
+        "empty",
+    ],
+)
+def test_parse_import(value: str, reg_numbers: list[str], unparsed: list[str]) -> None:
+    """Test registrations are read from a pasted list or CSV."""
+    assert _parse_import(value) == (reg_numbers, unparsed)
+
+
+async def test_import_reports_unparsed_input(
+    hass: HomeAssistant, ves: MockVES
+) -> None:
+    """Test input that is not a registration is listed in the import report."""
+    ves.vehicles = synthetic_fleet(2)
+    result = await hass.config_entries.flow.async_init(
+        DOMAIN, context={"source": config_entries.SOURCE_USER}
+    )
+    result = await hass.config_entries.flow.async_configure(
+        result["flow_id"], {"next_step_id": "import_fleet"}
+    )
+    result = await hass.config_entries.flow.async_configure(
+        result["flow_id"],
+        {
+            CONF_API_KEY: API_KEY,
+            CONF_REG_NUMBERS: "\n".join([*ves.vehicles, "not a plate!"]),
+            CONF_SCAN_INTERVAL: DEFAULT_SCAN_INTERVAL,
+            CONF_CALENDARS: ["None"],
+        },
+    )
+
+    assert result["type"] is FlowResultType.FORM
+    assert result["step_id"] == "import_report"
+    assert result["description_placeholders"] == {
+        "count": "2",
+        "report": "- not a plate!: not a registration",
+    }
+    assert ves.count() == len(ves.vehicles)
+    handoff = async_get_handoff(hass)
+    assert len(handoff) == len(ves.vehicles)
+
+    result = await hass.config_entries.flow.async_configure(result["flow_id"], {})
+    await hass.async_block_till_done()
+
+    assert result["type"] is FlowResultType.CREATE_ENTRY
+    assert result["data"][CONF_REG_NUMBERS] == list(ves.vehicles)
+
+    # The new entry starts from the responses fetched while validating, and
+    # its first refresh finds nothing due.
+    entry = result["result"]
+    await async_wait_for_refresh(hass, entry)
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    assert len(handoff) == 0
+    assert {
+        reg_number: coordinator.vehicle(reg_number).raw for reg_number in ves.vehicles
+    } == ves.vehicles
+    await coordinator.async_refresh()
+    assert coordinator.last_update_success
+    assert ves.count() == len(ves.vehicles)
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+
+
+async def test_import_joins_existing_fleet(hass: HomeAssistant, ves: MockVES) -> None:
+    """Test an import joining a fleet adds its calendars and keeps the interval."""
+    ves.vehicles = synthetic_fleet(3)
+    existing, *imported = list(ves.vehicles)
+    entity_registry = er.async_get(hass)
+    for object_id in ("work", "home"):
+        entity_registry.async_get_or_create(
+            "calendar", "local_calendar", object_id, suggested_object_id=object_id
+        )
+        hass.states.async_set(
+            f"calendar.{object_id}",
+            "off",
+            {"supported_features": CalendarEntityFeature.CREATE_EVENT},
+        )
+    entry = await init_integration(
+        hass, fleet_data([existing], **{CONF_CALENDARS: ["calendar.work"]})
+    )
+    result = await hass.config_entries.flow.async_init(
+        DOMAIN, context={"source": config_entries.SOURCE_USER}
+    )
+    result = await hass.config_entries.flow.async_configure(
+        result["flow_id"], {"next_step_id": "import_fleet"}
+    )
+    result = await hass.config_entries.flow.async_configure(
+        result["flow_id"],
+        {
+            CONF_API_KEY: API_KEY,
+            CONF_REG_NUMBERS: "\n".join(imported),
+            CONF_SCAN_INTERVAL: DEFAULT_SCAN_INTERVAL * 2,
+            CONF_CALENDARS: ["calendar.work", "calendar.home"],
+        },
+    )
+    await hass.async_block_till_done()
+
+    assert result["type"] is FlowResultType.ABORT
+    assert result["reason"] == "import_added_interval_kept"
+    assert result["description_placeholders"]["scan_interval"] == str(
+        DEFAULT_SCAN_INTERVAL
+    )
+    assert entry.data[CONF_REG_NUMBERS] == list(ves.vehicles)
+    assert entry.data[CONF_CALENDARS] == ["calendar.work", "calendar.home"]
+    assert entry.data[CONF_SCAN_INTERVAL] == DEFAULT_SCAN_INTERVAL
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
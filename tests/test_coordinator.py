@@ -0,0 +1,273 @@
+"""Tests for fetching vehicles from the DVLA API."""
+
+from __future__ import annotations
+
+from datetime import date, timedelta
+from unittest.mock import patch
+
+from freezegun.api import FrozenDateTimeFactory
+import pytest
+
+from homeassistant.const import CONF_SCAN_INTERVAL
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+from custom_components.dvla.const import CONF_ADAPTIVE_POLLING
+from custom_components.dvla.coordinator import (
+    ADAPTIVE_MAX_INTERVAL,
+    FAILED_RETRY_INTERVAL,
+    RETRY_ATTEMPTS,
+    RETRY_MAX_DELAY,
+    APIRatelimitExceeded,
+    CannotConnect,
+    DVLACoordinator,
+    adaptive_interval,
+    async_close_session,
+    async_fetch_many,
+    async_fetch_vehicle,
+    async_get_session,
+    next_slot,
+    phase,
+)
+from custom_components.dvla.limiter import async_get_limiter
+from custom_components.dvla.models import Vehicle
+
+from . import API_KEY, RATE_LIMIT, fleet_data
+from .mock_ves import MockVES, synthetic_fleet
+
+
+async def test_rate_limit_defers_every_attempt(
+    hass: HomeAssistant, ves: MockVES
+) -> None:
+    """Test a 429 on the final attempt still holds back the API key."""
+    ves.vehicles = synthetic_fleet(1)
+    ves.rate_limit_rate = 1
+    ves.retry_after = 0
+    limiter = await async_get_limiter(hass, API_KEY, RATE_LIMIT, 0)
+    (reg_number,) = ves.vehicles
+
+    with (
+        patch.object(limiter, "defer", wraps=limiter.defer) as defer,
+        pytest.raises(APIRatelimitExceeded),
+    ):
+        await async_fetch_vehicle(
+            async_get_session(hass), API_KEY, reg_number, limiter
+        )
+    await async_close_session(hass)
+
+    assert ves.count() == RETRY_ATTEMPTS
+    assert defer.call_count == RETRY_ATTEMPTS
+
+
+async def test_long_retry_after_defers_and_fails_fast(
+    hass: HomeAssistant, ves: MockVES
+) -> None:
+    """Test a Retry-After beyond the maximum delay holds back later requests."""
+    ves.vehicles = synthetic_fleet(2)
+    ves.rate_limit_rate = 1
+    ves.retry_after = RETRY_MAX_DELAY * 2
+    limiter = await async_get_limiter(hass, API_KEY, RATE_LIMIT, 0)
+    session = async_get_session(hass)
+    first, second = ves.vehicles
+
+    with pytest.raises(APIRatelimitExceeded) as err:
+        await async_fetch_vehicle(session, API_KEY, first, limiter)
+    assert err.value.retry_after == RETRY_MAX_DELAY * 2
+    assert limiter.resume_in > RETRY_MAX_DELAY
+
+    # Nothing is sent while the key is held back.
+    with pytest.raises(APIRatelimitExceeded) as err:
+        await async_fetch_vehicle(session, API_KEY, second, limiter)
+    await async_close_session(hass)
+
+    assert err.value.retry_after > RETRY_MAX_DELAY
+    assert ves.count() == 1
+
+
+async def test_retry_interval_honours_retry_after(
+    hass: HomeAssistant, ves: MockVES, freezer: FrozenDateTimeFactory
+) -> None:
+    """Test a rate limited vehicle is not requested again before Retry-After."""
+    retry_after = FAILED_RETRY_INTERVAL * 4
+    ves.vehicles = synthetic_fleet(1)
+    ves.rate_limit_rate = 1
+    ves.retry_after = int(retry_after.total_seconds())
+    limiter = await async_get_limiter(hass, API_KEY, RATE_LIMIT, 0)
+    coordinator = DVLACoordinator(
+        hass, async_get_session(hass), fleet_data(list(ves.vehicles)), limiter
+    )
+
+    await coordinator.async_refresh()
+    await async_close_session(hass)
+
+    assert not coordinator.last_update_success
+    assert ves.count() == 1
+
+    freezer.tick(FAILED_RETRY_INTERVAL * 2)
+    assert coordinator.due_registrations() == []
+
+    freezer.tick(retry_after)
+    assert coordinator.due_registrations() == list(ves.vehicles)
+
+
+async def test_truncated_response_cannot_connect(
+    hass: HomeAssistant, ves: MockVES
+) -> None:
+    """Test a body cut off mid-response is retried, then fails every plate."""
+    ves.vehicles = synthetic_fleet(3)
+    ves.truncate_rate = 1
+    session = async_get_session(hass)
+
+    with patch("custom_components.dvla.coordinator.retry_delay", return_value=0):
+        results = await async_fetch_many(
+            lambda reg_number: async_fetch_vehicle(session, API_KEY, reg_number),
+            ves.vehicles,
+        )
+    await async_close_session(hass)
+
+    assert set(results) == set(ves.vehicles)
+    assert all(isinstance(result, CannotConnect) for result in results.values())
+    assert ves.count() == len(ves.vehicles) * RETRY_ATTEMPTS
+
+
+async def test_updated_only_moves_when_record_changes(
+    hass: HomeAssistant, ves: MockVES, freezer: FrozenDateTimeFactory
+) -> None:
+    """Test the change time stays put across a refresh with the same record."""
+    ves.vehicles = synthetic_fleet(1)
+    (reg_number,) = ves.vehicles
+    coordinator = DVLACoordinator(
+        hass, async_get_session(hass), fleet_data(list(ves.vehicles))
+    )
+
+    await coordinator.async_refresh()
+    first = coordinator.updated[reg_number]
+    assert coordinator.fetched[reg_number] == first
+
+    freezer.tick(timedelta(days=2))
+    await coordinator.async_refresh()
+    assert coordinator.fetched[reg_number] > first
+    assert coordinator.updated[reg_number] == first
+
+    ves.vehicles[reg_number]["colour"] = "GREEN"
+    freezer.tick(timedelta(days=2))
+    await coordinator.async_refresh()
+    await async_close_session(hass)
+
+    assert coordinator.updated[reg_number] == coordinator.fetched[reg_number]
+    assert coordinator.updated[reg_number] > first
+    assert coordinator._data_to_save()[reg_number]["updated"] == (
+        coordinator.updated[reg_number].isoformat()
+    )
+
+
+TODAY = date(2026, 3, 10)
+FLOOR = timedelta(hours=6)
+
+
+@pytest.mark.parametrize(
+    ("tax_due", "mot_expiry", "expected"),
+    [
+        # Due today, or a day either side, polls as often as the floor allows.
+        (0, 200, FLOOR),
+        (1, None, FLOOR),
+        (-1, None, FLOOR),
+        # Part of the way to the nearest date.
+        (8, 200, timedelta(days=2)),
+        (200, -12, timedelta(days=3)),
+        # Far off or unknown dates wait no longer than the ceiling.
+        (200, 300, ADAPTIVE_MAX_INTERVAL),
+        (None, None, ADAPTIVE_MAX_INTERVAL),
+    ],
+)
+def test_adaptive_interval_clamped(
+    tax_due: int | None, mot_expiry: int | None, expected: timedelta
+) -> None:
+    """Test the adaptive interval stays between the floor and the ceiling."""
+    dates = {"taxDueDate": tax_due, "motExpiryDate": mot_expiry}
+    vehicle = Vehicle.from_dict(
+        {
+            key: str(TODAY + timedelta(days=days))
+            for key, days in dates.items()
+            if days is not None
+        }
+    )
+
+    assert adaptive_interval(vehicle, TODAY, FLOOR) == expected
+
+
+def test_adaptive_interval_floor_above_ceiling() -> None:
+    """Test a scan interval longer than the ceiling is never shortened."""
+    vehicle = Vehicle.from_dict({"taxDueDate": str(TODAY + timedelta(days=1))})
+    floor = ADAPTIVE_MAX_INTERVAL * 2
+
+    assert adaptive_interval(vehicle, TODAY, floor) == floor
+    assert adaptive_interval(Vehicle.from_dict({}), TODAY, floor) == floor
+
+
+async def test_interval_for_uses_scan_interval_as_floor(hass: HomeAssistant) -> None:
+    """Test adaptive polling never polls a vehicle faster than the scan interval."""
+    fleet = synthetic_fleet(1)
+    (reg_number,) = fleet
+    fleet[reg_number]["taxDueDate"] = str(dt_util.now().date())
+    fleet[reg_number]["motExpiryDate"] = None
+    data = fleet_data(list(fleet))
+    fixed = DVLACoordinator(hass, None, data)
+    adaptive = DVLACoordinator(hass, None, {**data, CONF_ADAPTIVE_POLLING: True})
+    for coordinator in (fixed, adaptive):
+        coordinator.async_set_updated_data(
+            {reg_number: Vehicle.from_dict(fleet[reg_number])}
+        )
+
+    assert fixed.interval_for(reg_number) == fixed.scan_interval
+    assert adaptive.interval_for(reg_number) == adaptive.scan_interval
+
+    fleet[reg_number]["taxDueDate"] = None
+    adaptive.async_set_updated_data({reg_number: Vehicle.from_dict(fleet[reg_number])})
+
+    assert adaptive.interval_for(reg_number) == ADAPTIVE_MAX_INTERVAL
+
+
+async def test_registrations_requested_at_their_phase(
+    hass: HomeAssistant, ves: MockVES, freezer: FrozenDateTimeFactory
+) -> None:
+    """Test each registration is requested once a cycle, at its own slot."""
+    interval = timedelta(hours=1)
+    step = timedelta(minutes=5)
+    freezer.move_to("2026-03-10 00:00:00+00:00")
+    ves.vehicles = synthetic_fleet(20)
+    coordinator = DVLACoordinator(
+        hass,
+        async_get_session(hass),
+        fleet_data(
+            list(ves.vehicles), **{CONF_SCAN_INTERVAL: interval.total_seconds()}
+        ),
+    )
+    started = dt_util.utcnow()
+    requested: dict[str, list] = {reg_number: [] for reg_number in ves.vehicles}
+    batches = []
+
+    for _ in range(int(interval * 3 / step)):
+        ves.reset()
+        await coordinator.async_refresh()
+        batches.append(ves.count())
+        for reg_number, times in requested.items():
+            if ves.count(reg_number):
+                times.append(dt_util.utcnow())
+        freezer.tick(step)
+    await async_close_session(hass)
+
+    # Only the first refresh requests the whole fleet; after that the
+    # requests trickle in across the interval.
+    assert batches[0] == len(ves.vehicles)
+    assert max(batches[1:]) < len(ves.vehicles) / 2
+    assert sum(bool(batch) for batch in batches[1:]) > len(ves.vehicles) / 4
+
+    for reg_number, (first, second, *later) in requested.items():
+        assert first == started
+        slot = next_slot(started + interval / 2, interval, phase(reg_number))
+        assert slot - step < second <= slot + step
+        assert later
+        assert [b - a for a, b in zip([second, *later], later)] == (
+            [interval] * len(later)
+        )
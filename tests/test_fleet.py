@@ -0,0 +1,145 @@
+"""Tests for the fleet-wide aggregates."""
+
+from __future__ import annotations
+
+from datetime import date
+
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.const import CONF_API_KEY, CONF_SCAN_INTERVAL
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+
+from custom_components.dvla.const import (
+    ATTR_DAYS,
+    ATTR_INCLUDE_OVERDUE,
+    CONF_CALENDARS,
+    CONF_RATE_LIMIT,
+    CONF_REG_NUMBER,
+    DEFAULT_SCAN_INTERVAL,
+    DOMAIN,
+    SERVICE_QUERY_EXPIRING,
+)
+from custom_components.dvla.fleet import FleetIndex
+from custom_components.dvla.models import Vehicle
+
+from . import API_KEY, RATE_LIMIT, init_integration
+from .mock_ves import MockVES, synthetic_fleet
+
+
+def _vehicle(
+    reg_number: str,
+    tax_due: str,
+    mot_expiry: str,
+    tax_status: str = "Taxed",
+    mot_status: str = "Valid",
+) -> Vehicle:
+    """Return a vehicle with the fields the index reads."""
+    return Vehicle.from_dict(
+        {
+            "registrationNumber": reg_number,
+            "taxStatus": tax_status,
+            "taxDueDate": tax_due,
+            "motStatus": mot_status,
+            "motExpiryDate": mot_expiry,
+            "markedForExport": False,
+        }
+    )
+
+
+def test_fleet_index() -> None:
+    """Test the aggregates follow vehicles being added, changed and removed."""
+    index = FleetIndex()
+    index.update("AB12CDE", _vehicle("AB12CDE", "2026-01-10", "2026-03-01"))
+    index.update(
+        "XY34FGH",
+        _vehicle("XY34FGH", "2025-12-01", "2026-02-01", tax_status="Untaxed"),
+    )
+
+    assert len(index) == 2
+    assert index.count_not(index.tax_status, "Taxed") == 1
+    assert index.count_not(index.mot_status, "Valid") == 0
+    assert index.next_due("taxDueDate", date(2025, 12, 2)) == (
+        date(2026, 1, 10),
+        "AB12CDE",
+    )
+    assert index.between("motExpiryDate", None, date(2026, 2, 28)) == [
+        (date(2026, 2, 1), "XY34FGH")
+    ]
+
+    # A changed vehicle replaces its old dates and statuses.
+    index.update("XY34FGH", _vehicle("XY34FGH", "2026-12-01", "2026-02-01"))
+    assert index.count_not(index.tax_status, "Taxed") == 0
+    assert index.between("taxDueDate", date(2026, 1, 1), date(2026, 12, 31)) == [
+        (date(2026, 1, 10), "AB12CDE"),
+        (date(2026, 12, 1), "XY34FGH"),
+    ]
+
+    index.update("AB12CDE", None)
+    assert len(index) == 1
+    assert index.vehicle("AB12CDE") is None
+    assert index.next_due("taxDueDate", date(2025, 12, 2)) == (
+        date(2026, 12, 1),
+        "XY34FGH",
+    )
+
+
+async def test_fleet_sensors_cover_every_entry(
+    hass: HomeAssistant, ves: MockVES
+) -> None:
+    """Test one set of fleet sensors covers every entry and outlives its owner."""
+    ves.vehicles = synthetic_fleet(3)
+    entries = [
+        await init_integration(
+            hass,
+            {
+                CONF_API_KEY: API_KEY,
+                CONF_REG_NUMBER: reg_number,
+                CONF_SCAN_INTERVAL: DEFAULT_SCAN_INTERVAL,
+                CONF_CALENDARS: [],
+                CONF_RATE_LIMIT: RATE_LIMIT,
+            },
+            title=reg_number,
+        )
+        for reg_number in ves.vehicles
+    ]
+    untaxed = sum(
+        vehicle["taxStatus"] != "Taxed" for vehicle in ves.vehicles.values()
+    )
+    entity_registry = er.async_get(hass)
+    entity_id = "sensor.dvla_fleet_untaxed_vehicles"
+
+    assert hass.states.get(entity_id).state == str(untaxed)
+    assert hass.states.get(entity_id).attributes["tax_status"] == {
+        "Taxed": len(ves.vehicles) - untaxed,
+        "Untaxed": untaxed,
+    }
+    assert entity_registry.async_get(entity_id).config_entry_id == (
+        entries[0].entry_id
+    )
+
+    response = await hass.services.async_call(
+        DOMAIN,
+        SERVICE_QUERY_EXPIRING,
+        {ATTR_DAYS: 400, ATTR_INCLUDE_OVERDUE: True},
+        blocking=True,
+        return_response=True,
+    )
+    assert {vehicle["registration_number"] for vehicle in response["vehicles"]} == (
+        set(ves.vehicles)
+    )
+
+    # The first vehicle is the untaxed one.
+    assert await hass.config_entries.async_unload(entries[0].entry_id)
+    await hass.async_block_till_done()
+
+    assert entries[0].state is ConfigEntryState.NOT_LOADED
+    assert hass.states.get(entity_id).state == str(untaxed - 1)
+    assert entity_registry.async_get(entity_id).config_entry_id == (
+        entries[1].entry_id
+    )
+
+    for entry in entries[1:]:
+        assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
+
+    assert hass.states.get(entity_id).state == "unavailable"
@@ -0,0 +1,209 @@
+"""Tests for setting up the DVLA integration."""
+
+from __future__ import annotations
+
+from datetime import timedelta
+from typing import Any
+from unittest.mock import patch
+
+from freezegun.api import FrozenDateTimeFactory
+import pytest
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from custom_components.dvla.const import (
+    CONF_CALENDARS,
+    DEFAULT_SCAN_INTERVAL,
+    DOMAIN,
+    SERVICE_QUERY_EXPIRING,
+)
+from custom_components.dvla.coordinator import SAVE_DELAY
+from custom_components.dvla.entity import DVLAEntity
+
+from . import fleet_data, init_integration
+from .mock_ves import MockVES, synthetic_fleet
+
+
+async def test_one_request_per_vehicle_per_refresh(
+    hass: HomeAssistant, ves: MockVES, freezer: FrozenDateTimeFactory
+) -> None:
+    """Test each refresh cycle costs one request per vehicle."""
+    ves.vehicles = synthetic_fleet(3)
+    entry = await init_integration(
+        hass, fleet_data(list(ves.vehicles), **{CONF_CALENDARS: ["None"]})
+    )
+
+    assert entry.state is ConfigEntryState.LOADED
+    assert len(hass.data[DOMAIN]) == 1
+    for reg_number, vehicle in ves.vehicles.items():
+        name = reg_number.lower()
+        state = hass.states.get(f"sensor.dvla_{name}_taxstatus")
+        assert state.state == vehicle["taxStatus"]
+        assert hass.states.get(f"binary_sensor.dvla_{name}_taxstatus")
+        assert hass.states.get(f"calendar.dvla_{name}")
+        assert ves.count(reg_number) == 1
+    assert ves.count() == len(ves.vehicles)
+
+    # Every vehicle is due again within one and a half scan intervals.
+    ves.reset()
+    freezer.tick(timedelta(seconds=DEFAULT_SCAN_INTERVAL * 1.5))
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+
+    for reg_number in ves.vehicles:
+        assert ves.count(reg_number) == 1
+    assert ves.count() == len(ves.vehicles)
+
+
+async def test_unchanged_refresh_skips_entity_writes(
+    hass: HomeAssistant,
+    ves: MockVES,
+    freezer: FrozenDateTimeFactory,
+    hass_storage: dict[str, Any],
+) -> None:
+    """Test a refresh returning the same records writes no entity but is saved."""
+    ves.vehicles = synthetic_fleet(2)
+    first, second = ves.vehicles
+    entry = await init_integration(hass, fleet_data(list(ves.vehicles)))
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    key = f"{DOMAIN}.{entry.entry_id}"
+    initial = dict(coordinator.fetched)
+
+    async def async_refresh() -> None:
+        """Refresh every vehicle and wait for the snapshot to be saved."""
+        ves.reset()
+        freezer.tick(timedelta(seconds=DEFAULT_SCAN_INTERVAL * 1.5))
+        async_fire_time_changed(hass)
+        await hass.async_block_till_done()
+        assert ves.count() == len(ves.vehicles)
+        freezer.tick(timedelta(seconds=SAVE_DELAY + 1))
+        async_fire_time_changed(hass)
+        await hass.async_block_till_done()
+
+    with patch.object(DVLAEntity, "async_write_ha_state", autospec=True) as write:
+        await async_refresh()
+
+    write.assert_not_called()
+    saved = hass_storage[key]["data"]
+    for reg_number in ves.vehicles:
+        assert coordinator.fetched[reg_number] > initial[reg_number]
+        assert saved[reg_number]["fetched"] == (
+            coordinator.fetched[reg_number].isoformat()
+        )
+        assert saved[reg_number]["updated"] == initial[reg_number].isoformat()
+
+    # A change to one vehicle only writes that vehicle's entities.
+    ves.vehicles[first]["colour"] = "GREEN"
+    with patch.object(DVLAEntity, "async_write_ha_state", autospec=True) as write:
+        await async_refresh()
+
+    assert write.call_count
+    assert {call.args[0].reg_number for call in write.call_args_list} == {first}
+    assert hass_storage[key]["data"][second]["updated"] == (
+        initial[second].isoformat()
+    )
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+
+
+async def test_remove_entry_deletes_snapshot(
+    hass: HomeAssistant, ves: MockVES, hass_storage: dict[str, Any]
+) -> None:
+    """Test removing an entry deletes its snapshot despite a pending save."""
+    ves.vehicles = synthetic_fleet(2)
+    entry = await init_integration(hass, fleet_data(list(ves.vehicles)))
+    key = f"{DOMAIN}.{entry.entry_id}"
+
+    async def async_remove(store: Store) -> None:
+        """Remove data, cancelling pending saves as the real Store does."""
+        store._async_cleanup_delay_listener()  # noqa: SLF001
+        store._async_cleanup_final_write_listener()  # noqa: SLF001
+        hass_storage.pop(store.key, None)
+
+    with patch.object(Store, "async_remove", async_remove):
+        assert await hass.config_entries.async_remove(entry.entry_id)
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=SAVE_DELAY + 1))
+    await hass.async_block_till_done()
+
+    assert key not in hass_storage
+
+
+@pytest.mark.parametrize(
+    ("service_data", "expected"),
+    [
+        (
+            {},
+            [
+                ("DV00000", "taxDueDate"),
+                ("DV00001", "motExpiryDate"),
+                ("DV00002", "taxDueDate"),
+            ],
+        ),
+        ({"days": 7}, [("DV00000", "taxDueDate")]),
+        (
+            {"days": 60, "field": "motExpiryDate"},
+            [("DV00001", "motExpiryDate"), ("DV00000", "motExpiryDate")],
+        ),
+        (
+            {"include_overdue": True},
+            [
+                ("DV00001", "taxDueDate"),
+                ("DV00002", "motExpiryDate"),
+                ("DV00000", "taxDueDate"),
+                ("DV00001", "motExpiryDate"),
+                ("DV00002", "taxDueDate"),
+            ],
+        ),
+        ({"status": "untaxed"}, []),
+        (
+            {"status": ["Untaxed", "Not valid"], "include_overdue": True},
+            [("DV00001", "taxDueDate"), ("DV00002", "motExpiryDate")],
+        ),
+    ],
+)
+async def test_query_expiring(
+    hass: HomeAssistant,
+    ves: MockVES,
+    service_data: dict[str, Any],
+    expected: list[tuple[str, str]],
+) -> None:
+    """Test query_expiring filters by window, field and status, soonest first."""
+    today = dt_util.now().date()
+    ves.vehicles = synthetic_fleet(3)
+    for (reg_number, vehicle), (tax_due, mot_expiry) in zip(
+        ves.vehicles.items(), [(5, 40), (-3, 10), (20, -1)]
+    ):
+        vehicle.update(
+            taxStatus="Taxed" if tax_due >= 0 else "Untaxed",
+            taxDueDate=(today + timedelta(days=tax_due)).isoformat(),
+            motStatus="Valid" if mot_expiry >= 0 else "Not valid",
+            motExpiryDate=(today + timedelta(days=mot_expiry)).isoformat(),
+        )
+    entry = await init_integration(hass, fleet_data(list(ves.vehicles)))
+    requests = ves.count()
+
+    response = await hass.services.async_call(
+        DOMAIN,
+        SERVICE_QUERY_EXPIRING,
+        service_data,
+        blocking=True,
+        return_response=True,
+    )
+
+    assert [
+        (vehicle["registration_number"], vehicle["field"])
+        for vehicle in response["vehicles"]
+    ] == expected
+    for vehicle in response["vehicles"]:
+        due = dt_util.parse_date(vehicle["date"])
+        reg_number = vehicle["registration_number"]
+        assert vehicle["date"] == ves.vehicles[reg_number][vehicle["field"]]
+        assert vehicle["days"] == (due - today).days
+    # Answered from memory.
+    assert ves.count() == requests
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
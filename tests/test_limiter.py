@@ -0,0 +1,113 @@
+"""Tests for the client-side rate limiter."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Generator
+from datetime import timedelta
+from types import SimpleNamespace
+from typing import Any
+from unittest.mock import patch
+
+from freezegun.api import FrozenDateTimeFactory
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+import pytest
+
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+from custom_components.dvla.limiter import (
+    SAVE_DELAY,
+    STORAGE_KEY_USAGE,
+    RateLimiter,
+    api_key_id,
+    async_get_limiter,
+)
+
+from . import API_KEY, MockClock
+
+
+@pytest.fixture
+def clock() -> Generator[MockClock, None, None]:
+    """Run the limiter on a clock that only moves when it sleeps."""
+    mock_clock = MockClock()
+    with (
+        patch("custom_components.dvla.limiter.time", mock_clock),
+        patch(
+            "custom_components.dvla.limiter.asyncio",
+            SimpleNamespace(Lock=asyncio.Lock, sleep=mock_clock.sleep),
+        ),
+    ):
+        yield mock_clock
+
+
+async def test_spreads_requests_at_rate(clock: MockClock) -> None:
+    """Test a burst beyond the bucket waits for tokens at the set rate."""
+    limiter = RateLimiter(2.0, 0)
+
+    for _ in range(4):
+        assert await limiter.async_acquire()
+
+    # Two requests fit in the bucket, the rest are half a second apart.
+    assert clock.slept == [0.5, 0.5]
+    assert limiter.used == 4
+    assert limiter.remaining is None
+
+
+async def test_defer_holds_back_requests(clock: MockClock) -> None:
+    """Test requests wait out a rate limit reported by the API."""
+    limiter = RateLimiter(10.0, 0)
+    limiter.defer(30)
+    limiter.defer(5)
+
+    assert limiter.deferred
+    assert limiter.resume_in == 30
+
+    assert await limiter.async_acquire()
+    assert clock.slept == [30]
+    assert not limiter.deferred
+
+
+async def test_budget_and_month_rollover(
+    clock: MockClock, freezer: FrozenDateTimeFactory
+) -> None:
+    """Test a spent budget refuses requests until the next month."""
+    freezer.move_to("2026-01-31 23:59:00+00:00")
+    limiter = RateLimiter(10.0, 2)
+
+    assert await limiter.async_acquire()
+    assert await limiter.async_acquire()
+    assert limiter.remaining == 0
+    assert not await limiter.async_acquire()
+    assert limiter.used == 2
+
+    freezer.move_to("2026-02-01 00:00:00+00:00")
+    assert limiter.remaining == 2
+    assert await limiter.async_acquire()
+    assert limiter.as_dict() == {"month": "2026-02", "used": 1}
+
+
+async def test_usage_persists(
+    hass: HomeAssistant, hass_storage: dict[str, Any]
+) -> None:
+    """Test usage is loaded from and saved to storage per API key."""
+    month = dt_util.utcnow().strftime("%Y-%m")
+    hass_storage[STORAGE_KEY_USAGE] = {
+        "version": 1,
+        "key": STORAGE_KEY_USAGE,
+        "data": {api_key_id(API_KEY): {"month": month, "used": 7}},
+    }
+    limiter = await async_get_limiter(hass, API_KEY, 10.0, 10)
+
+    assert limiter.remaining == 3
+    assert await limiter.async_acquire()
+
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=SAVE_DELAY))
+    await hass.async_block_till_done()
+
+    assert hass_storage[STORAGE_KEY_USAGE]["data"] == {
+        api_key_id(API_KEY): {"month": month, "used": 8}
+    }
+    # Ad-hoc callers share the limiter without changing its settings.
+    assert await async_get_limiter(hass, API_KEY) is limiter
+    assert (limiter.rate, limiter.monthly_budget) == (10.0, 10)
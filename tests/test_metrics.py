@@ -0,0 +1,32 @@
+"""Tests for the request metrics."""
+
+from __future__ import annotations
+
+from unittest.mock import patch
+
+from custom_components.dvla.metrics import MetricsRegistry
+
+from . import API_KEY
+
+
+def test_registrations_normalised_and_capped() -> None:
+    """Test plates share metrics however they are written, up to a limit."""
+    metrics = MetricsRegistry()
+    metrics.record(API_KEY, "ab12cde", 120, 200, 512)
+    metrics.record(API_KEY, "AB12 CDE", 80, 404, 64, "VehicleNotFound")
+    metrics.record_retry(API_KEY, "Ab12Cde")
+
+    registration = metrics.for_registration("AB12CDE").as_dict()
+    assert registration["requests"] == 2
+    assert registration["retries"] == 1
+    assert registration["status_codes"] == {200: 1, 404: 1}
+    assert metrics.for_key(API_KEY).as_dict()["average_latency_ms"] == 100.0
+
+    with patch("custom_components.dvla.metrics.MAX_REGISTRATIONS", 2):
+        metrics.record(API_KEY, "XY34FGH", 100)
+        # Recording for a plate keeps it from being the next one dropped.
+        metrics.record(API_KEY, "AB12CDE", 100)
+        metrics.record(API_KEY, "CD56EFG", 100)
+
+    assert metrics.for_registration("AB12CDE").requests == 3
+    assert metrics.for_registration("XY34FGH").requests == 0
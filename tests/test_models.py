@@ -0,0 +1,87 @@
+"""Tests for the DVLA vehicle model."""
+
+from __future__ import annotations
+
+from dataclasses import FrozenInstanceError
+from datetime import date
+
+import pytest
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.dvla.coordinator import (
+    DVLACoordinator,
+    async_close_session,
+    async_get_session,
+)
+from custom_components.dvla.models import Vehicle
+
+from . import fleet_data
+from .mock_ves import MockVES, synthetic_fleet
+
+RESPONSE = {
+    "registrationNumber": "DV00000",
+    "taxDueDate": "2026-04-01",
+    "motExpiryDate": "not a date",
+    "engineCapacity": "1600",
+    "co2Emissions": "unknown",
+    "markedForExport": False,
+    "colour": "BLUE",
+    "dateOfFirstRegistration": "2020-01-01",
+}
+
+
+def test_vehicle_parsed_from_response() -> None:
+    """Test a response is parsed once into typed fields."""
+    vehicle = Vehicle.from_dict(RESPONSE)
+
+    assert vehicle.tax_due_date == date(2026, 4, 1)
+    assert vehicle.engine_capacity == 1600
+    assert vehicle.colour == "BLUE"
+    # Values the API sent in the wrong form are dropped rather than raising.
+    assert vehicle.mot_expiry_date is None
+    assert vehicle.co2_emissions is None
+    assert vehicle.make is None
+    assert vehicle.raw is RESPONSE
+
+    assert vehicle.get("taxDueDate") == date(2026, 4, 1)
+    assert vehicle.get("markedForExport") is False
+    # Keys without a field fall back to the response.
+    assert vehicle.get("dateOfFirstRegistration") == "2020-01-01"
+    assert vehicle.get("missing") is None
+    assert "colour" in vehicle
+    assert "make" not in vehicle
+
+
+def test_vehicle_immutable() -> None:
+    """Test a vehicle cannot be changed or given new attributes."""
+    vehicle = Vehicle.from_dict(RESPONSE)
+
+    with pytest.raises(FrozenInstanceError):
+        vehicle.colour = "RED"
+    # Python 3.11 raises TypeError for unknown names on frozen slotted classes.
+    with pytest.raises((FrozenInstanceError, TypeError)):
+        vehicle.nickname = "Van"
+    assert not hasattr(vehicle, "__dict__")
+    assert vehicle.colour == "BLUE"
+
+
+async def test_coordinator_vehicle(hass: HomeAssistant, ves: MockVES) -> None:
+    """Test the coordinator hands out the parsed vehicle for a registration."""
+    ves.vehicles = synthetic_fleet(2)
+    first, second = ves.vehicles
+    coordinator = DVLACoordinator(hass, async_get_session(hass), fleet_data([first]))
+
+    assert coordinator.vehicle(first) is None
+
+    await coordinator.async_refresh()
+    await async_close_session(hass)
+    vehicle = coordinator.vehicle(first)
+
+    assert isinstance(vehicle, Vehicle)
+    assert vehicle.registration_number == first
+    assert vehicle.raw == ves.vehicles[first]
+    assert vehicle.get("taxDueDate") == date.fromisoformat(
+        ves.vehicles[first]["taxDueDate"]
+    )
+    assert coordinator.vehicle(second) is None
@@ -0,0 +1,152 @@
+"""Tests for sharing requests across a pool of API keys."""
+
+from __future__ import annotations
+
+from homeassistant.const import CONF_API_KEY
+from homeassistant.core import HomeAssistant
+
+from custom_components.dvla.const import (
+    CONF_API_KEYS,
+    CONF_MONTHLY_BUDGET,
+    CONF_RATE_LIMIT,
+    DOMAIN,
+)
+from custom_components.dvla.coordinator import (
+    async_close_session,
+    async_fetch_vehicle_from_pool,
+    async_get_session,
+)
+from custom_components.dvla.limiter import async_get_limiter
+from custom_components.dvla.pool import async_get_key_pool
+
+from . import API_KEY, RATE_LIMIT, fleet_data, init_integration
+from .mock_ves import MockVES, synthetic_fleet
+
+
+async def test_select_prefers_headroom(hass: HomeAssistant) -> None:
+    """Test the key with the most budget left is picked, skipping spent keys."""
+    pool = await async_get_key_pool(
+        hass,
+        ["spent", "busy", "idle"],
+        {
+            "spent": (RATE_LIMIT, 1),
+            "busy": (RATE_LIMIT, 100),
+            "idle": (RATE_LIMIT, 100),
+        },
+    )
+    assert await pool.limiter("spent").async_acquire()
+    assert await pool.limiter("busy").async_acquire()
+
+    assert pool.select() == "idle"
+    assert pool.select({"idle"}) == "busy"
+    assert pool.select({"idle", "busy"}) is None
+    assert not pool.exhausted
+
+    # A key held back by a rate limit is only used when nothing else is left.
+    pool.limiter("idle").defer(60)
+    assert pool.select() == "busy"
+
+
+async def test_fails_over_to_next_key(hass: HomeAssistant, ves: MockVES) -> None:
+    """Test a rejected key is set aside and the request moves to the next."""
+    ves.vehicles = synthetic_fleet(1)
+    ves.api_keys = {"good"}
+    (reg_number,) = ves.vehicles
+    pool = await async_get_key_pool(
+        hass, ["bad", "good"], {"bad": (RATE_LIMIT, 0), "good": (RATE_LIMIT, 0)}
+    )
+
+    body = await async_fetch_vehicle_from_pool(
+        async_get_session(hass), pool, reg_number
+    )
+    await async_close_session(hass)
+
+    assert body == ves.vehicles[reg_number]
+    assert ves.requests == [("bad", reg_number), ("good", reg_number)]
+
+
+async def test_entry_configures_each_key(hass: HomeAssistant, ves: MockVES) -> None:
+    """Test each API key gets its own rate and budget, or else the entry's."""
+    ves.vehicles = synthetic_fleet(2)
+    await init_integration(
+        hass,
+        fleet_data(
+            list(ves.vehicles),
+            **{
+                CONF_MONTHLY_BUDGET: 1000,
+                CONF_API_KEYS: [
+                    {CONF_API_KEY: "second", CONF_RATE_LIMIT: 2.0},
+                    {
+                        CONF_API_KEY: "third",
+                        CONF_RATE_LIMIT: 0.5,
+                        CONF_MONTHLY_BUDGET: 50,
+                    },
+                    {CONF_API_KEY: "fourth"},
+                ],
+            },
+        ),
+    )
+
+    for api_key, limits in {
+        API_KEY: (RATE_LIMIT, 1000),
+        "second": (2.0, 1000),
+        "third": (0.5, 50),
+        "fourth": (RATE_LIMIT, 1000),
+    }.items():
+        limiter = await async_get_limiter(hass, api_key)
+        assert (limiter.rate, limiter.monthly_budget) == limits
+
+
+async def test_shared_key_keeps_first_entry_limits(
+    hass: HomeAssistant, ves: MockVES
+) -> None:
+    """Test a key shared by two entries takes the first entry's limits."""
+    ves.vehicles = synthetic_fleet(2)
+    first, second = list(ves.vehicles)
+    entries = [
+        await init_integration(hass, fleet_data([first], **{CONF_MONTHLY_BUDGET: 100})),
+        await init_integration(
+            hass,
+            fleet_data([second], **{CONF_RATE_LIMIT: 2.0, CONF_MONTHLY_BUDGET: 5}),
+        ),
+    ]
+    limiter = await async_get_limiter(hass, API_KEY)
+
+    assert (limiter.rate, limiter.monthly_budget) == (RATE_LIMIT, 100)
+
+    # Reloading the later entry does not take the key over either.
+    assert await hass.config_entries.async_reload(entries[1].entry_id)
+    await hass.async_block_till_done()
+    assert (limiter.rate, limiter.monthly_budget) == (RATE_LIMIT, 100)
+
+    for entry in entries:
+        assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
+
+
+async def test_shared_additional_key(hass: HomeAssistant, ves: MockVES) -> None:
+    """Test an additional key shared with an earlier entry keeps its limits."""
+    ves.vehicles = synthetic_fleet(2)
+    first, second = list(ves.vehicles)
+    shared = {CONF_API_KEY: "shared", CONF_RATE_LIMIT: 2.0, CONF_MONTHLY_BUDGET: 50}
+    entries = [
+        await init_integration(hass, fleet_data([first], **{CONF_API_KEYS: [shared]})),
+        await init_integration(
+            hass,
+            fleet_data(
+                [second],
+                **{CONF_API_KEYS: [{**shared, CONF_RATE_LIMIT: 0.5}]},
+            ),
+        ),
+    ]
+    first_pool, second_pool = (
+        hass.data[DOMAIN][entry.entry_id].pool for entry in entries
+    )
+    limiter = second_pool.limiter("shared")
+
+    assert first_pool.limiter("shared") is limiter
+    assert (limiter.rate, limiter.monthly_budget) == (2.0, 50)
+
+    for entry in entries:
+        assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
@@ -0,0 +1,57 @@
+"""Tests for the DVLA sensors shared by entries."""
+
+from __future__ import annotations
+
+from homeassistant.const import CONF_API_KEY
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+
+from custom_components.dvla.const import CONF_API_KEYS, CONF_MONTHLY_BUDGET, DOMAIN
+from custom_components.dvla.limiter import api_key_id
+
+from . import API_KEY, fleet_data, init_integration
+from .mock_ves import MockVES, synthetic_fleet
+
+
+async def test_shared_sensors_added_once(hass: HomeAssistant, ves: MockVES) -> None:
+    """Test shared sensors are added once and move when their owner unloads."""
+    ves.vehicles = synthetic_fleet(2)
+    first, second = list(ves.vehicles)
+    entries = [
+        await init_integration(hass, fleet_data([first], **{CONF_MONTHLY_BUDGET: 100})),
+        await init_integration(
+            hass,
+            fleet_data([second], **{CONF_API_KEYS: [{CONF_API_KEY: "second"}]}),
+        ),
+    ]
+    entity_registry = er.async_get(hass)
+
+    def owner(unique_id: str) -> str | None:
+        """Return the entry holding a sensor, or None if it does not exist."""
+        entity_id = entity_registry.async_get_entity_id("sensor", DOMAIN, unique_id)
+        if entity_id is None or hass.states.get(entity_id) is None:
+            return None
+        return entity_registry.async_get(entity_id).config_entry_id
+
+    shared_key = f"{DOMAIN}-{api_key_id(API_KEY)}-requests_this_month"
+    second_key = f"{DOMAIN}-{api_key_id('second')}-requests_this_month"
+    cache = f"{DOMAIN}-fleet-lookup_cache_hit_rate"
+
+    assert owner(shared_key) == entries[0].entry_id
+    assert owner(f"{DOMAIN}-{api_key_id(API_KEY)}-budget_remaining") == (
+        entries[0].entry_id
+    )
+    assert owner(second_key) == entries[1].entry_id
+    assert owner(cache) == entries[0].entry_id
+
+    assert await hass.config_entries.async_unload(entries[0].entry_id)
+    await hass.async_block_till_done()
+
+    assert owner(shared_key) == entries[1].entry_id
+    assert owner(cache) == entries[1].entry_id
+    assert hass.states.get(
+        entity_registry.async_get_entity_id("sensor", DOMAIN, shared_key)
+    ).state == str(ves.count(api_key=API_KEY))
+
+    assert await hass.config_entries.async_unload(entries[1].entry_id)
+    await hass.async_block_till_done()